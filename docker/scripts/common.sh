@@ -146,6 +146,23 @@ rotate_log_file() {
     fi
 }
 
+# Like tee, but keeps the file under LOG_FILE_MAX_SIZE with one .old generation.
+# The manager archives container output from stdout, so the file only needs recent lines
+tee_rotated() {
+    local log_file="$1"
+    local count=0
+    
+    exec 3>>"$log_file"
+    while IFS= read -r line; do
+        printf '%s\n' "$line"
+        printf '%s\n' "$line" >&3
+        if (( ++count % 1000 == 0 )); then
+            rotate_log_file "$log_file" "${LOG_FILE_MAX_SIZE:-10M}"
+            exec 3>>"$log_file"
+        fi
+    done
+}
+
 # Configuration helpers
 create_nexus_config() {
     local config_dir="$1"
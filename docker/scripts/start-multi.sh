@@ -99,7 +99,7 @@ EOF
         # Start with proper logging
         $NEXUS_CLI_PATH $args 2>&1 | while IFS= read -r line; do
             echo "[$(date '+%Y-%m-%d %H:%M:%S')] [Instance-$instance_num:$node_id] $line"
-        done | tee "$log_file"
+        done | tee_rotated "$log_file"
     ) &
     
     local pid=$!
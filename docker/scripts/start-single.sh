@@ -8,6 +8,12 @@ source "$(dirname "$0")/common.sh"
 
 log_info "Starting Nexus CLI - Single Instance Mode"
 
+# Warm-pool containers are created before their node is known; the manager copies
+# the node binding in here before starting them
+if [ -f "/app/node.env" ]; then
+    source "/app/node.env"
+fi
+
 # Validate environment
 validate_node_id() {
     if [ -z "$NODE_ID" ]; then
@@ -81,7 +87,7 @@ main() {
     mkdir -p "$LOG_DIR"
     
     # Start the CLI and capture PID
-    $NEXUS_CLI_PATH $args 2>&1 | tee "$LOG_DIR/nexus-$NODE_ID.log" &
+    $NEXUS_CLI_PATH $args 2>&1 | tee_rotated "$LOG_DIR/nexus-$NODE_ID.log" &
     CLI_PID=$!
     
     log_info "Nexus CLI started with PID: $CLI_PID"
@@ -1,19 +1,32 @@
 import os
+import re
 import json
+import mmap
+import gzip
+import base64
+import hashlib
+import io
+import math
 import subprocess
 import shutil
 import platform
+import shlex
 import signal
+import sqlite3
+import tarfile
 import threading
 import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 import psutil
+import requests
 import yaml
 
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, request, jsonify, flash, redirect, url_for, session, stream_with_context
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from werkzeug.security import generate_password_hash, check_password_hash
 
 # Conditional Docker import for standalone mode
@@ -24,21 +37,3216 @@ try:
 except ImportError:
     DOCKER_AVAILABLE = False
 
+# Optional compact encoding for Socket.IO pushes
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Lets only one manager process own a data directory (not on Windows)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Under gunicorn's eventlet worker, blocking C calls are moved to native threads with tpool
+try:
+    import eventlet.patcher
+    from eventlet import tpool
+    EVENTLET_AVAILABLE = True
+except ImportError:
+    EVENTLET_AVAILABLE = False
+
 app = Flask(__name__, 
            template_folder='../templates',
            static_folder='../static')
 app.secret_key = os.environ.get('SECRET_KEY', 'nexus-docker-manager-secret-key')
 
-# WebSocket support for real-time updates
-socketio = SocketIO(app, cors_allowed_origins="*")
+# WebSocket support for real-time updates
+socketio = SocketIO(app, cors_allowed_origins="*")
+
+# Remote Docker endpoints, e.g. "unix:///var/run/docker.sock,edge-2=tcp://10.0.0.2:2375"
+DOCKER_HOSTS = [h.strip() for h in os.environ.get('DOCKER_HOSTS', '').split(',') if h.strip()]
+DOCKER_HOST_TIMEOUT = int(os.environ.get('DOCKER_HOST_TIMEOUT', '10'))
+IMAGE_BUILD_TIMEOUT = 1800
+
+# Kubernetes API (in-cluster service account is used when K8S_API_SERVER is not set)
+K8S_API_SERVER = os.environ.get('K8S_API_SERVER', '')
+K8S_NAMESPACE = os.environ.get('K8S_NAMESPACE', 'nexus')
+K8S_REQUEST_TIMEOUT = int(os.environ.get('K8S_REQUEST_TIMEOUT', '10'))
+K8S_WATCH_TIMEOUT = 300
+K8S_WATCH_RETRY = 5
+K8S_METRICS_TTL = 15
+
+# Services brought up concurrently by the compose executor
+COMPOSE_PARALLELISM = int(os.environ.get('COMPOSE_PARALLELISM', '4'))
+
+# Bulk container actions: concurrent operations and the per-item deadline in seconds
+BULK_ACTION_PARALLELISM = int(os.environ.get('BULK_ACTION_PARALLELISM', '8'))
+BULK_ACTION_DEADLINE = int(os.environ.get('BULK_ACTION_DEADLINE', '60'))
+BULK_ACTIONS = ('start', 'stop', 'restart', 'kill', 'pause', 'unpause', 'remove')
+NATIVE_BULK_ACTIONS = ('start', 'stop', 'restart')
+# Seconds a native process gets between SIGTERM and SIGKILL
+NATIVE_STOP_TIMEOUT = float(os.environ.get('NATIVE_STOP_TIMEOUT', '10'))
+
+# Fleet drain: every instance is signalled at once and gets DRAIN_GRACE seconds to exit,
+# anything still running at DRAIN_DEADLINE is killed
+DRAIN_DEADLINE = float(os.environ.get('DRAIN_DEADLINE', '30'))
+DRAIN_GRACE = float(os.environ.get('DRAIN_GRACE', '10'))
+DRAIN_PARALLELISM = int(os.environ.get('DRAIN_PARALLELISM', '64'))
+
+# Rolling restarts: readiness wait per batch and failed batches before pausing
+ROLLING_READINESS_TIMEOUT = int(os.environ.get('ROLLING_READINESS_TIMEOUT', '120'))
+ROLLING_MAX_FAILURES = int(os.environ.get('ROLLING_MAX_FAILURES', '2'))
+ROLLING_POLL_INTERVAL = 2
+
+# Health checks; interval and auto_restart default to docker/config/nexus-template.json
+HEALTH_STALL_SECONDS = int(os.environ.get('HEALTH_STALL_SECONDS', '300'))
+HEALTH_STARTUP_GRACE = 120
+HEALTH_CPU_IDLE_PERCENT = 1.0
+HEALTH_IDLE_PASSES = 3
+HEALTH_BACKOFF_BASE = 30
+HEALTH_BACKOFF_MAX = 1800
+
+# Seconds between data_update pushes to connected dashboards
+PUSH_INTERVAL = float(os.environ.get('PUSH_INTERVAL', '30'))
+
+# Seconds a polled endpoint's snapshot is served before it is rebuilt
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '2'))
+# Native threads for blocking calls made from the eventlet hub, and the hub stall that is logged
+OFFLOAD_POOL_SIZE = int(os.environ.get('OFFLOAD_POOL_SIZE', '16'))
+LOOP_LAG_THRESHOLD = float(os.environ.get('LOOP_LAG_THRESHOLD', '0.5'))
+LOOP_LAG_PROBE_INTERVAL = 0.25
+
+INVENTORY_QUERY_PARAMS = ('limit', 'cursor', 'sort', 'order', 'mode', 'status', 'node', 'label')
+
+# Declarative fleet manifest and its reconcile loop (interval 0 disables the loop)
+FLEET_MANIFEST = os.environ.get('FLEET_MANIFEST', os.path.join(os.path.dirname(__file__), '..', 'fleet.yml'))
+FLEET_RECONCILE_INTERVAL = int(os.environ.get('FLEET_RECONCILE_INTERVAL', '60'))
+FLEET_RECONCILE_PARALLELISM = int(os.environ.get('FLEET_RECONCILE_PARALLELISM', '8'))
+
+# Autoscaler policy (scaling runs only while the policy file exists and is enabled)
+AUTOSCALE_POLICY = os.environ.get('AUTOSCALE_POLICY', os.path.join(os.path.dirname(__file__), '..', 'autoscale.yml'))
+AUTOSCALE_INTERVAL = int(os.environ.get('AUTOSCALE_INTERVAL', '60'))
+
+# Set by nexusd, which hosts the manager without the dashboard push thread
+NEXUS_HEADLESS = os.environ.get('NEXUS_HEADLESS', 'false').lower() == 'true'
+
+# Local state: native instance output and the fleet log search index
+DATA_DIR = os.environ.get('NEXUS_DATA_DIR', os.path.join(os.path.dirname(__file__), '..', 'data'))
+MANAGER_LOCK_PATH = os.path.join(DATA_DIR, 'manager.lock')
+NATIVE_LOG_DIR = os.path.join(DATA_DIR, 'native-logs')
+NATIVE_REGISTRY_PATH = os.environ.get('NATIVE_REGISTRY_PATH', os.path.join(DATA_DIR, 'native-processes.json'))
+LOG_INDEX_PATH = os.environ.get('LOG_INDEX_PATH', os.path.join(DATA_DIR, 'log-index.db'))
+LOG_INDEX_INTERVAL = int(os.environ.get('LOG_INDEX_INTERVAL', '10'))
+LOG_INDEX_RETENTION_DAYS = float(os.environ.get('LOG_INDEX_RETENTION_DAYS', '7'))
+LOG_INDEX_BACKFILL = 1000
+LOG_INDEX_PARALLELISM = 8
+
+# Where the manager sees Docker's volume directory when it isn't /var/lib/docker/volumes
+DOCKER_VOLUME_ROOT = os.environ.get('DOCKER_VOLUME_ROOT')
+
+# Compressed per-node log archive; Docker's own json-file logs are capped per container
+LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', os.path.join(DATA_DIR, 'log-archive'))
+LOG_ARCHIVE_MAX_SIZE = os.environ.get('LOG_ARCHIVE_MAX_SIZE', '1g')
+LOG_ARCHIVE_MAX_AGE_DAYS = float(os.environ.get('LOG_ARCHIVE_MAX_AGE_DAYS', '30'))
+LOG_ARCHIVE_FRAME_BYTES = 64 * 1024
+LOG_ARCHIVE_CHUNK_BYTES = 8 * 1024 * 1024
+LOG_ARCHIVE_FLUSH_SECONDS = 60
+CONTAINER_LOG_CONFIG = {'type': 'json-file', 'config': {
+    'max-size': os.environ.get('CONTAINER_LOG_MAX_SIZE', '50m'),
+    'max-file': os.environ.get('CONTAINER_LOG_MAX_FILE', '3')
+}}
+
+# Warm pool: stopped, network-attached single-node containers per Docker host, bound to a node ID on demand
+WARM_POOL_SIZE = int(os.environ.get('WARM_POOL_SIZE', '0'))
+WARM_POOL_INTERVAL = int(os.environ.get('WARM_POOL_INTERVAL', '30'))
+# Spares are created with these limits and only serve requests that ask for the same ones
+WARM_POOL_THREADS = int(os.environ.get('WARM_POOL_THREADS', '4'))
+WARM_POOL_MEMORY = os.environ.get('WARM_POOL_MEMORY', '2g')
+WARM_POOL_CPUS = float(os.environ.get('WARM_POOL_CPUS', '2.0'))
+WARM_POOL_LABEL = 'nexus.warm-pool'
+# Set by images whose start-single.sh sources /app/node.env; spares of older images would start without a node ID
+NODE_ENV_LABEL = 'nexus.node-env'
+CONFIG_FINGERPRINT_LABEL = 'nexus.config-hash'
+NODE_CONTAINER_NAME = re.compile(r'^nexus-node-(.+)$')
+
+AUTOSCALE_AUDIT_PATH = os.environ.get('AUTOSCALE_AUDIT_PATH', os.path.join(DATA_DIR, 'autoscale-audit.jsonl'))
+
+# Regex rules that turn prover output into throughput counters (defaults match the nexus CLI)
+THROUGHPUT_RULES = os.environ.get('THROUGHPUT_RULES', os.path.join(DATA_DIR, 'throughput-rules.yml'))
+
+# Docker client (if available)
+docker_client = None
+if DOCKER_AVAILABLE and not DOCKER_HOSTS:
+    try:
+        docker_client = docker.from_env()
+    except Exception:
+        DOCKER_AVAILABLE = False
+
+MEMORY_UNITS = {'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+def parse_memory_size(value) -> int:
+    """Convert a Docker-style memory size ('512m', '2g', 1073741824) to bytes"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().lower().rstrip('ib').rstrip('b') or '0'
+    unit = text[-1]
+    if unit in MEMORY_UNITS:
+        return int(float(text[:-1]) * MEMORY_UNITS[unit])
+    return int(float(text))
+
+def format_memory_size(num_bytes: int) -> str:
+    """Format a byte count as a Docker-style memory size"""
+    if num_bytes % MEMORY_UNITS['g'] == 0:
+        return f"{num_bytes // MEMORY_UNITS['g']}g"
+    return f"{max(1, -(-num_bytes // MEMORY_UNITS['m']))}m"
+
+CPUSET = re.compile(r'^\d+(-\d+)?(,\d+(-\d+)?)*$')
+
+def parse_cpuset(value: str) -> List[int]:
+    """CPU indexes of a cpuset string like '0-3,8'"""
+    if not CPUSET.match(value):
+        raise ValueError(f"Invalid cpuset: {value}")
+    cpus = []
+    for part in value.split(','):
+        first, _, last = part.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+def parse_cpu_quantity(value) -> float:
+    """Convert a Kubernetes CPU quantity ('250m', '2', '1500000n') to cores"""
+    text = str(value).strip()
+    suffixes = {'n': 1e-9, 'u': 1e-6, 'm': 1e-3}
+    if text and text[-1] in suffixes:
+        return float(text[:-1]) * suffixes[text[-1]]
+    return float(text or 0)
+
+def parse_number(data: Dict[str, Any], key: str, default, cast=float, minimum: float = 0):
+    """data[key] (default when absent) as a finite number of at least minimum; ValueError otherwise"""
+    value = data.get(key, default)
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    if not math.isfinite(number) or number < minimum:
+        raise ValueError(f"{key} must be a finite number of at least {minimum}")
+    return number
+
+class BlockingOffload:
+    """Bounded pool of native threads for blocking C calls (sqlite, compression, psutil scans, encoding)
+    
+    Under eventlet every thread, lock and socket is green, so only leaf work that takes no
+    locks of its own belongs here: callers hold their locks on the hub and offload the call.
+    Without a patched hub the call runs on the caller's thread, still bounded and measured.
+    """
+    
+    SAMPLES = 1000
+    
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_samples = []
+        self.run_samples = []
+        self.calls = {}
+        # Native idents of threads running offloaded work, so nested calls run inline
+        self.workers = set()
+        self.native_ident = eventlet.patcher.original('_thread').get_ident if EVENTLET_AVAILABLE else threading.get_ident
+        if self.hub_active():
+            tpool.set_num_threads(self.size)
+    
+    @staticmethod
+    def hub_active() -> bool:
+        return EVENTLET_AVAILABLE and eventlet.patcher.is_monkey_patched('thread')
+    
+    def run(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) on a pool thread and return its result"""
+        if self.native_ident() in self.workers:
+            return fn(*args, **kwargs)
+        name = getattr(fn, '__qualname__', None) or repr(fn)
+        submitted = time.monotonic()
+        started = []
+        
+        def work():
+            ident = self.native_ident()
+            self.workers.add(ident)
+            started.append(time.monotonic())
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.workers.discard(ident)
+        
+        with self.lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+        self.slots.acquire()
+        with self.lock:
+            self.waiting -= 1
+            self.running += 1
+        ok = False
+        try:
+            result = tpool.execute(work) if self.hub_active() else work()
+            ok = True
+            return result
+        finally:
+            self.slots.release()
+            finished = time.monotonic()
+            begun = started[0] if started else finished
+            self._record(name, begun - submitted, finished - begun, ok)
+    
+    def _record(self, name: str, waited: float, ran: float, ok: bool):
+        with self.lock:
+            self.running -= 1
+            self.completed += 1
+            self.failed += 0 if ok else 1
+            for samples, value in ((self.wait_samples, waited), (self.run_samples, ran)):
+                samples.append(value)
+                del samples[:-self.SAMPLES]
+            call = self.calls.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            call['count'] += 1
+            call['total'] += ran
+            call['max'] = max(call['max'], ran)
+    
+    @staticmethod
+    def _latency(samples: List[float]) -> Dict[str, Any]:
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 2) if ordered else None
+        return {'p50_ms': pick(0.5), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99),
+                'max_ms': round(ordered[-1] * 1000, 2) if ordered else None}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait and run time over the last SAMPLES calls, and the costliest call sites"""
+        with self.lock:
+            slowest = sorted(self.calls.items(), key=lambda item: item[1]['total'], reverse=True)[:10]
+            return {
+                'mode': 'tpool' if self.hub_active() else 'inline',
+                'size': self.size,
+                'running': self.running,
+                'waiting': self.waiting,
+                'peak_waiting': self.peak_waiting,
+                'completed': self.completed,
+                'failed': self.failed,
+                'wait': self._latency(self.wait_samples),
+                'run': self._latency(self.run_samples),
+                'calls': {name: {'count': c['count'], 'total_ms': round(c['total'] * 1000, 1),
+                                 'max_ms': round(c['max'] * 1000, 1)} for name, c in slowest}
+            }
+
+class LoopLagMonitor:
+    """Measure how late a short sleep on the eventlet hub wakes up; late wakes mean the hub was blocked"""
+    
+    SAMPLES = 1000
+    
+    def __init__(self, threshold: float, interval: float = LOOP_LAG_PROBE_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.samples = []
+        self.stalls = 0
+        self.last_stall = None
+        self.max_lag = 0.0
+    
+    def start_loop(self):
+        def loop():
+            while True:
+                before = time.monotonic()
+                time.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - before - self.interval)
+                with self.lock:
+                    self.samples.append(lag)
+                    del self.samples[:-self.SAMPLES]
+                    self.max_lag = max(self.max_lag, lag)
+                    if lag > self.threshold:
+                        self.stalls += 1
+                        self.last_stall = {'lag': round(lag, 3), 'at': datetime.now().isoformat()}
+                if lag > self.threshold:
+                    app.logger.warning(f"Event loop blocked for {lag:.2f}s (threshold {self.threshold}s)")
+        
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'threshold': self.threshold, 'stalls': self.stalls, 'last_stall': self.last_stall,
+                    'max_lag_ms': round(self.max_lag * 1000, 2), **BlockingOffload._latency(self.samples)}
+
+offload = BlockingOffload(OFFLOAD_POOL_SIZE)
+loop_lag = LoopLagMonitor(LOOP_LAG_THRESHOLD)
+
+class KubernetesBackend:
+    """Kubernetes API client for nexus workloads with a watch-backed pod cache"""
+    
+    SERVICE_ACCOUNT_DIR = '/var/run/secrets/kubernetes.io/serviceaccount'
+    POD_SELECTOR = 'app=nexus-cli'
+    
+    def __init__(self, api_server: str = None, namespace: str = None, token: str = None):
+        self.api_server = (api_server or K8S_API_SERVER or self._in_cluster_server()).rstrip('/')
+        self.namespace = namespace or K8S_NAMESPACE
+        self.image = os.environ.get('K8S_NEXUS_IMAGE', 'nexus-cli:latest')
+        
+        self.session = requests.Session()
+        token = token or os.environ.get('K8S_TOKEN') or self._read_service_account('token')
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        ca_file = os.path.join(self.SERVICE_ACCOUNT_DIR, 'ca.crt')
+        if os.environ.get('K8S_VERIFY_SSL', 'true').lower() == 'false':
+            self.session.verify = False
+        elif os.path.exists(ca_file):
+            self.session.verify = ca_file
+        
+        # Pod cache maintained by the watch thread
+        self.pods = {}
+        self.pods_lock = threading.Lock()
+        self.pods_synced = threading.Event()
+        self.resource_version = None
+        self.watch_thread = None
+        
+        # Pod metrics are not watchable, so they are refreshed on a TTL
+        self.pod_metrics = {}
+        self.pod_metrics_time = 0.0
+    
+    def _in_cluster_server(self) -> str:
+        host = os.environ.get('KUBERNETES_SERVICE_HOST')
+        port = os.environ.get('KUBERNETES_SERVICE_PORT', '443')
+        return f"https://{host}:{port}" if host else ''
+    
+    def _read_service_account(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.SERVICE_ACCOUNT_DIR, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_server)
+    
+    def request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Call the API server and return the decoded JSON body"""
+        kwargs.setdefault('timeout', K8S_REQUEST_TIMEOUT)
+        response = self.session.request(method, f"{self.api_server}{path}", **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+    
+    def ping(self) -> bool:
+        try:
+            self.request('GET', '/version')
+            return True
+        except Exception:
+            return False
+    
+    # Workloads
+    def _deployments_path(self, name: str = None) -> str:
+        path = f"/apis/apps/v1/namespaces/{self.namespace}/deployments"
+        return f"{path}/{name}" if name else path
+    
+    def workload_name(self, instance_id: str) -> str:
+        """Map a node ID or workload name to its Deployment name"""
+        if instance_id.startswith(('nexus-node-', 'nexus-multi-')):
+            return instance_id
+        return f"nexus-node-{instance_id}"
+    
+    def build_deployment(self, name: str, node_ids: List[str], threads: int, memory_limit,
+                         cpu_limit: float, replicas: int, labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """Build a Deployment manifest matching k8s/deployment.yaml"""
+        multi = len(node_ids) > 1
+        labels = {
+            **(labels or {}),
+            'app': 'nexus-cli',
+            'type': 'multi-instance' if multi else 'single-instance',
+            'nexus.workload': name
+        }
+        if multi:
+            env = {
+                'NODE_IDS': ','.join(node_ids),
+                'MAX_THREADS': str(threads),
+                'THREADS_PER_NODE': str(max(1, threads // len(node_ids))),
+                'CONTAINER_TYPE': 'multi'
+            }
+        else:
+            labels['nexus.node-id'] = node_ids[0]
+            env = {'NODE_ID': node_ids[0], 'MAX_THREADS': str(threads), 'CONTAINER_TYPE': 'single'}
+        env['NEXUS_ENVIRONMENT'] = 'production'
+        
+        memory_mi = max(1, parse_memory_size(memory_limit) // MEMORY_UNITS['m'])
+        return {
+            'apiVersion': 'apps/v1',
+            'kind': 'Deployment',
+            'metadata': {'name': name, 'namespace': self.namespace, 'labels': labels},
+            'spec': {
+                'replicas': replicas,
+                'selector': {'matchLabels': {'app': 'nexus-cli', 'nexus.workload': name}},
+                'template': {
+                    'metadata': {'labels': labels},
+                    'spec': {
+                        'containers': [{
+                            'name': 'nexus-cli',
+                            'image': self.image,
+                            'imagePullPolicy': 'IfNotPresent',
+                            'command': ['./scripts/start-multi.sh' if multi else './scripts/start-single.sh'],
+                            'env': [{'name': k, 'value': v} for k, v in env.items()],
+                            'resources': {'limits': {'cpu': str(cpu_limit), 'memory': f"{memory_mi}Mi"}},
+                            'volumeMounts': [
+                                {'name': 'nexus-data', 'mountPath': '/app/data'},
+                                {'name': 'nexus-logs', 'mountPath': '/app/logs'}
+                            ]
+                        }],
+                        'volumes': [
+                            {'name': 'nexus-data', 'emptyDir': {}},
+                            {'name': 'nexus-logs', 'emptyDir': {}}
+                        ],
+                        'terminationGracePeriodSeconds': 60 if multi else 30
+                    }
+                }
+            }
+        }
+    
+    def apply_workload(self, node_ids: List[str], threads: int = 4, memory_limit="2g",
+                       cpu_limit: float = 2.0, replicas: int = 1, labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """Create the workload for one node (or several sharing a pod), updating it if present"""
+        if len(node_ids) > 1:
+            name = f"nexus-multi-{'-'.join(node_ids[:2])}"
+        else:
+            name = self.workload_name(node_ids[0])
+        manifest = self.build_deployment(name, node_ids, threads, memory_limit, cpu_limit, replicas, labels)
+        try:
+            self.request('POST', self._deployments_path(), json=manifest)
+            created = True
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 409:
+                raise
+            self.request('PATCH', self._deployments_path(name), json=manifest,
+                         headers={'Content-Type': 'application/merge-patch+json'})
+            created = False
+        return {'name': name, 'created': created, 'replicas': replicas}
+    
+    def scale_workload(self, name: str, replicas: int) -> Dict[str, Any]:
+        return self.request('PATCH', f"{self._deployments_path(name)}/scale",
+                            json={'spec': {'replicas': replicas}},
+                            headers={'Content-Type': 'application/merge-patch+json'})
+    
+    def delete_pod(self, name: str, grace_period: int = None) -> Dict[str, Any]:
+        body = {'gracePeriodSeconds': grace_period} if grace_period is not None else None
+        return self.request('DELETE', f"/api/v1/namespaces/{self.namespace}/pods/{name}", json=body)
+    
+    def delete_workload(self, name: str) -> Dict[str, Any]:
+        return self.request('DELETE', self._deployments_path(name),
+                            json={'propagationPolicy': 'Background'})
+    
+    def list_deployments(self) -> List[Dict[str, Any]]:
+        result = self.request('GET', self._deployments_path(), params={'labelSelector': self.POD_SELECTOR})
+        return result.get('items', [])
+    
+    def list_workloads(self) -> List[Dict[str, Any]]:
+        return [{
+            'name': d['metadata']['name'],
+            'labels': d['metadata'].get('labels', {}),
+            'replicas': d['spec'].get('replicas', 0),
+            'ready_replicas': d.get('status', {}).get('readyReplicas', 0)
+        } for d in self.list_deployments()]
+    
+    # Pod cache
+    def start_watch(self):
+        """Start the background pod watch if it is not already running"""
+        if self.watch_thread and self.watch_thread.is_alive():
+            return
+        self.watch_thread = threading.Thread(target=self._watch_pods, name='k8s-pod-watch', daemon=True)
+        self.watch_thread.start()
+    
+    def _list_pods(self):
+        pod_list = self.request('GET', f"/api/v1/namespaces/{self.namespace}/pods",
+                                params={'labelSelector': self.POD_SELECTOR})
+        with self.pods_lock:
+            self.pods = {p['metadata']['name']: p for p in pod_list.get('items', [])}
+        self.resource_version = pod_list.get('metadata', {}).get('resourceVersion')
+        self.pods_synced.set()
+    
+    def _watch_pods(self):
+        """List once, then follow the watch stream; relist when the resource version expires"""
+        while True:
+            try:
+                if self.resource_version is None:
+                    self._list_pods()
+                
+                response = self.session.get(
+                    f"{self.api_server}/api/v1/namespaces/{self.namespace}/pods",
+                    params={
+                        'labelSelector': self.POD_SELECTOR,
+                        'watch': 'true',
+                        'allowWatchBookmarks': 'true',
+                        'resourceVersion': self.resource_version,
+                        'timeoutSeconds': K8S_WATCH_TIMEOUT
+                    },
+                    stream=True,
+                    timeout=(K8S_REQUEST_TIMEOUT, K8S_WATCH_TIMEOUT + K8S_REQUEST_TIMEOUT)
+                )
+                response.raise_for_status()
+                with response:
+                    for line in response.iter_lines():
+                        if line:
+                            self._apply_pod_event(json.loads(line))
+                        if self.resource_version is None:
+                            break
+            except Exception as e:
+                app.logger.warning(f"Kubernetes pod watch interrupted: {str(e)}")
+                self.resource_version = None
+                time.sleep(K8S_WATCH_RETRY)
+    
+    def _apply_pod_event(self, event: Dict[str, Any]):
+        event_type = event.get('type')
+        pod = event.get('object', {})
+        
+        if event_type == 'ERROR':
+            # 410 Gone: our resource version is too old, start over with a fresh list
+            app.logger.info(f"Kubernetes pod watch expired: {pod.get('message')}")
+            self.resource_version = None
+            return
+        
+        metadata = pod.get('metadata', {})
+        if metadata.get('resourceVersion'):
+            self.resource_version = metadata['resourceVersion']
+        if event_type == 'BOOKMARK':
+            return
+        
+        with self.pods_lock:
+            if event_type == 'DELETED':
+                self.pods.pop(metadata.get('name'), None)
+            else:
+                self.pods[metadata.get('name')] = pod
+    
+    def get_pods(self) -> List[Dict[str, Any]]:
+        """Cached pods; the first call starts the watch and waits for the initial list"""
+        self.start_watch()
+        self.pods_synced.wait(timeout=K8S_REQUEST_TIMEOUT)
+        with self.pods_lock:
+            return list(self.pods.values())
+    
+    def get_pod_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-pod CPU (cores) and memory (bytes) from metrics-server, cached for K8S_METRICS_TTL"""
+        if time.time() - self.pod_metrics_time < K8S_METRICS_TTL:
+            return self.pod_metrics
+        self.pod_metrics_time = time.time()
+        try:
+            result = self.request('GET', f"/apis/metrics.k8s.io/v1beta1/namespaces/{self.namespace}/pods",
+                                  params={'labelSelector': self.POD_SELECTOR})
+            metrics = {}
+            for item in result.get('items', []):
+                containers = item.get('containers', [])
+                metrics[item['metadata']['name']] = {
+                    'cpu': sum(parse_cpu_quantity(c['usage'].get('cpu', 0)) for c in containers),
+                    'memory': sum(parse_memory_size(c['usage'].get('memory', 0)) for c in containers)
+                }
+            self.pod_metrics = metrics
+        except Exception as e:
+            app.logger.debug(f"Kubernetes pod metrics unavailable: {str(e)}")
+        return self.pod_metrics
+    
+    def get_instances(self) -> List[Dict[str, Any]]:
+        """Pods as manager instance records"""
+        metrics = self.get_pod_metrics()
+        instances = []
+        for pod in self.get_pods():
+            metadata = pod.get('metadata', {})
+            status = pod.get('status', {})
+            labels = metadata.get('labels', {})
+            container_statuses = status.get('containerStatuses', [])
+            limits = pod.get('spec', {}).get('containers', [{}])[0].get('resources', {}).get('limits', {})
+            
+            stats = None
+            usage = metrics.get(metadata.get('name'))
+            if usage:
+                memory_limit = parse_memory_size(limits['memory']) if 'memory' in limits else 0
+                stats = {
+                    'cpu_percent': round(usage['cpu'] * 100, 2),
+                    'memory_usage': usage['memory'],
+                    'memory_limit': memory_limit,
+                    'memory_percent': round(usage['memory'] / memory_limit * 100, 2) if memory_limit else 0
+                }
+            
+            instances.append({
+                'node_id': labels.get('nexus.node-id', labels.get('nexus.workload', metadata.get('name'))),
+                'mode': 'k8s',
+                'pod_name': metadata.get('name'),
+                'workload': labels.get('nexus.workload'),
+                'namespace': metadata.get('namespace', self.namespace),
+                'host': pod.get('spec', {}).get('nodeName'),
+                'status': 'terminating' if metadata.get('deletionTimestamp') else status.get('phase', 'Unknown').lower(),
+                'ready': bool(container_statuses) and all(c.get('ready') for c in container_statuses),
+                'restarts': sum(c.get('restartCount', 0) for c in container_statuses),
+                'created': metadata.get('creationTimestamp'),
+                'started_at': status.get('startTime'),
+                'image': (pod.get('spec', {}).get('containers') or [{}])[0].get('image'),
+                'labels': labels,
+                'stats': stats
+            })
+        return instances
+    
+    def resolve_pod(self, instance_id: str) -> str:
+        """Find the pod for a pod name, workload name or node ID, preferring running pods"""
+        workload = self.workload_name(instance_id)
+        candidates = []
+        for pod in self.get_pods():
+            metadata = pod.get('metadata', {})
+            if metadata.get('name') == instance_id:
+                return instance_id
+            if metadata.get('labels', {}).get('nexus.workload') == workload:
+                candidates.append(pod)
+        if not candidates:
+            raise LookupError(f"No pod found for {instance_id}")
+        candidates.sort(key=lambda p: p.get('status', {}).get('phase') != 'Running')
+        return candidates[0]['metadata']['name']
+    
+    def stream_logs(self, instance_id: str, tail: int = 100, follow: bool = False, since_time: str = None):
+        """Open the log stream of the instance's pod and return an iterator of lines"""
+        pod_name = self.resolve_pod(instance_id)
+        params = {'timestamps': 'true', 'follow': 'true' if follow else 'false'}
+        params.update({'sinceTime': since_time} if since_time else {'tailLines': tail})
+        response = self.session.get(
+            f"{self.api_server}/api/v1/namespaces/{self.namespace}/pods/{pod_name}/log",
+            params=params,
+            stream=True,
+            timeout=(K8S_REQUEST_TIMEOUT, None if follow else K8S_REQUEST_TIMEOUT)
+        )
+        response.raise_for_status()
+        response.encoding = response.encoding or 'utf-8'
+        return response.iter_lines(decode_unicode=True)
+
+# Default record shapes for the list endpoints and pushes; ?fields=* returns everything
+SLIM_CONTAINER_FIELDS = ['id', 'name', 'host', 'status', 'image', 'created', 'labels.nexus.type',
+                         'labels.nexus.node-id', 'labels.nexus.node-ids', 'stats.cpu_percent',
+                         'stats.memory_usage', 'stats.memory_percent']
+SLIM_INSTANCE_FIELDS = ['node_id', 'mode', 'status', 'host', 'container_name', 'pod_name', 'pid', 'threads',
+                        'created', 'uptime', 'cpu_percent', 'memory_mb', 'stats.cpu_percent', 'stats.memory_usage',
+                        'stats.memory_percent', 'throughput.proofs_completed', 'throughput.task_failures', 'health']
+SLIM_METRICS_FIELDS = ['cpu_percent', 'memory', 'swap.percent', 'temperature', 'disk', 'load_avg', 'docker_hosts', 'docker_hosts_unreachable',
+                       'memory_percent', 'memory_used', 'memory_total']
+PAYLOAD_ENCODINGS = ('msgpack', 'zlib', 'json')
+
+def parse_fields(value: Optional[str], default: List[str]) -> Optional[List[str]]:
+    """Field list from a ?fields= argument: absent means the slim default, '*' means everything"""
+    if not value:
+        return default
+    if value.strip() == '*':
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+def project_fields(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the given fields; 'stats.cpu_percent' selects one key of a nested dict"""
+    if fields is None:
+        return record
+    projected = {}
+    for field in fields:
+        if field in record:
+            projected[field] = record[field]
+            continue
+        parent, _, child = field.partition('.')
+        if child and parent in record:
+            value = record[parent]
+            if value is None:
+                projected.setdefault(parent, None)
+            elif isinstance(value, dict) and child in value:
+                if projected.get(parent) is None:
+                    projected[parent] = {}
+                projected[parent][child] = value[child]
+    return projected
+
+def encode_payload(data: Any, encoding: str):
+    """Encode a push payload: json leaves it to Socket.IO, msgpack and zlib produce binary attachments"""
+    if encoding == 'msgpack':
+        return msgpack.packb(data, default=str)
+    if encoding == 'zlib':
+        return zlib.compress(json.dumps(data, default=str, separators=(',', ':')).encode('utf-8'), 6)
+    return data
+
+def instance_started_at(record: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds an instance or container record started, from whichever timestamp it carries"""
+    if record.get('start_time'):
+        return datetime.fromisoformat(record['start_time']).timestamp()
+    started = record.get('started_at') or (record.get('state') or {}).get('StartedAt') or record.get('created')
+    try:
+        return parse_log_timestamp(started) if started else None
+    except ValueError:
+        return None
+
+def record_uptime(record: Dict[str, Any]) -> float:
+    started = instance_started_at(record)
+    return time.time() - started if started and record.get('status') == 'running' else 0.0
+
+def record_cpu(record: Dict[str, Any]) -> float:
+    return (record.get('stats') or {}).get('cpu_percent', record.get('cpu_percent')) or 0.0
+
+def record_memory(record: Dict[str, Any]) -> float:
+    return (record.get('stats') or {}).get('memory_usage') or (record.get('memory_mb') or 0) * 1024 * 1024
+
+def record_throughput(record: Dict[str, Any]) -> float:
+    throughput = record.get('throughput') or {}
+    return throughput.get('windows', {}).get('5m', {}).get('proofs_per_minute') or 0.0
+
+INVENTORY_SORT_KEYS = {
+    'node_id': lambda r: str(r.get('node_id') or r.get('name')),
+    'name': lambda r: str(r.get('name') or r.get('container_name') or r.get('node_id')),
+    'cpu': record_cpu,
+    'memory': record_memory,
+    'uptime': record_uptime,
+    'throughput': record_throughput
+}
+
+def record_node_ids(record: Dict[str, Any]) -> List[str]:
+    labels = record.get('labels') or {}
+    node_ids = [record.get('node_id'), labels.get('nexus.node-id')] + labels.get('nexus.node-ids', '').split(',')
+    return [str(n) for n in node_ids if n]
+
+def query_inventory(records: List[Dict[str, Any]], args, key_fn) -> Dict[str, Any]:
+    """Filter, sort and page in-memory records.
+
+    Filters: mode, status (comma lists), node (node id prefix), label (key or key=value).
+    Paging is keyset-based: the cursor holds the last item's sort value and key, so pages
+    stay stable while instances come and go.
+    """
+    modes = {m for m in (args.get('mode') or '').split(',') if m}
+    statuses = {s for s in (args.get('status') or '').split(',') if s}
+    node_prefix = args.get('node')
+    label_key, _, label_value = (args.get('label') or '').partition('=')
+    
+    matched = []
+    for record in records:
+        if modes and record.get('mode', 'docker') not in modes:
+            continue
+        if statuses and record.get('status') not in statuses:
+            continue
+        if node_prefix and not any(n.startswith(node_prefix) for n in record_node_ids(record)):
+            continue
+        if label_key:
+            labels = record.get('labels') or {}
+            if label_key not in labels or (label_value and labels[label_key] != label_value):
+                continue
+        matched.append(record)
+    
+    sort = args.get('sort', 'node_id')
+    if sort not in INVENTORY_SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(INVENTORY_SORT_KEYS)}")
+    descending = args.get('order', 'desc' if sort in ('cpu', 'memory', 'uptime', 'throughput') else 'asc') == 'desc'
+    value_fn = INVENTORY_SORT_KEYS[sort]
+    keyed = sorted(((value_fn(r), key_fn(r), r) for r in matched), key=lambda item: item[:2], reverse=descending)
+    
+    cursor = args.get('cursor')
+    if cursor:
+        try:
+            position = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode()).decode()))
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        keyed = [item for item in keyed if (item[:2] < position if descending else item[:2] > position)]
+    
+    limit = args.get('limit')
+    next_cursor = None
+    if limit:
+        limit = max(1, min(int(limit), 1000))
+        if len(keyed) > limit:
+            last = keyed[limit - 1]
+            next_cursor = base64.urlsafe_b64encode(json.dumps([last[0], last[1]]).encode()).decode()
+        keyed = keyed[:limit]
+    
+    return {'items': [item[2] for item in keyed], 'matched': len(matched), 'next_cursor': next_cursor}
+
+def inventory_summary(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fleet totals for dashboard headers"""
+    by_status, by_mode = {}, {}
+    for record in records:
+        by_status[record.get('status')] = by_status.get(record.get('status'), 0) + 1
+        mode = record.get('mode', 'docker')
+        by_mode[mode] = by_mode.get(mode, 0) + 1
+    return {
+        'total': len(records),
+        'running': by_status.get('running', 0),
+        'by_status': by_status,
+        'by_mode': by_mode,
+        'cpu_percent': round(sum(record_cpu(r) for r in records), 2),
+        'memory_bytes': int(sum(record_memory(r) for r in records)),
+        'proofs_per_minute': round(sum(record_throughput(r) for r in records), 3)
+    }
+
+def container_node_id(labels: Dict[str, str], name: str) -> Optional[str]:
+    """Node ID of a single-instance container; labels are fixed at create, so warm-pool containers carry it in their name"""
+    if labels.get('nexus.node-id'):
+        return labels['nexus.node-id']
+    match = NODE_CONTAINER_NAME.match(name) if WARM_POOL_LABEL in labels else None
+    return match.group(1) if match else None
+
+def canonical_hash(payload: Any) -> str:
+    """sha256 of payload as canonical JSON (sorted keys, non-JSON values as str)"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def config_fingerprint(spec: Dict[str, Any], image_id: str) -> str:
+    """Stable hash of a container's create parameters and the image ID they resolve to.
+
+    The node's identity (name, NODE_ID, node-id label, volume names) is left out: the name
+    already pins the node, and a warm-pool spare only learns it after it is created.
+    """
+    labels = {k: v for k, v in spec.get('labels', {}).items()
+              if k not in (CONFIG_FINGERPRINT_LABEL, WARM_POOL_LABEL, 'nexus.node-id')}
+    environment = {k: v for k, v in spec.get('environment', {}).items() if k != 'NODE_ID'}
+    volumes = sorted(volume['bind'] for volume in (spec.get('volumes') or {}).values())
+    memory = parse_memory_size(spec['mem_limit']) if spec.get('mem_limit') else None
+    return canonical_hash({**spec, 'name': None, 'labels': labels, 'environment': environment, 'volumes': volumes,
+                           'mem_limit': memory, 'image': image_id})[:16]
+
+def is_warm_spare(labels: Dict[str, str], name: str) -> bool:
+    """Warm-pool container not yet bound to a node"""
+    return WARM_POOL_LABEL in labels and name.startswith(WarmPool.PREFIX)
+
+def container_cpu_limit(host_config: Dict[str, Any]) -> Optional[float]:
+    """CPU cores a container may use, from NanoCpus or quota/period; None when unlimited"""
+    if host_config.get('NanoCpus'):
+        return host_config['NanoCpus'] / 1e9
+    if (host_config.get('CpuQuota') or 0) > 0:
+        return host_config['CpuQuota'] / (host_config.get('CpuPeriod') or 100000)
+    return None
+
+COMPOSE_VARIABLE = re.compile(r'\$(?:(\$)|\{([A-Za-z_][A-Za-z0-9_]*)(?:(:?[-?])([^}]*))?\}|([A-Za-z_][A-Za-z0-9_]*))')
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(us|ms|h|m|s)')
+# Short-syntax compose port: [[ip:]host:]container[/protocol], with IPv6 addresses in brackets
+COMPOSE_PORT = re.compile(r'^(?:(?:(?P<ip>\[[^\]]+\]|[^:\[\]]+):)?(?P<host>\d*):)?(?P<container>\d+)(?P<protocol>/(?:tcp|udp|sctp))?$')
+DURATION_NS = {'us': 1e3, 'ms': 1e6, 's': 1e9, 'm': 60e9, 'h': 3600e9}
+
+def parse_duration_ns(value) -> int:
+    """Convert a compose duration ('30s', '1m30s') to nanoseconds"""
+    if isinstance(value, (int, float)):
+        return int(value * 1e9)
+    return int(sum(float(n) * DURATION_NS[unit] for n, unit in DURATION_PART.findall(str(value))))
+
+class ComposeExecutor:
+    """In-process docker-compose: parses compose files once and applies them through the Docker SDK"""
+    
+    def __init__(self, compose_dir: str, project: str, client_factory):
+        self.compose_dir = compose_dir
+        self.project = project
+        self.client_factory = client_factory
+        self.model_cache = {}
+        self.cache_lock = threading.Lock()
+    
+    # Model loading
+    def _environment(self) -> Dict[str, str]:
+        """Variables for interpolation: the project .env file overridden by the process environment"""
+        env = {}
+        env_file = os.path.join(self.compose_dir, '.env')
+        if os.path.exists(env_file):
+            with open(env_file) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        env[key.strip()] = value.strip().strip('\'"')
+        env.update(os.environ)
+        return env
+    
+    def _interpolate(self, value, env: Dict[str, str]):
+        if isinstance(value, dict):
+            return {k: self._interpolate(v, env) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._interpolate(v, env) for v in value]
+        if not isinstance(value, str):
+            return value
+        
+        def substitute(match):
+            escaped, name, operator, argument, bare_name = match.groups()
+            if escaped:
+                return '$'
+            name = name or bare_name
+            current = env.get(name)
+            if operator == ':-':
+                return current if current else argument
+            if operator == '-':
+                return current if current is not None else argument
+            if operator in (':?', '?') and (current is None or (operator == ':?' and not current)):
+                raise ValueError(argument or f"Variable {name} is required")
+            return current or ''
+        
+        return COMPOSE_VARIABLE.sub(substitute, value)
+    
+    def load(self, filename: str = 'docker-compose.yml') -> Dict[str, Any]:
+        """Parsed and interpolated compose model, re-read only when the file or .env changes"""
+        path = os.path.join(self.compose_dir, filename)
+        env_file = os.path.join(self.compose_dir, '.env')
+        key = (os.path.getmtime(path), os.path.getmtime(env_file) if os.path.exists(env_file) else None)
+        
+        with self.cache_lock:
+            cached = self.model_cache.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+        
+        with open(path) as f:
+            model = self._interpolate(yaml.safe_load(f) or {}, self._environment())
+        model.setdefault('services', {})
+        with self.cache_lock:
+            self.model_cache[path] = (key, model)
+        return model
+    
+    def select_services(self, model: Dict[str, Any], profiles: List[str] = None,
+                        services: List[str] = None) -> List[str]:
+        """Services enabled by the profiles (or named explicitly) plus their dependencies"""
+        profiles = set(profiles or [])
+        if services:
+            selected = list(services)
+        else:
+            selected = [name for name, spec in model['services'].items()
+                        if not spec.get('profiles') or profiles.intersection(spec['profiles'])]
+        
+        result = []
+        pending = list(selected)
+        while pending:
+            name = pending.pop()
+            if name in result:
+                continue
+            if name not in model['services']:
+                raise ValueError(f"Unknown service: {name}")
+            result.append(name)
+            pending.extend(self._depends_on(model['services'][name]))
+        return result
+    
+    def _depends_on(self, spec: Dict[str, Any]) -> List[str]:
+        depends = spec.get('depends_on', [])
+        return list(depends) if isinstance(depends, (list, dict)) else []
+    
+    # Resource naming (matches docker-compose so existing stacks are adopted)
+    def network_name(self, model: Dict[str, Any], key: str) -> str:
+        spec = (model.get('networks') or {}).get(key) or {}
+        return spec.get('name') or f"{self.project}_{key}"
+    
+    def volume_name(self, model: Dict[str, Any], key: str) -> str:
+        spec = (model.get('volumes') or {}).get(key) or {}
+        return spec.get('name') or f"{self.project}_{key}"
+    
+    def container_name(self, name: str, spec: Dict[str, Any]) -> str:
+        return spec.get('container_name') or f"{self.project}-{name}-1"
+    
+    def image_name(self, name: str, spec: Dict[str, Any]) -> str:
+        return spec.get('image') or f"{self.project}-{name}"
+    
+    def container_config(self, model: Dict[str, Any], name: str) -> Dict[str, Any]:
+        """Translate a compose service into containers.create() arguments"""
+        spec = model['services'][name]
+        
+        environment = spec.get('environment') or {}
+        if isinstance(environment, list):
+            environment = dict(item.split('=', 1) if '=' in item else (item, '') for item in environment)
+        
+        volumes = {}
+        for entry in spec.get('volumes', []):
+            if not isinstance(entry, str):
+                raise ValueError(f"Service {name}: long-syntax volume {entry} is not supported; use 'source:target[:mode]'")
+            if ':' not in entry:
+                raise ValueError(f"Service {name}: anonymous volume {entry} is not supported; name it as 'source:{entry}'")
+            source, _, rest = entry.partition(':')
+            target, _, mode = rest.partition(':')
+            if source.startswith(('.', '/', '~')):
+                source = os.path.abspath(os.path.join(self.compose_dir, os.path.expanduser(source)))
+            else:
+                source = self.volume_name(model, source)
+            volumes[source] = {'bind': target, 'mode': mode or 'rw'}
+        
+        ports = {}
+        for entry in spec.get('ports', []):
+            if isinstance(entry, dict):
+                raise ValueError(f"Service {name}: long-syntax port {entry} is not supported; use '[[ip:]host:]container[/protocol]'")
+            match = COMPOSE_PORT.match(str(entry))
+            if not match:
+                raise ValueError(f"Service {name}: unsupported port {entry}; use '[[ip:]host:]container[/protocol]'")
+            host_port = int(match['host']) if match['host'] else None
+            if match['ip']:
+                ip = match['ip'].strip('[]')
+                binding = (ip, host_port) if host_port else (ip,)
+            else:
+                binding = host_port
+            key = f"{match['container']}{match['protocol'] or '/tcp'}"
+            if key in ports:
+                # The same container port can be published more than once
+                previous = ports[key]
+                ports[key] = (previous if isinstance(previous, list) else [previous]) + [binding]
+            else:
+                ports[key] = binding
+        
+        networks = spec.get('networks') or ['default']
+        labels = spec.get('labels') or {}
+        if isinstance(labels, list):
+            labels = dict(item.split('=', 1) for item in labels)
+        labels = {
+            **{str(k): str(v) for k, v in labels.items()},
+            'com.docker.compose.project': self.project,
+            'com.docker.compose.service': name
+        }
+        
+        config = {
+            'image': self.image_name(name, spec),
+            'name': self.container_name(name, spec),
+            'command': spec.get('command'),
+            'environment': {str(k): str(v) for k, v in environment.items()},
+            'volumes': volumes,
+            'ports': ports,
+            'labels': labels,
+            'network': self.network_name(model, list(networks)[0]),
+            'extra_networks': [self.network_name(model, n) for n in list(networks)[1:]]
+        }
+        
+        restart = spec.get('restart')
+        if restart and restart != 'no':
+            config['restart_policy'] = {'Name': restart}
+        
+        healthcheck = spec.get('healthcheck')
+        if healthcheck and not healthcheck.get('disable'):
+            test = healthcheck.get('test')
+            config['healthcheck'] = {
+                'test': test if isinstance(test, list) else ['CMD-SHELL', test],
+                'interval': parse_duration_ns(healthcheck.get('interval', '30s')),
+                'timeout': parse_duration_ns(healthcheck.get('timeout', '30s')),
+                'retries': int(healthcheck.get('retries', 3)),
+                'start_period': parse_duration_ns(healthcheck.get('start_period', '0s'))
+            }
+        
+        resources = (spec.get('deploy') or {}).get('resources') or {}
+        limits = resources.get('limits') or {}
+        reservations = resources.get('reservations') or {}
+        if limits.get('cpus'):
+            config['nano_cpus'] = int(float(limits['cpus']) * 1e9)
+        if limits.get('memory'):
+            config['mem_limit'] = parse_memory_size(limits['memory'])
+        if reservations.get('memory'):
+            config['mem_reservation'] = parse_memory_size(reservations['memory'])
+        
+        for key in ('entrypoint', 'working_dir', 'user', 'hostname'):
+            if spec.get(key):
+                config[key] = spec[key]
+        return config
+    
+    def config_hash(self, config: Dict[str, Any], image_id: str) -> str:
+        """Stable fingerprint of the create arguments and the image they use"""
+        return canonical_hash({'config': config, 'image_id': image_id})
+    
+    # Execution
+    def _ensure_image(self, client, name: str, spec: Dict[str, Any]):
+        image_name = self.image_name(name, spec)
+        try:
+            return client.images.get(image_name)
+        except NotFound:
+            build = spec.get('build')
+            if not build:
+                return client.images.pull(image_name)
+            if isinstance(build, str):
+                build = {'context': build}
+            image, _ = client.images.build(
+                path=os.path.join(self.compose_dir, build.get('context', '.')),
+                dockerfile=build.get('dockerfile', 'Dockerfile'),
+                tag=image_name,
+                rm=True,
+                timeout=IMAGE_BUILD_TIMEOUT
+            )
+            return image
+    
+    def _ensure_resources(self, client, model: Dict[str, Any], services: List[str]):
+        """Create the networks and named volumes the selected services use"""
+        network_keys, volume_keys = set(), set()
+        for name in services:
+            spec = model['services'][name]
+            network_keys.update(spec.get('networks') or ['default'])
+            for entry in spec.get('volumes', []):
+                source = entry.split(':', 1)[0]
+                if not source.startswith(('.', '/', '~')):
+                    volume_keys.add(source)
+        
+        for key in network_keys:
+            spec = (model.get('networks') or {}).get(key) or {}
+            network_name = self.network_name(model, key)
+            if spec.get('external'):
+                continue
+            try:
+                client.networks.get(network_name)
+            except NotFound:
+                client.networks.create(network_name, driver=spec.get('driver', 'bridge'),
+                                       labels={'com.docker.compose.project': self.project,
+                                               'com.docker.compose.network': key})
+        
+        for key in volume_keys:
+            spec = (model.get('volumes') or {}).get(key) or {}
+            volume_name = self.volume_name(model, key)
+            if spec.get('external'):
+                continue
+            try:
+                client.volumes.get(volume_name)
+            except NotFound:
+                client.volumes.create(volume_name, driver=spec.get('driver', 'local'),
+                                      labels={'com.docker.compose.project': self.project,
+                                              'com.docker.compose.volume': key})
+    
+    def _apply_service(self, client, model: Dict[str, Any], name: str) -> Dict[str, Any]:
+        """Create, recreate, start or keep one service container depending on its config hash"""
+        started = time.time()
+        spec = model['services'][name]
+        image = self._ensure_image(client, name, spec)
+        config = self.container_config(model, name)
+        extra_networks = config.pop('extra_networks')
+        config_hash = self.config_hash(config, image.id)
+        config['labels']['com.docker.compose.config-hash'] = config_hash
+        
+        action = 'created'
+        try:
+            existing = client.containers.get(config['name'])
+            if existing.labels.get('com.docker.compose.config-hash') == config_hash:
+                if existing.status != 'running':
+                    existing.start()
+                    action = 'started'
+                else:
+                    action = 'unchanged'
+                return {'action': action, 'container': config['name'], 'seconds': round(time.time() - started, 3)}
+            existing.remove(force=True)
+            action = 'recreated'
+        except NotFound:
+            pass
+        
+        container = client.containers.create(**config)
+        for network_name in extra_networks:
+            client.networks.get(network_name).connect(container)
+        container.start()
+        return {'action': action, 'container': config['name'], 'seconds': round(time.time() - started, 3)}
+    
+    def up(self, filename: str = 'docker-compose.yml', profiles: List[str] = None,
+           services: List[str] = None) -> Dict[str, Any]:
+        """Bring up services, starting each one as soon as its dependencies are up"""
+        client = self.client_factory()
+        model = self.load(filename)
+        selected = self.select_services(model, profiles, services)
+        self._ensure_resources(client, model, selected)
+        
+        results, errors = {}, {}
+        remaining = {name: set(self._depends_on(model['services'][name])) & set(selected) for name in selected}
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=COMPOSE_PARALLELISM, thread_name_prefix='compose') as executor:
+            while remaining or running:
+                for name, deps in list(remaining.items()):
+                    failed = [d for d in deps if d in errors]
+                    if failed:
+                        errors[name] = f"Dependency {failed[0]} failed"
+                        del remaining[name]
+                    elif not deps - set(results):
+                        running[executor.submit(self._apply_service, client, model, name)] = name
+                        del remaining[name]
+                
+                if not running:
+                    # Whatever is left waits on a cycle
+                    for name in remaining:
+                        errors[name] = 'Circular dependency'
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        errors[name] = str(e)
+        
+        return {'services': results, 'errors': errors}
+    
+    def down(self, filename: str = 'docker-compose.yml') -> Dict[str, Any]:
+        """Stop and remove every container of the project in parallel, then its networks"""
+        client = self.client_factory()
+        containers = client.containers.list(all=True, filters={'label': f'com.docker.compose.project={self.project}'})
+        
+        def remove(container):
+            if container.status == 'running':
+                container.stop()
+            container.remove(force=True)
+            return container.name
+        
+        removed, errors = [], {}
+        with ThreadPoolExecutor(max_workers=COMPOSE_PARALLELISM, thread_name_prefix='compose') as executor:
+            futures = {executor.submit(remove, c): c.name for c in containers}
+            for future in futures:
+                try:
+                    removed.append(future.result())
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+        
+        model = self.load(filename)
+        for key, spec in (model.get('networks') or {'default': {}}).items():
+            if (spec or {}).get('external'):
+                continue
+            try:
+                client.networks.get(self.network_name(model, key)).remove()
+            except Exception:
+                # Still in use by containers outside the project, or already gone
+                pass
+        
+        return {'removed': removed, 'errors': errors}
+
+def parse_log_timestamp(value: str) -> float:
+    """Epoch seconds for an RFC3339 log timestamp, keeping nanosecond digits Python can't parse"""
+    value = value.rstrip('Z').replace('z', '')
+    offset = 0.0
+    match = re.search(r'([+-])(\d\d):(\d\d)$', value)
+    if match:
+        value = value[:match.start()]
+        offset = (int(match.group(2)) * 3600 + int(match.group(3)) * 60) * (1 if match.group(1) == '+' else -1)
+    seconds, _, fraction = value.partition('.')
+    epoch = datetime.fromisoformat(seconds).replace(tzinfo=timezone.utc).timestamp()
+    return epoch - offset + (float(f'0.{fraction}') if fraction else 0.0)
+
+def parse_time_bound(value) -> Optional[float]:
+    """Epoch seconds from an epoch number, ISO timestamp or age like '15m'"""
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if re.fullmatch(r'(?:\d+(?:\.\d+)?(?:us|ms|h|m|s))+', str(value)):
+        return time.time() - parse_duration_ns(value) / 1e9
+    return parse_log_timestamp(str(value))
+
+LOG_LINE_TIMESTAMP = re.compile(rb'^\[?(\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:\d\d)?)')
+
+class AdoptedProcess:
+    """Popen-like handle for a native process started by an earlier manager run.
+
+    It is not our child, so its exit code is unknown; returncode is -1 once it has exited.
+    """
+    
+    def __init__(self, ps_process: 'psutil.Process', cmdline: List[str]):
+        self.ps_process = ps_process
+        self.pid = ps_process.pid
+        self.args = cmdline
+        self.returncode = None
+    
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            try:
+                running = self.ps_process.is_running() and self.ps_process.status() != psutil.STATUS_ZOMBIE
+            except psutil.NoSuchProcess:
+                running = False
+            if not running:
+                self.returncode = -1
+        return self.returncode
+    
+    def wait(self, timeout: float = None) -> int:
+        # Poll rather than psutil's wait, which doesn't count a zombie nobody reaps as exited
+        deadline = time.time() + timeout if timeout is not None else None
+        while self.poll() is None:
+            if deadline is not None and time.time() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(0.1)
+        return self.returncode
+    
+    def send_signal(self, sig):
+        self.ps_process.send_signal(sig)
+    
+    def terminate(self):
+        self.ps_process.terminate()
+    
+    def kill(self):
+        self.ps_process.kill()
+
+class LogTail:
+    """Memory-mapped reader for one log file: reverse tail, cursor follow and time seek.
+
+    Cursors are "inode:offset" strings pointing just past the last complete line returned,
+    so a rotated or truncated file is detected by its inode or size on the next read.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def _map(self, path: str):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if not stat.st_size:
+                return None, stat.st_ino
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), stat.st_ino
+    
+    @staticmethod
+    def _decode(data: bytes) -> List[str]:
+        return data.decode('utf-8', errors='replace').splitlines()
+    
+    def tail(self, count: int = 100) -> tuple:
+        """Last count complete lines, scanning backward from EOF; returns (lines, cursor)"""
+        mm, inode = self._map(self.path)
+        if mm is None:
+            return [], f'{inode}:0'
+        with mm:
+            end = mm.rfind(b'\n') + 1
+            start = end - 1
+            for _ in range(count):
+                start = mm.rfind(b'\n', 0, start)
+                if start < 0:
+                    break
+            return self._decode(mm[start + 1:end]), f'{inode}:{end}'
+    
+    def _rotated(self, inode: int) -> Optional[str]:
+        """The rotated-away file that still has the cursor's inode (app.log.1, app.log-20240101...)"""
+        directory, name = os.path.split(self.path)
+        for candidate in os.listdir(directory or '.'):
+            if candidate != name and candidate.startswith(name):
+                path = os.path.join(directory, candidate)
+                if os.stat(path).st_ino == inode and not candidate.endswith('.gz'):
+                    return path
+        return None
+    
+    def _read_from(self, path: str, offset: int, limit: Optional[int]) -> tuple:
+        # (lines, end offset) for complete lines after offset, at most limit of them
+        mm, _ = self._map(path)
+        if mm is None:
+            return [], 0
+        with mm:
+            end = mm.rfind(b'\n') + 1
+            if end <= offset:
+                return [], offset
+            if limit is not None:
+                stop = offset
+                for _ in range(limit):
+                    stop = mm.find(b'\n', stop, end) + 1
+                    if stop <= 0 or stop >= end:
+                        stop = end
+                        break
+                end = stop
+            return self._decode(mm[offset:end]), end
+    
+    def read_after(self, cursor: Optional[str] = None, limit: int = None) -> tuple:
+        """Complete lines after a cursor, following rotation; returns (lines, cursor)"""
+        stat = os.stat(self.path)
+        inode, _, offset = (cursor or f'{stat.st_ino}:0').partition(':')
+        inode, offset = int(inode), int(offset)
+        
+        lines = []
+        if inode != stat.st_ino:
+            # Finish the rotated file first, then start the new one from the top
+            rotated = self._rotated(inode)
+            if rotated:
+                lines, end = self._read_from(rotated, offset, limit)
+                if limit is not None and len(lines) >= limit:
+                    return lines, f'{inode}:{end}'
+            offset = 0
+        elif offset > stat.st_size:
+            # Truncated in place
+            offset = 0
+        
+        more, end = self._read_from(self.path, offset, None if limit is None else limit - len(lines))
+        return lines + more, f'{stat.st_ino}:{end}'
+    
+    def _line_time(self, mm, position: int) -> tuple:
+        # (timestamp, line start) of the first timestamped line at or after position
+        size = len(mm)
+        while position < size:
+            match = LOG_LINE_TIMESTAMP.match(mm[position:position + 64])
+            if match:
+                try:
+                    return parse_log_timestamp(match.group(1).decode().replace(' ', 'T')), position
+                except ValueError:
+                    pass
+            position = mm.find(b'\n', position) + 1
+            if position <= 0:
+                break
+        return None, size
+    
+    def seek_time(self, since: float) -> str:
+        """Cursor for the first line stamped at or after since, by binary search over the file"""
+        mm, inode = self._map(self.path)
+        if mm is None:
+            return f'{inode}:0'
+        with mm:
+            low, high = 0, len(mm)
+            while low < high:
+                middle = (low + high) // 2
+                line_start = mm.rfind(b'\n', 0, middle) + 1
+                ts, found = self._line_time(mm, line_start)
+                if ts is None or ts >= since:
+                    high = line_start
+                else:
+                    next_line = mm.find(b'\n', found)
+                    low = next_line + 1 if next_line >= 0 else len(mm)
+            return f'{inode}:{low}'
+
+class LogIndex:
+    """SQLite FTS5 index of fleet logs, fed incrementally from per-source cursors"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS log_entries (
+            id INTEGER PRIMARY KEY,
+            node TEXT NOT NULL,
+            source TEXT NOT NULL,
+            ts REAL NOT NULL,
+            line TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS log_entries_ts ON log_entries (ts);
+        CREATE INDEX IF NOT EXISTS log_entries_node_ts ON log_entries (node, ts);
+        CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5 (line, content='log_entries', content_rowid='id');
+        CREATE TRIGGER IF NOT EXISTS log_entries_ai AFTER INSERT ON log_entries BEGIN
+            INSERT INTO log_fts (rowid, line) VALUES (new.id, new.line);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_entries_ad AFTER DELETE ON log_entries BEGIN
+            INSERT INTO log_fts (log_fts, rowid, line) VALUES ('delete', old.id, old.line);
+        END;
+        CREATE TABLE IF NOT EXISTS log_cursors (
+            source TEXT PRIMARY KEY,
+            position TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, manager, path: str):
+        self.manager = manager
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+        self.db_lock = threading.Lock()
+        self.ingest_lock = threading.Lock()
+        self.cursors = dict(self.db.execute('SELECT source, position FROM log_cursors'))
+        # Source -> timestamp of its newest indexed line; container and pod cursors already are one
+        self.last_seen = {}
+        for source, position in self.cursors.items():
+            if not source.startswith('native:'):
+                self.last_seen[source] = float(position)
+        # Callables fed (node, rows) for every batch of new lines
+        self.stages = []
+        self.last_ingest = None
+        self.loop_thread = None
+    
+    # Readers: each returns (rows, new cursor) where rows are (ts, line)
+    def _read_container(self, container, cursor: Optional[str]):
+        since = float(cursor) if cursor else None
+        if since is None:
+            raw = container.logs(timestamps=True, tail=LOG_INDEX_BACKFILL)
+        else:
+            raw = container.logs(timestamps=True, since=since)
+        rows = []
+        for entry in raw.decode('utf-8', errors='replace').splitlines():
+            stamp, _, line = entry.partition(' ')
+            try:
+                ts = parse_log_timestamp(stamp)
+            except ValueError:
+                continue
+            # `since` is inclusive at second granularity on older daemons
+            if since is None or ts > since:
+                rows.append((ts, line))
+        return rows, str(rows[-1][0]) if rows else cursor
+    
+    def _read_pod(self, pod_name: str, cursor: Optional[str]):
+        since = float(cursor) if cursor else None
+        since_time = datetime.fromtimestamp(since, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ') if since else None
+        rows = []
+        for entry in self.manager.k8s.stream_logs(pod_name, LOG_INDEX_BACKFILL, since_time=since_time):
+            stamp, _, line = entry.partition(' ')
+            try:
+                ts = parse_log_timestamp(stamp)
+            except ValueError:
+                continue
+            if since is None or ts > since:
+                rows.append((ts, line))
+        return rows, str(rows[-1][0]) if rows else cursor
+    
+    def _read_file(self, path: str, cursor: Optional[str]):
+        if not os.path.exists(path):
+            return [], cursor
+        lines, cursor = LogTail(path).read_after(cursor)
+        now = time.time()
+        return [(now, line) for line in lines if line], cursor
+    
+    def _sources(self) -> List[tuple]:
+        """(source, node, reader) for every log the fleet currently produces"""
+        manager = self.manager
+        sources = []
+        
+        with manager.native_process_lock:
+            native = [(node_id, info.get('log_path')) for node_id, info in manager.native_processes.items()]
+        for node_id, log_path in native:
+            if log_path:
+                sources.append((f'native:{node_id}', node_id, lambda c, p=log_path: self._read_file(p, c)))
+        
+        def list_host(host, client):
+            return client.containers.list(all=True, filters={'label': 'nexus.type'})
+        
+        for host, containers in manager.map_docker_hosts(list_host).items():
+            for container in containers:
+                source = f'docker:{host}:{container.name}'
+                labels = container.labels
+                if is_warm_spare(labels, container.name):
+                    continue
+                node = container_node_id(labels, container.name) or labels.get('nexus.node-ids') or container.name
+                cursor = self.cursors.get(source)
+                if container.status != 'running' and cursor:
+                    # Stopped containers only need one last pass after they exit
+                    finished = container.attrs.get('State', {}).get('FinishedAt', '')
+                    try:
+                        if parse_log_timestamp(finished) <= float(cursor):
+                            continue
+                    except ValueError:
+                        pass
+                sources.append((source, node, lambda c, k=container: self._read_container(k, c)))
+        
+        if manager.capabilities['k8s']:
+            for instance in manager.k8s.get_instances():
+                if instance['status'] in ('running', 'succeeded', 'failed'):
+                    sources.append((f"k8s:{instance['pod_name']}", instance['node_id'],
+                                    lambda c, p=instance['pod_name']: self._read_pod(p, c)))
+        return sources
+    
+    def ingest(self) -> Dict[str, Any]:
+        """Pull everything new since each source's cursor into the index"""
+        if not self.ingest_lock.acquire(blocking=False):
+            return {'success': False, 'error': 'Ingest already in progress'}
+        try:
+            started = time.time()
+            sources = self._sources()
+            
+            def read(source):
+                name, node, reader = source
+                try:
+                    rows, cursor = reader(self.cursors.get(name))
+                    return name, node, rows, cursor, None
+                except Exception as e:
+                    return name, node, [], None, str(e)
+            
+            batches, errors = [], {}
+            with ThreadPoolExecutor(max_workers=LOG_INDEX_PARALLELISM, thread_name_prefix='log-index') as executor:
+                for name, node, rows, cursor, error in executor.map(read, sources):
+                    if error:
+                        errors[name] = error
+                    elif cursor is not None:
+                        batches.append((name, node, rows, cursor))
+            
+            # One transaction per pass keeps FTS segment merges cheap
+            def write():
+                written = 0
+                self.db.execute('BEGIN')
+                try:
+                    for name, node, rows, cursor in batches:
+                        self.db.executemany(
+                            'INSERT INTO log_entries (node, source, ts, line) VALUES (?, ?, ?, ?)',
+                            [(node, name, ts, line) for ts, line in rows]
+                        )
+                        self.db.execute('INSERT OR REPLACE INTO log_cursors (source, position) VALUES (?, ?)',
+                                        (name, cursor))
+                        written += len(rows)
+                    self.db.execute('COMMIT')
+                except Exception:
+                    self.db.execute('ROLLBACK')
+                    raise
+                return written
+            
+            with self.db_lock:
+                lines = offload.run(write)
+            for name, node, rows, cursor in batches:
+                self.cursors[name] = cursor
+                if rows:
+                    self.last_seen[name] = rows[-1][0]
+                for stage in self.stages:
+                    try:
+                        stage(node, rows)
+                    except Exception as e:
+                        app.logger.error(f"Log stage failed for {name}: {str(e)}")
+            
+            self.last_ingest = {
+                'success': True,
+                'sources': len(sources),
+                'lines': lines,
+                'errors': errors,
+                'duration': round(time.time() - started, 3),
+                'timestamp': datetime.now().isoformat()
+            }
+            return self.last_ingest
+        except Exception as e:
+            app.logger.error(f"Log index ingest failed: {str(e)}")
+            return {'success': False, 'error': str(e)}
+        finally:
+            self.ingest_lock.release()
+    
+    def prune(self, retention_seconds: float) -> int:
+        """Drop entries older than the retention window"""
+        with self.db_lock:
+            return offload.run(self.db.execute, 'DELETE FROM log_entries WHERE ts < ?',
+                               (time.time() - retention_seconds,)).rowcount
+    
+    def search(self, query: str, node: str = None, since: float = None, until: float = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest matching lines first; plain words that aren't valid FTS syntax are matched as a phrase"""
+        sql = ['SELECT e.node, e.source, e.ts, e.line FROM log_fts JOIN log_entries e ON e.id = log_fts.rowid',
+               'WHERE log_fts MATCH ?']
+        params = []
+        if node:
+            # Multi-instance containers index under their comma-separated node list
+            sql.append("AND (e.node = ? OR e.source LIKE ? OR ',' || e.node || ',' LIKE ?)")
+            params.extend([node, f'%:{node}', f'%,{node},%'])
+        if since is not None:
+            sql.append('AND e.ts >= ?')
+            params.append(since)
+        if until is not None:
+            sql.append('AND e.ts <= ?')
+            params.append(until)
+        sql.append('ORDER BY e.ts DESC LIMIT ?')
+        params.append(limit)
+        
+        def run_query():
+            try:
+                return self.db.execute(' '.join(sql), [query] + params).fetchall()
+            except sqlite3.OperationalError:
+                phrase = '"' + query.replace('"', '""') + '"'
+                return self.db.execute(' '.join(sql), [phrase] + params).fetchall()
+        
+        with self.db_lock:
+            rows = offload.run(run_query)
+        
+        return [{
+            'node': node_id,
+            'source': source,
+            'timestamp': datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+            'line': line
+        } for node_id, source, ts, line in rows]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Index size and ingest state"""
+        with self.db_lock:
+            entries, oldest, newest = offload.run(
+                lambda: self.db.execute('SELECT COUNT(*), MIN(ts), MAX(ts) FROM log_entries').fetchone())
+        return {
+            'entries': entries,
+            'sources': len(self.cursors),
+            'oldest': datetime.fromtimestamp(oldest, timezone.utc).isoformat() if oldest else None,
+            'newest': datetime.fromtimestamp(newest, timezone.utc).isoformat() if newest else None,
+            'size_bytes': os.path.getsize(self.path),
+            'last_ingest': self.last_ingest
+        }
+    
+    def start_loop(self, interval: int, retention_seconds: float):
+        """Ingest every interval seconds and prune hourly"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            last_prune = 0
+            while True:
+                self.ingest()
+                if time.time() - last_prune > 3600:
+                    self.prune(retention_seconds)
+                    last_prune = time.time()
+                time.sleep(interval)
+        
+        self.loop_thread = threading.Thread(target=loop, name='log-index', daemon=True)
+        self.loop_thread.start()
+
+DEFAULT_THROUGHPUT_RULES = [
+    {'metric': 'proofs_completed', 'pattern': r'(?i)\bproof\b.*\b(?:completed|submitted|accepted|verified)\b'},
+    {'metric': 'task_failures', 'pattern': r'(?i)\b(?:task|proof)\b.*\b(?:failed|failure|error|rejected)\b'},
+    # Only the duration on a proof-completion line, not any "in 5s" elsewhere in the output
+    {'metric': 'task_latency', 'pattern': r'(?i)\bproof\b.*\b(?:completed|submitted|accepted|verified)\b.*?'
+                                          r'\b(?:took|in|duration[=:]?|latency[=:]?)\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>ms|s)\b'}
+]
+
+class ThroughputTracker:
+    """Turns prover log lines into per-node work counters with windowed rates"""
+    
+    METRICS = ('proofs_completed', 'task_failures', 'task_latency')
+    BUCKET_SECONDS = 10
+    WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+    
+    def __init__(self, rules_path: str = None):
+        self.rules_path = rules_path
+        self.rules = self.load_rules()
+        self.lock = threading.Lock()
+        self.totals = {}
+        # node -> {bucket_start: [proofs, failures, latency_sum, latency_count, latency_max]}
+        self.buckets = {}
+    
+    def load_rules(self) -> List[Dict[str, Any]]:
+        """Compile the configured rules, falling back to the nexus CLI defaults"""
+        rules = DEFAULT_THROUGHPUT_RULES
+        if self.rules_path and os.path.exists(self.rules_path):
+            with open(self.rules_path) as f:
+                rules = (yaml.safe_load(f) or {}).get('rules', rules)
+        compiled = []
+        for rule in rules:
+            if rule['metric'] not in self.METRICS:
+                raise ValueError(f"Unknown throughput metric: {rule['metric']}")
+            compiled.append({**rule, 'regex': re.compile(rule['pattern'])})
+        return compiled
+    
+    def observe(self, node: str, rows: List[tuple]):
+        """Log parser stage: feed (timestamp, line) rows read for a node"""
+        horizon = time.time() - max(self.WINDOWS.values())
+        with self.lock:
+            for ts, line in rows:
+                for rule in self.rules:
+                    match = rule['regex'].search(line)
+                    if not match:
+                        continue
+                    groups = match.groupdict()
+                    # Multi-instance containers can attribute a line to one of their nodes
+                    target = groups.get('node') or node
+                    value = None
+                    if rule['metric'] == 'task_latency':
+                        value = float(groups.get('value') or 0)
+                        if (groups.get('unit') or rule.get('unit', 's')) == 'ms':
+                            value /= 1000
+                    self._record(target, rule['metric'], ts, value, ts >= horizon)
+    
+    def _record(self, node: str, metric: str, ts: float, value: Optional[float], recent: bool):
+        totals = self.totals.setdefault(node, {'proofs_completed': 0, 'task_failures': 0, 'latency_count': 0,
+                                               'latency_sum': 0.0, 'last_event': None})
+        if metric == 'task_latency':
+            totals['latency_count'] += 1
+            totals['latency_sum'] += value
+        else:
+            totals[metric] += 1
+        totals['last_event'] = max(totals['last_event'] or 0, ts)
+        if not recent:
+            return
+        
+        start = ts - ts % self.BUCKET_SECONDS
+        bucket = self.buckets.setdefault(node, {}).setdefault(start, [0, 0, 0.0, 0, 0.0])
+        if metric == 'proofs_completed':
+            bucket[0] += 1
+        elif metric == 'task_failures':
+            bucket[1] += 1
+        else:
+            bucket[2] += value
+            bucket[3] += 1
+            bucket[4] = max(bucket[4], value)
+    
+    def snapshot(self, node: str) -> Optional[Dict[str, Any]]:
+        """Totals and per-window rates for one node"""
+        with self.lock:
+            totals = self.totals.get(node)
+            if totals is None:
+                return None
+            now = time.time()
+            buckets = self.buckets.get(node, {})
+            horizon = now - max(self.WINDOWS.values()) - self.BUCKET_SECONDS
+            for start in [start for start in buckets if start < horizon]:
+                del buckets[start]
+            
+            windows = {}
+            for name, seconds in self.WINDOWS.items():
+                selected = [b for start, b in buckets.items() if start >= now - seconds]
+                proofs = sum(b[0] for b in selected)
+                failures = sum(b[1] for b in selected)
+                latency_count = sum(b[3] for b in selected)
+                windows[name] = {
+                    'proofs_completed': proofs,
+                    'task_failures': failures,
+                    'proofs_per_minute': round(proofs * 60 / seconds, 3),
+                    'failure_rate': round(failures / (proofs + failures), 3) if proofs + failures else 0,
+                    'latency_avg': round(sum(b[2] for b in selected) / latency_count, 3) if latency_count else None,
+                    'latency_max': max((b[4] for b in selected if b[3]), default=None)
+                }
+            
+            return {
+                'proofs_completed': totals['proofs_completed'],
+                'task_failures': totals['task_failures'],
+                'latency_avg': round(totals['latency_sum'] / totals['latency_count'], 3) if totals['latency_count'] else None,
+                'last_event': datetime.fromtimestamp(totals['last_event'], timezone.utc).isoformat() if totals['last_event'] else None,
+                'windows': windows
+            }
+    
+    def get_all(self) -> Dict[str, Any]:
+        """Every node's throughput plus fleet totals"""
+        with self.lock:
+            nodes = list(self.totals)
+        snapshots = {node: self.snapshot(node) for node in nodes}
+        fleet = {name: {
+            'proofs_completed': sum(s['windows'][name]['proofs_completed'] for s in snapshots.values()),
+            'task_failures': sum(s['windows'][name]['task_failures'] for s in snapshots.values()),
+            'proofs_per_minute': round(sum(s['windows'][name]['proofs_per_minute'] for s in snapshots.values()), 3)
+        } for name in self.WINDOWS}
+        return {'nodes': snapshots, 'fleet': fleet}
+
+class LogArchive:
+    """Per-node compressed log archive with a sparse time index for windowed reads.
+
+    Chunk files are concatenated gzip members ("frames") of roughly LOG_ARCHIVE_FRAME_BYTES
+    of raw text, so they stay readable with zcat. index.jsonl records each frame's time
+    range and byte offset, and a windowed read decompresses only the overlapping frames.
+    """
+    
+    def __init__(self, root: str, max_bytes: int, max_age: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        # node -> {'dir', 'frames': [index entries], 'chunk', 'buffer': [(ts, line)], 'buffer_bytes'}
+        self.nodes = {}
+        self.loop_thread = None
+        os.makedirs(root, exist_ok=True)
+        for name in os.listdir(root):
+            meta_path = os.path.join(root, name, 'meta.json')
+            if os.path.exists(meta_path):
+                try:
+                    with open(meta_path) as f:
+                        node = json.load(f)['node']
+                    self.nodes[node] = self._load_node(os.path.join(root, name))
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    app.logger.warning(f"Skipping unreadable log archive {name}: {str(e)}")
+    
+    def _load_node(self, directory: str) -> Dict[str, Any]:
+        frames = []
+        index_path = os.path.join(directory, 'index.jsonl')
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                frames = [json.loads(line) for line in f if line.strip()]
+        return {'dir': directory, 'frames': frames, 'chunk': frames[-1]['chunk'] if frames else None,
+                'buffer': [], 'buffer_bytes': 0}
+    
+    def _node(self, node: str) -> Dict[str, Any]:
+        state = self.nodes.get(node)
+        if state is None:
+            directory = os.path.join(self.root, re.sub(r'[^\w.-]', '_', node))
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, 'meta.json'), 'w') as f:
+                json.dump({'node': node}, f)
+            state = self.nodes[node] = self._load_node(directory)
+        return state
+    
+    def observe(self, node: str, rows: List[tuple]):
+        """Log stage: buffer new lines and cut a frame once enough text has accumulated"""
+        with self.lock:
+            state = self._node(node)
+            for ts, line in rows:
+                state['buffer'].append((ts, line))
+                state['buffer_bytes'] += len(line) + 40
+            if state['buffer_bytes'] >= LOG_ARCHIVE_FRAME_BYTES:
+                self._write_frame(state)
+    
+    def _write_frame(self, state: Dict[str, Any]):
+        rows = sorted(state['buffer'], key=lambda row: row[0])
+        state['buffer'], state['buffer_bytes'] = [], 0
+        if not rows:
+            return
+        text = ''.join(f"{datetime.fromtimestamp(ts, timezone.utc).isoformat()} {line}\n" for ts, line in rows)
+        frame = offload.run(gzip.compress, text.encode('utf-8'), compresslevel=6)
+        
+        chunk = state['chunk']
+        chunk_path = os.path.join(state['dir'], chunk) if chunk else None
+        if not chunk_path or not os.path.exists(chunk_path) or os.path.getsize(chunk_path) >= LOG_ARCHIVE_CHUNK_BYTES:
+            chunk = state['chunk'] = f"{int(rows[0][0] * 1000)}.log.gz"
+            chunk_path = os.path.join(state['dir'], chunk)
+        with open(chunk_path, 'ab') as f:
+            offset = f.tell()
+            f.write(frame)
+        
+        entry = {'chunk': chunk, 'offset': offset, 'length': len(frame), 'first': rows[0][0],
+                 'last': rows[-1][0], 'lines': len(rows)}
+        state['frames'].append(entry)
+        with open(os.path.join(state['dir'], 'index.jsonl'), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+    
+    def flush(self, older_than: float = 0):
+        """Write out buffers whose oldest line has waited longer than older_than seconds"""
+        cutoff = time.time() - older_than
+        with self.lock:
+            for state in self.nodes.values():
+                if state['buffer'] and min(ts for ts, _ in state['buffer']) <= cutoff:
+                    self._write_frame(state)
+    
+    def _matching_nodes(self, node: str) -> List[str]:
+        # Multi-instance containers archive under their comma-separated node list
+        return [key for key in self.nodes if key == node or node in key.split(',')]
+    
+    def read(self, node: str, since: float = None, until: float = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Lines for a node within [since, until], oldest first, decompressing only overlapping frames"""
+        # Archived timestamps carry microsecond precision
+        since = since - 1e-6 if since is not None else float('-inf')
+        until = until + 1e-6 if until is not None else float('inf')
+        lines = []
+        with self.lock:
+            targets = [(key, self.nodes[key]) for key in self._matching_nodes(node)]
+            pending = [(key, list(state['buffer'])) for key, state in targets]
+            frames = [(key, state['dir'], frame) for key, state in targets for frame in state['frames']
+                      if frame['last'] >= since and frame['first'] <= until]
+        
+        def read_frame(directory, frame):
+            with open(os.path.join(directory, frame['chunk']), 'rb') as f:
+                f.seek(frame['offset'])
+                return gzip.decompress(f.read(frame['length'])).decode('utf-8', errors='replace')
+        
+        frames.sort(key=lambda item: item[2]['first'])
+        for position, (key, directory, frame) in enumerate(frames):
+            text = offload.run(read_frame, directory, frame)
+            for entry in text.splitlines():
+                stamp, _, line = entry.partition(' ')
+                ts = parse_log_timestamp(stamp)
+                if since <= ts <= until:
+                    lines.append((ts, key, line))
+            if len(lines) >= limit:
+                # Later frames can only matter if they start before the current limit-th line
+                lines.sort(key=lambda item: item[0])
+                if position + 1 == len(frames) or frames[position + 1][2]['first'] > lines[limit - 1][0]:
+                    break
+        for key, rows in pending:
+            lines.extend((ts, key, line) for ts, line in rows if since <= ts <= until)
+        
+        lines.sort(key=lambda item: item[0])
+        return [{
+            'node': key,
+            'timestamp': datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+            'line': line
+        } for ts, key, line in lines[:limit]]
+    
+    def enforce_retention(self) -> Dict[str, int]:
+        """Delete whole chunks past the age limit, then the oldest chunks until under the size limit"""
+        removed = {'chunks': 0, 'bytes': 0}
+        with self.lock:
+            chunks = []
+            for state in self.nodes.values():
+                spans = {}
+                for frame in state['frames']:
+                    first, last = spans.get(frame['chunk'], (frame['first'], frame['last']))
+                    spans[frame['chunk']] = (min(first, frame['first']), max(last, frame['last']))
+                for chunk, (first, last) in spans.items():
+                    path = os.path.join(state['dir'], chunk)
+                    size = os.path.getsize(path) if os.path.exists(path) else 0
+                    chunks.append((last, chunk, size, state))
+            chunks.sort(key=lambda item: item[0])
+            
+            total = sum(size for _, _, size, _ in chunks)
+            cutoff = time.time() - self.max_age
+            expired = {}
+            for last, chunk, size, state in chunks:
+                # Never drop the chunk still being appended to
+                if chunk == state['chunk']:
+                    continue
+                if last < cutoff or total > self.max_bytes:
+                    os.remove(os.path.join(state['dir'], chunk))
+                    expired.setdefault(id(state), (state, set()))[1].add(chunk)
+                    total -= size
+                    removed['chunks'] += 1
+                    removed['bytes'] += size
+            
+            for state, dropped in expired.values():
+                state['frames'] = [frame for frame in state['frames'] if frame['chunk'] not in dropped]
+                with open(os.path.join(state['dir'], 'index.jsonl'), 'w') as f:
+                    f.writelines(json.dumps(frame) + '\n' for frame in state['frames'])
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Archived bytes, chunks and time span per node"""
+        with self.lock:
+            nodes = {}
+            for node, state in self.nodes.items():
+                chunks = {frame['chunk'] for frame in state['frames']}
+                nodes[node] = {
+                    'chunks': len(chunks),
+                    'frames': len(state['frames']),
+                    'lines': sum(frame['lines'] for frame in state['frames']) + len(state['buffer']),
+                    'bytes': sum(frame['length'] for frame in state['frames']),
+                    'oldest': datetime.fromtimestamp(state['frames'][0]['first'], timezone.utc).isoformat()
+                              if state['frames'] else None
+                }
+        return {'nodes': nodes, 'total_bytes': sum(n['bytes'] for n in nodes.values()),
+                'max_bytes': self.max_bytes, 'max_age_days': self.max_age / 86400}
+    
+    def start_loop(self, interval: int):
+        """Flush idle buffers and enforce retention every interval seconds"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush(older_than=LOG_ARCHIVE_FLUSH_SECONDS)
+                    self.enforce_retention()
+                except Exception as e:
+                    app.logger.error(f"Log archive maintenance failed: {str(e)}")
+        
+        self.loop_thread = threading.Thread(target=loop, name='log-archive', daemon=True)
+        self.loop_thread.start()
+
+class FleetReconciler:
+    """Diffs a desired-state fleet manifest against the live inventory and repairs drift"""
+    
+    MANAGED_LABEL = 'nexus.managed-by'
+    MANAGED_VALUE = 'fleet-manifest'
+    MODES = ('native', 'docker-single', 'docker-multi', 'k8s')
+    
+    def __init__(self, manager, manifest_path: str):
+        self.manager = manager
+        self.manifest_path = manifest_path
+        self.manifest_cache = None
+        self.reconcile_lock = threading.Lock()
+        self.last_result = None
+        self.loop_thread = None
+    
+    # Desired state
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Desired units from the manifest file, re-parsed only when it changes"""
+        mtime = os.path.getmtime(self.manifest_path)
+        if self.manifest_cache and self.manifest_cache[0] == mtime:
+            return self.manifest_cache[1]
+        with open(self.manifest_path) as f:
+            units = self.parse_manifest(yaml.safe_load(f) or {})
+        self.manifest_cache = (mtime, units)
+        return units
+    
+    def save_manifest(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Validate and write a new manifest"""
+        units = self.parse_manifest(data)
+        with open(self.manifest_path, 'w') as f:
+            yaml.safe_dump(data, f, sort_keys=False)
+        self.manifest_cache = None
+        return units
+    
+    def parse_manifest(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Turn manifest nodes into units keyed like the live inventory.
+
+        Nodes in docker-multi mode are grouped by their 'group' into one container
+        whose threads and limits are the sum of its members.
+        """
+        defaults = {'mode': 'docker-single', 'threads': 4, 'memory_limit': '2g', 'cpu_limit': 2.0,
+                    **(data.get('defaults') or {})}
+        units, groups, seen = {}, {}, set()
+        
+        for entry in data.get('nodes') or []:
+            node = {**defaults, **(entry if isinstance(entry, dict) else {'node_id': entry})}
+            node_id = str(node.get('node_id') or '')
+            if not node_id:
+                raise ValueError('Every manifest node needs a node_id')
+            if node_id in seen:
+                raise ValueError(f'Node {node_id} is listed more than once')
+            if node['mode'] not in self.MODES:
+                raise ValueError(f"Unsupported mode for node {node_id}: {node['mode']}")
+            seen.add(node_id)
+            node['node_id'] = node_id
+            
+            if node['mode'] == 'docker-multi':
+                groups.setdefault(str(node.get('group', 'default')), []).append(node)
+            else:
+                units[f"{node['mode']}:{node_id}"] = self._unit(node['mode'], [node_id], node['threads'],
+                                                                node['memory_limit'], node['cpu_limit'],
+                                                                node.get('host'))
+        
+        for nodes in groups.values():
+            node_ids = sorted(n['node_id'] for n in nodes)
+            units[f"docker-multi:{','.join(node_ids)}"] = self._unit(
+                'docker-multi', node_ids,
+                sum(int(n['threads']) for n in nodes),
+                sum(parse_memory_size(n['memory_limit']) for n in nodes),
+                sum(float(n['cpu_limit']) for n in nodes),
+                nodes[0].get('host')
+            )
+        return units
+    
+    def _unit(self, mode: str, node_ids: List[str], threads, memory_limit, cpu_limit, host=None) -> Dict[str, Any]:
+        native = mode == 'native'
+        return {
+            'mode': mode,
+            'node_ids': node_ids,
+            'threads': int(threads),
+            'memory': None if native else parse_memory_size(memory_limit),
+            'cpu': None if native else round(float(cpu_limit), 3),
+            'host': host
+        }
+    
+    # Live state
+    def live_units(self) -> Dict[str, Dict[str, Any]]:
+        """One inventory pass over native processes, every Docker host and Kubernetes"""
+        manager = self.manager
+        units = {}
+        
+        with manager.native_process_lock:
+            for node_id, info in manager.native_processes.items():
+                if info['process'].poll() is None and info['status'] != 'stopping':
+                    unit = self._unit('native', [node_id], info['threads'], None, None)
+                    unit.update(running=True, managed=info.get('managed', False))
+                    units[f"native:{node_id}"] = unit
+        
+        def list_host(host, client):
+            return client.containers.list(all=True, filters={'label': 'nexus.type'})
+        
+        for host, containers in manager.map_docker_hosts(list_host).items():
+            for container in containers:
+                if is_warm_spare(container.labels, container.name):
+                    continue
+                unit = self.container_unit(host, container)
+                units[f"{unit['mode']}:{','.join(unit['node_ids'])}"] = unit
+        
+        if manager.capabilities['k8s']:
+            for deployment in manager.k8s.list_deployments():
+                labels = deployment['metadata'].get('labels', {})
+                container = deployment['spec']['template']['spec']['containers'][0]
+                env = {e['name']: e.get('value') for e in container.get('env', [])}
+                limits = container.get('resources', {}).get('limits', {})
+                node_ids = sorted(env.get('NODE_IDS', '').split(',')) if 'NODE_IDS' in env else [env.get('NODE_ID', '')]
+                unit = self._unit('k8s', node_ids, env.get('MAX_THREADS', 0), limits.get('memory', 0),
+                                  parse_cpu_quantity(limits.get('cpu', 0)))
+                unit.update(running=deployment['spec'].get('replicas', 0) > 0,
+                            workload=deployment['metadata']['name'],
+                            managed=labels.get(self.MANAGED_LABEL) == self.MANAGED_VALUE)
+                units[f"k8s:{','.join(node_ids)}"] = unit
+        
+        return units
+    
+    def container_unit(self, host: str, container) -> Dict[str, Any]:
+        """Unit describing how an existing nexus container was created"""
+        labels = container.labels
+        env = dict(e.split('=', 1) for e in container.attrs['Config'].get('Env') or [] if '=' in e)
+        host_config = container.attrs.get('HostConfig', {})
+        if labels.get('nexus.type') == 'multi-instance':
+            mode, node_ids = 'docker-multi', sorted(labels.get('nexus.node-ids', '').split(','))
+        else:
+            mode, node_ids = 'docker-single', [container_node_id(labels, container.name) or container.name]
+        cpu = container_cpu_limit(host_config) or 0
+        unit = self._unit(mode, node_ids, env.get('MAX_THREADS', 0), host_config.get('Memory', 0), cpu, host)
+        unit.update(running=container.status == 'running', container_name=container.name,
+                    managed=labels.get(self.MANAGED_LABEL) == self.MANAGED_VALUE)
+        return unit
+    
+    # Diff
+    def _matches(self, desired: Dict[str, Any], current: Dict[str, Any]) -> bool:
+        if desired['threads'] != current['threads']:
+            return False
+        if desired['host'] and desired['host'] != current.get('host'):
+            return False
+        if desired['mode'] == 'native':
+            return True
+        return desired['memory'] == current['memory'] and abs(desired['cpu'] - current['cpu']) < 0.01
+    
+    def plan(self, desired: Dict[str, Dict[str, Any]] = None,
+             live: Dict[str, Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Minimal create/update/start/remove actions that turn live into desired"""
+        desired = self.load_manifest() if desired is None else desired
+        live = self.live_units() if live is None else live
+        desired_nodes = {n for unit in desired.values() for n in unit['node_ids']}
+        
+        actions = []
+        for key, current in live.items():
+            # Units we created that left the manifest, or nodes the manifest now runs elsewhere
+            if key not in desired and (current['managed'] or desired_nodes.intersection(current['node_ids'])):
+                actions.append({'action': 'remove', 'key': key, 'current': current})
+        
+        for key, unit in desired.items():
+            current = live.get(key)
+            if current is None:
+                actions.append({'action': 'create', 'key': key, 'unit': unit})
+            elif not self._matches(unit, current):
+                actions.append({'action': 'update', 'key': key, 'unit': unit, 'current': current})
+            elif not current['running']:
+                actions.append({'action': 'start', 'key': key, 'unit': unit, 'current': current})
+        return actions
+    
+    def describe(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """JSON-friendly view of a plan"""
+        described = []
+        for action in actions:
+            unit = action.get('unit') or action['current']
+            described.append({
+                'action': action['action'],
+                'key': action['key'],
+                'mode': unit['mode'],
+                'node_ids': unit['node_ids'],
+                'threads': unit['threads'],
+                'memory_limit': format_memory_size(unit['memory']) if unit['memory'] else None,
+                'cpu_limit': unit['cpu']
+            })
+        return described
+    
+    # Apply
+    def _create(self, unit: Dict[str, Any]) -> Dict[str, Any]:
+        manager = self.manager
+        labels = {self.MANAGED_LABEL: self.MANAGED_VALUE}
+        mode, node_ids = unit['mode'], unit['node_ids']
+        if mode == 'native':
+            result = manager.start_native_instance(node_ids[0], threads=unit['threads'])
+            if result.get('success'):
+                with manager.native_process_lock:
+                    manager.native_processes[node_ids[0]]['managed'] = True
+                manager.save_native_registry()
+            return result
+        memory_limit = format_memory_size(unit['memory'])
+        if mode == 'docker-single':
+            return manager.create_single_node_container(node_ids[0], unit['threads'], memory_limit, unit['cpu'],
+                                                        host=unit['host'], labels=labels)
+        if mode == 'docker-multi':
+            return manager.create_multi_node_container(node_ids, unit['threads'], memory_limit, unit['cpu'],
+                                                       host=unit['host'], labels=labels)
+        return manager.create_k8s_workload(node_ids, unit['threads'], memory_limit, unit['cpu'], labels=labels)
+    
+    def _remove(self, current: Dict[str, Any]) -> Dict[str, Any]:
+        manager = self.manager
+        if current['mode'] == 'native':
+            return manager.stop_native_instance(current['node_ids'][0])
+        if current['mode'] == 'k8s':
+            return manager.delete_k8s_workload(current['workload'])
+        return manager.remove_node(current['container_name'], host=current['host'])
+    
+    def _start(self, current: Dict[str, Any]) -> Dict[str, Any]:
+        if current['mode'] == 'k8s':
+            return self.manager.scale_k8s_workload(current['workload'], 1)
+        return self.manager.container_action(current['container_name'], 'start', current['host'])
+    
+    def _apply(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        kind = action['action']
+        if kind == 'create':
+            return self._create(action['unit'])
+        if kind == 'start':
+            return self._start(action['current'])
+        if kind == 'remove':
+            return self._remove(action['current'])
+        removed = self._remove(action['current'])
+        if not removed.get('success'):
+            return removed
+        return self._create(action['unit'])
+    
+    def reconcile(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Compute the plan and apply it: removals first, then creates/updates/starts in parallel"""
+        if not self.reconcile_lock.acquire(blocking=False):
+            return {'success': False, 'error': 'Reconcile already in progress'}
+        try:
+            started = time.time()
+            actions = self.plan()
+            result = {'success': True, 'plan': self.describe(actions), 'results': [],
+                      'timestamp': datetime.now().isoformat()}
+            if dry_run or not actions:
+                result['duration'] = round(time.time() - started, 3)
+                return result
+            
+            removals = [a for a in actions if a['action'] == 'remove']
+            changes = [a for a in actions if a['action'] != 'remove']
+            with ThreadPoolExecutor(max_workers=FLEET_RECONCILE_PARALLELISM, thread_name_prefix='fleet') as executor:
+                for phase in (removals, changes):
+                    for action, outcome in zip(phase, executor.map(self._safe_apply, phase)):
+                        result['results'].append({'action': action['action'], 'key': action['key'], **outcome})
+            
+            failures = [r for r in result['results'] if not r.get('success')]
+            result['success'] = not failures
+            result['message'] = f"Reconciled {len(actions) - len(failures)}/{len(actions)} actions"
+            result['duration'] = round(time.time() - started, 3)
+            self.last_result = result
+            return result
+        except Exception as e:
+            app.logger.error(f"Fleet reconcile failed: {str(e)}")
+            self.last_result = {'success': False, 'error': str(e), 'timestamp': datetime.now().isoformat()}
+            return self.last_result
+        finally:
+            self.reconcile_lock.release()
+    
+    def _safe_apply(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._apply(action)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def start_loop(self, interval: int):
+        """Re-run reconcile every interval seconds while a manifest exists"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            while True:
+                time.sleep(interval)
+                if os.path.exists(self.manifest_path):
+                    result = self.reconcile()
+                    if result.get('results'):
+                        app.logger.info(f"Fleet drift repaired: {result.get('message')}")
+        
+        self.loop_thread = threading.Thread(target=loop, name='fleet-reconcile', daemon=True)
+        self.loop_thread.start()
+
+class RollingRestart:
+    """Restarts or recreates containers batch by batch, gating each batch on readiness"""
+    
+    def __init__(self, manager):
+        self.manager = manager
+        self.lock = threading.Lock()
+        self.state = None
+        self.resume_event = threading.Event()
+        self.cancelled = False
+        self.thread = None
+    
+    @staticmethod
+    def batch_size(max_unavailable, total: int) -> int:
+        """Containers per batch from a count or a percentage like '25%'"""
+        if isinstance(max_unavailable, str) and max_unavailable.endswith('%'):
+            return max(1, int(total * float(max_unavailable[:-1]) / 100))
+        return max(1, int(max_unavailable))
+    
+    def start(self, targets: List[tuple], recreate: bool = False, max_unavailable=1,
+              readiness_timeout: float = ROLLING_READINESS_TIMEOUT, max_failures: int = ROLLING_MAX_FAILURES) -> Dict[str, Any]:
+        """Begin rolling through (host, container) targets in the background"""
+        with self.lock:
+            if self.state and self.state['status'] in ('running', 'paused'):
+                return {'success': False, 'error': 'A rolling restart is already in progress'}
+            if not targets:
+                return {'success': False, 'error': 'No containers matched'}
+            
+            size = self.batch_size(max_unavailable, len(targets))
+            batches = [targets[i:i + size] for i in range(0, len(targets), size)]
+            self.state = {
+                'status': 'running',
+                'action': 'recreate' if recreate else 'restart',
+                'total': len(targets),
+                'batch_size': size,
+                'batches': len(batches),
+                'current_batch': 0,
+                'succeeded': [],
+                'failed': [],
+                'consecutive_failures': 0,
+                'max_failures': max_failures,
+                'message': None,
+                'started': datetime.now().isoformat(),
+                'finished': None
+            }
+            self.cancelled = False
+            self.resume_event.set()
+            self.thread = threading.Thread(target=self._run, args=(batches, recreate, readiness_timeout),
+                                           name='rolling-restart', daemon=True)
+            self.thread.start()
+        return {'success': True, **self.status()}
+    
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.state) if self.state else {'status': 'idle'}
+    
+    def pause(self) -> Dict[str, Any]:
+        with self.lock:
+            if not self.state or self.state['status'] != 'running':
+                return {'success': False, 'error': 'No rolling restart is running'}
+            self.state['status'] = 'paused'
+            self.state['message'] = 'Paused by request'
+            self.resume_event.clear()
+        return {'success': True, **self.status()}
+    
+    def resume(self) -> Dict[str, Any]:
+        with self.lock:
+            if not self.state or self.state['status'] != 'paused':
+                return {'success': False, 'error': 'No rolling restart is paused'}
+            self.state.update(status='running', consecutive_failures=0, message=None)
+            self.resume_event.set()
+        return {'success': True, **self.status()}
+    
+    def cancel(self) -> Dict[str, Any]:
+        with self.lock:
+            if not self.state or self.state['status'] not in ('running', 'paused'):
+                return {'success': False, 'error': 'No rolling restart in progress'}
+            self.cancelled = True
+            self.resume_event.set()
+        return {'success': True, 'message': 'Cancelling after the current batch'}
+    
+    def _wait_ready(self, container, since: float, timeout: float) -> Optional[str]:
+        """None once the container runs and has logged since the restart, else the reason it isn't ready"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            container.reload()
+            if container.status in ('exited', 'dead'):
+                return f"Container {container.status} (exit code {container.attrs['State'].get('ExitCode')})"
+            if container.status == 'running' and container.logs(since=since, tail=1).strip():
+                return None
+            time.sleep(ROLLING_POLL_INTERVAL)
+        return f'No log heartbeat within {timeout}s'
+    
+    def _roll(self, host: str, container, recreate: bool, readiness_timeout: float) -> Dict[str, Any]:
+        manager = self.manager
+        started = time.time()
+        name = container.name
+        try:
+            if recreate:
+                # Same node ids, threads and limits, on the current image
+                unit = manager.fleet.container_unit(host, container)
+                labels = {k: v for k, v in container.labels.items()
+                          if not k.startswith('nexus.') or k == FleetReconciler.MANAGED_LABEL}
+                container.stop(timeout=10)
+                memory_limit = format_memory_size(unit['memory']) if unit['memory'] else '2g'
+                cpu_limit = unit['cpu'] or 2.0
+                if unit['mode'] == 'docker-multi':
+                    result = manager.create_multi_node_container(unit['node_ids'], unit['threads'], memory_limit,
+                                                                 cpu_limit, host=host, labels=labels)
+                else:
+                    result = manager.create_single_node_container(unit['node_ids'][0], unit['threads'], memory_limit,
+                                                                  cpu_limit, host=host, labels=labels)
+                if not result['success']:
+                    raise RuntimeError(result['error'])
+                _, container = manager.find_container(result['container_name'], host)
+            else:
+                container.restart(timeout=10)
+            
+            reason = self._wait_ready(container, started, readiness_timeout)
+            result = {'name': name, 'host': host, 'success': reason is None,
+                      'duration': round(time.time() - started, 3)}
+            if reason:
+                result['error'] = reason
+            return result
+        except Exception as e:
+            return {'name': name, 'host': host, 'success': False, 'error': str(e),
+                    'duration': round(time.time() - started, 3)}
+    
+    def _run(self, batches: List[List[tuple]], recreate: bool, readiness_timeout: float):
+        for index, batch in enumerate(batches):
+            self.resume_event.wait()
+            if self.cancelled:
+                self._finish('cancelled')
+                return
+            with self.lock:
+                self.state['current_batch'] = index + 1
+            
+            with ThreadPoolExecutor(max_workers=len(batch), thread_name_prefix='rolling') as executor:
+                results = list(executor.map(lambda target: self._roll(*target, recreate, readiness_timeout), batch))
+            
+            with self.lock:
+                failed = [r for r in results if not r['success']]
+                self.state['succeeded'].extend(r for r in results if r['success'])
+                self.state['failed'].extend(failed)
+                self.state['consecutive_failures'] = self.state['consecutive_failures'] + 1 if failed else 0
+                if self.state['consecutive_failures'] >= self.state['max_failures'] and index + 1 < len(batches):
+                    self.state['status'] = 'paused'
+                    self.state['message'] = f"Paused after {self.state['consecutive_failures']} failed batches"
+                    self.resume_event.clear()
+                    app.logger.warning(f"Rolling restart paused: {failed[-1].get('error')}")
+            socketio.emit('rolling_restart', self.status())
+        
+        self._finish('failed' if self.state['failed'] else 'completed')
+    
+    def _finish(self, status: str):
+        with self.lock:
+            self.state['status'] = status
+            self.state['finished'] = datetime.now().isoformat()
+        socketio.emit('rolling_restart', self.status())
+
+class HealthChecker:
+    """Assesses every instance in one pass per health_check_interval and optionally restarts stalled ones.
+
+    States: starting (inside the startup grace), healthy, idle (CPU near zero for several passes),
+    stalled (no log output for HEALTH_STALL_SECONDS), crashed (native process exited on its own),
+    down (stopped or failed) and unknown.
+    """
+    
+    RESTARTABLE = ('stalled', 'crashed')
+    
+    def __init__(self, manager, template_path: str):
+        self.manager = manager
+        configuration = {}
+        if os.path.exists(template_path):
+            with open(template_path) as f:
+                configuration = json.load(f).get('configuration', {})
+        self.interval = int(os.environ.get('HEALTH_CHECK_INTERVAL', configuration.get('health_check_interval', 30)))
+        auto_restart = os.environ.get('HEALTH_AUTO_RESTART')
+        self.auto_restart = (auto_restart.lower() == 'true') if auto_restart else bool(configuration.get('auto_restart', False))
+        self.stall_seconds = HEALTH_STALL_SECONDS
+        self.lock = threading.Lock()
+        self.states = {}
+        self.last_pass = None
+        self.loop_thread = None
+    
+    @staticmethod
+    def instance_key(instance: Dict[str, Any]) -> str:
+        """Same naming as the log index sources, so indexed log times double as activity timestamps"""
+        if instance['mode'] == 'native':
+            return f"native:{instance['node_id']}"
+        if instance['mode'] == 'k8s':
+            return f"k8s:{instance['pod_name']}"
+        return f"docker:{instance.get('host')}:{instance['container_name']}"
+    
+    def _last_activity(self, key: str) -> Optional[float]:
+        # Read from the log index only: a pass never makes a per-instance Docker or k8s call
+        return self.manager.log_index.last_seen.get(key)
+    
+    def _assess(self, key: str, instance: Dict[str, Any], previous: Dict[str, Any], now: float) -> Dict[str, Any]:
+        record = {'key': key, 'node_id': instance['node_id'], 'mode': instance['mode'],
+                  'idle_passes': previous.get('idle_passes', 0)}
+        status = instance.get('status')
+        if status != 'running':
+            record['state'] = 'down'
+            record['reason'] = f'Status {status}'
+            return record
+        
+        started = instance_started_at(instance)
+        if started and now - started < HEALTH_STARTUP_GRACE:
+            record['state'] = 'starting'
+            return record
+        
+        last_activity = self._last_activity(key)
+        if last_activity is None:
+            # Log indexing is off or hasn't reached this instance yet
+            record['reason'] = 'No indexed log output yet'
+        record['last_activity'] = datetime.fromtimestamp(last_activity, timezone.utc).isoformat() if last_activity else None
+        
+        stats = instance.get('stats') or {}
+        cpu = stats.get('cpu_percent', instance.get('cpu_percent'))
+        record['cpu_percent'] = cpu
+        record['idle_passes'] = record['idle_passes'] + 1 if cpu is not None and cpu < HEALTH_CPU_IDLE_PERCENT else 0
+        
+        if last_activity is not None and now - last_activity > self.stall_seconds:
+            record['state'] = 'stalled'
+            record['reason'] = f'No log output for {int(now - last_activity)}s'
+        elif record['idle_passes'] >= HEALTH_IDLE_PASSES:
+            record['state'] = 'idle'
+            record['reason'] = f"CPU below {HEALTH_CPU_IDLE_PERCENT}% for {record['idle_passes']} checks"
+        elif last_activity is None and 'reason' in record:
+            record['state'] = 'unknown'
+        else:
+            record['state'] = 'healthy'
+        return record
+    
+    def _crashed_natives(self, previous_states: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Exited processes still registered were not stopped through the manager
+        crashed = []
+        with self.manager.native_process_lock:
+            for node_id, info in list(self.manager.native_processes.items()):
+                code = info['process'].poll()
+                if code is not None and info['status'] != 'stopping':
+                    del self.manager.native_processes[node_id]
+                    crashed.append({'key': f'native:{node_id}', 'node_id': node_id, 'mode': 'native',
+                                    'state': 'crashed', 'reason': f'Exited with code {code}',
+                                    'threads': info['threads']})
+            removed = bool(crashed)
+            # The dead process has left the registry, so keep reporting it until it runs
+            # again (restarted by us or the operator) or the operator clears it
+            detected = {record['key'] for record in crashed}
+            for key, previous in previous_states.items():
+                if previous.get('state') == 'crashed' and key not in detected and \
+                        previous['node_id'] not in self.manager.native_processes:
+                    crashed.append({name: previous[name] for name in
+                                    ('key', 'node_id', 'mode', 'state', 'reason', 'threads')})
+        if removed:
+            self.manager.save_native_registry()
+        return crashed
+    
+    def clear(self, node_id: str) -> Dict[str, Any]:
+        """Forget a crashed native instance that should not be restarted"""
+        key = f'native:{node_id}'
+        with self.lock:
+            record = self.states.get(key)
+            if not record or record['state'] != 'crashed':
+                return {'success': False, 'error': f'{node_id} is not a crashed native instance'}
+            del self.states[key]
+        socketio.emit('health_update', {'changed': [key], 'summary': self.summary()})
+        return {'success': True, 'message': f'Cleared crashed instance {node_id}'}
+    
+    def check(self) -> Dict[str, Any]:
+        """One batched pass over the whole fleet"""
+        now = time.time()
+        with self.lock:
+            previous_states = dict(self.states)
+        
+        crashed = self._crashed_natives(previous_states)
+        instances = self.manager.get_cached_instances(max_age=self.interval)
+        
+        records = {record['key']: record for record in crashed}
+        for instance in instances:
+            key = self.instance_key(instance)
+            if key not in records:
+                records[key] = self._assess(key, instance, previous_states.get(key, {}), now)
+        
+        for key, record in records.items():
+            previous = previous_states.get(key, {})
+            record['since'] = previous['since'] if previous.get('state') == record['state'] else datetime.now().isoformat()
+            record['restarts'] = previous.get('restarts', 0)
+            record['next_restart'] = previous.get('next_restart')
+            record['last_restart'] = previous.get('last_restart')
+            if record['state'] == 'healthy' and record['last_restart'] and \
+                    now - record['last_restart'] > HEALTH_BACKOFF_MAX:
+                # Stable long enough to forget earlier restarts
+                record['restarts'] = 0
+            if self.auto_restart and record['state'] in self.RESTARTABLE:
+                self._maybe_restart(record, instances, now)
+        
+        changed = [key for key, record in records.items()
+                   if previous_states.get(key, {}).get('state') != record['state']]
+        with self.lock:
+            # Drop crashed records the operator cleared while this pass ran
+            self.states = {key: record for key, record in records.items()
+                           if not (key in previous_states and key not in self.states
+                                   and previous_states[key]['state'] == 'crashed')}
+            self.last_pass = datetime.now().isoformat()
+        if changed:
+            socketio.emit('health_update', {'changed': changed, 'summary': self.summary()})
+        return {'success': True, 'checked': len(records), 'changed': changed}
+    
+    def _maybe_restart(self, record: Dict[str, Any], instances: List[Dict[str, Any]], now: float):
+        """Restart with exponential backoff: base, 2x base, 4x base... capped at HEALTH_BACKOFF_MAX"""
+        if record['next_restart'] and now < record['next_restart']:
+            return
+        manager = self.manager
+        if record['mode'] == 'native':
+            manager.stop_native_instance(record['node_id'])
+            result = manager.start_native_instance(record['node_id'], threads=record.get('threads') or 4)
+        elif record['mode'].startswith('docker'):
+            instance = next(i for i in instances if self.instance_key(i) == record['key'])
+            result = manager.container_action(instance['container_name'], 'restart', instance.get('host'))
+        else:
+            # Kubernetes restarts pods through its own probes
+            return
+        
+        record['restarts'] += 1
+        record['last_restart'] = now
+        record['next_restart'] = now + min(HEALTH_BACKOFF_BASE * 2 ** (record['restarts'] - 1), HEALTH_BACKOFF_MAX)
+        record['restart_result'] = result
+        app.logger.warning(f"Auto-restarted {record['key']} ({record['state']}): {result}")
+    
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return dict(self.states)
+    
+    def state_of(self, instance: Dict[str, Any]) -> Optional[str]:
+        with self.lock:
+            record = self.states.get(self.instance_key(instance))
+        return record['state'] if record else None
+    
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = {}
+            for record in self.states.values():
+                counts[record['state']] = counts.get(record['state'], 0) + 1
+            return {'states': counts, 'last_pass': self.last_pass, 'interval': self.interval,
+                    'auto_restart': self.auto_restart}
+    
+    def start_loop(self):
+        """Check every health_check_interval seconds"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.check()
+                except Exception as e:
+                    app.logger.error(f"Health check failed: {str(e)}")
+        
+        self.loop_thread = threading.Thread(target=loop, name='health-check', daemon=True)
+        self.loop_thread.start()
+
+class ResponseCache:
+    """Versioned JSON snapshots behind conditional GET for the dashboard's polling endpoints.
+
+    A snapshot is rebuilt at most once per ttl per path and query string. A rebuild with
+    identical content keeps its version and ETag, so pollers keep getting 304s.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+    
+    def invalidate(self):
+        """Force the next request for every snapshot to rebuild"""
+        with self.lock:
+            for entry in self.entries.values():
+                entry['expires'] = 0
+    
+    def snapshot(self, key: tuple, producer) -> Dict[str, Any]:
+        entry = self.entries.get(key)
+        if entry and time.time() < entry['expires']:
+            return entry
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        # Concurrent pollers wait for one rebuild instead of each hitting Docker
+        with key_lock:
+            entry = self.entries.get(key)
+            if entry and time.time() < entry['expires']:
+                return entry
+            body, digest = offload.run(self._encode, producer())
+            if entry and entry['digest'] == digest:
+                entry['expires'] = time.time() + self.ttl
+                return entry
+            version = entry['version'] + 1 if entry else 1
+            entry = {
+                'body': body,
+                'digest': digest,
+                'version': version,
+                'etag': f'{version}-{digest[:16]}',
+                'last_modified': datetime.now(timezone.utc).replace(microsecond=0),
+                'expires': time.time() + self.ttl
+            }
+            self.entries[key] = entry
+            return entry
+    
+    @staticmethod
+    def _encode(data) -> tuple:
+        body = app.json.dumps(data).encode('utf-8')
+        return body, hashlib.sha256(body).hexdigest()
+    
+    def respond(self, producer) -> Response:
+        """Serve the current snapshot for this request, or 304 if the client already has it"""
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        entry = self.snapshot(key, producer)
+        response = Response(entry['body'], mimetype='application/json')
+        response.set_etag(entry['etag'])
+        response.last_modified = entry['last_modified']
+        response.cache_control.no_cache = True
+        response.headers['X-Snapshot-Version'] = str(entry['version'])
+        return response.make_conditional(request)
+
+class WarmPool:
+    """Stopped, network-attached single-node containers per Docker host, bound to a node ID on demand.
+
+    Docker fixes env, labels and mounts at create time. A spare is created with the full
+    single-node spec for the WARM_POOL_* limits, including its config fingerprint, and its own
+    data and log volumes. Binding it to a node copies in a node.env file with the node ID,
+    renames it to nexus-node-<id>, and creates the node's named volumes as binds to the spare's.
+    Spares are labelled with the image ID they were created from and replaced when it changes.
+    """
+    
+    PREFIX = 'nexus-warm-'
+    LATENCY_SAMPLES = 200
+    
+    def __init__(self, manager, size: int):
+        self.manager = manager
+        self.size = size
+        self.lock = threading.Lock()
+        self.refill_lock = threading.Lock()
+        self.spares = {}
+        self.fingerprints = {}
+        self.claimed = set()
+        self.latency = {'warm': [], 'cold': [], 'reused': []}
+        self.last_refill = None
+        self.wake = threading.Event()
+        self.loop_thread = None
+    
+    @staticmethod
+    def _volumes(name: str) -> Dict[str, Dict[str, str]]:
+        suffix = name[len(WarmPool.PREFIX):]
+        return {f'nexus_warm_{suffix}_data': {'bind': '/app/data', 'mode': 'rw'},
+                f'nexus_warm_{suffix}_logs': {'bind': '/app/logs', 'mode': 'rw'}}
+    
+    def _spec(self, image_id: str) -> Dict[str, Any]:
+        # The single-node spec without the node's identity, which is bound at claim time
+        spec = self.manager.single_node_spec('', WARM_POOL_THREADS, WARM_POOL_MEMORY, WARM_POOL_CPUS)
+        del spec['environment']['NODE_ID'], spec['labels']['nexus.node-id']
+        spec['labels'][WARM_POOL_LABEL] = image_id
+        spec['labels'][CONFIG_FINGERPRINT_LABEL] = config_fingerprint(spec, image_id)
+        return spec
+    
+    def _create(self, client, spec: Dict[str, Any]):
+        name = f'{self.PREFIX}{os.urandom(4).hex()}'
+        return client.containers.create(**dict(spec, name=name, volumes=self._volumes(name)))
+    
+    def _remove(self, client, container):
+        container.remove(force=True)
+        for volume in self._volumes(container.name):
+            try:
+                client.volumes.get(volume).remove()
+            except NotFound:
+                pass
+    
+    def refill(self) -> Dict[str, Any]:
+        """Top every host up to size spares, replacing spares built from an outdated image"""
+        manager = self.manager
+        
+        def refill_host(host, client):
+            try:
+                image = client.images.get(manager.nexus_image)
+            except NotFound:
+                return {'spares': 0, 'error': f'Image {manager.nexus_image} not found'}
+            if not image.labels.get(NODE_ENV_LABEL):
+                with self.lock:
+                    self.spares[host] = []
+                return {'spares': 0, 'error': f'Image {manager.nexus_image} predates warm pool support; rebuild it'}
+            image_id = image.id
+            manager.ensure_network(client)
+            spec = self._spec(image_id)
+            fingerprint = spec['labels'][CONFIG_FINGERPRINT_LABEL]
+            
+            spares, removed = [], 0
+            for container in client.containers.list(all=True, filters={'label': WARM_POOL_LABEL}):
+                if not container.name.startswith(self.PREFIX) or container.id in self.claimed:
+                    continue
+                if container.labels.get(CONFIG_FINGERPRINT_LABEL) != fingerprint or container.status != 'created':
+                    self._remove(client, container)
+                    removed += 1
+                else:
+                    spares.append(container.id)
+            
+            created = 0
+            while len(spares) < self.size:
+                spares.append(self._create(client, spec).id)
+                created += 1
+            
+            with self.lock:
+                self.spares[host] = [c for c in spares if c not in self.claimed]
+                self.fingerprints[host] = fingerprint
+            return {'spares': len(spares), 'created': created, 'removed': removed, 'image': image_id}
+        
+        with self.refill_lock:
+            hosts = manager.map_docker_hosts(refill_host, timeout=max(DOCKER_HOST_TIMEOUT, 120))
+        self.last_refill = {'time': datetime.now().isoformat(), 'hosts': hosts}
+        return self.last_refill
+    
+    def claim(self, host: str, node_id: str, spec: Dict[str, Any]):
+        """Bind a spare on host to the node spec and start it; None when no matching spare is available.
+
+        spec must carry its config fingerprint. A node whose volumes already exist from an
+        earlier run starts cold so it mounts them as they are.
+        """
+        client = self.manager.get_docker_client(host)
+        with self.lock:
+            spares = self.spares.get(host) or []
+            if not spares or spec['labels'].get(CONFIG_FINGERPRINT_LABEL) != self.fingerprints.get(host):
+                return None
+        for volume in spec['volumes']:
+            try:
+                client.volumes.get(volume)
+                return None
+            except NotFound:
+                pass
+        with self.lock:
+            # A refill may have replaced the spares or the fingerprint since the first check
+            spares = self.spares.get(host) or []
+            if not spares or spec['labels'].get(CONFIG_FINGERPRINT_LABEL) != self.fingerprints.get(host):
+                return None
+            container_id = spares.pop()
+            self.claimed.add(container_id)
+        self.wake.set()
+        
+        container, created = None, []
+        try:
+            container = client.containers.get(container_id)
+            
+            # Give the node its named volumes, backed by the directories the spare already mounts
+            spare_volumes = {volume['bind']: name for name, volume in self._volumes(container.name).items()}
+            for name, volume in spec['volumes'].items():
+                mountpoint = client.volumes.get(spare_volumes[volume['bind']]).attrs.get('Mountpoint')
+                if not mountpoint:
+                    raise RuntimeError(f"volume {spare_volumes[volume['bind']]} has no local mountpoint")
+                client.volumes.create(name, driver='local', driver_opts={'type': 'none', 'o': 'bind', 'device': mountpoint},
+                                      labels={WARM_POOL_LABEL: spare_volumes[volume['bind']]})
+                created.append(name)
+            
+            node_env = f"export NODE_ID={shlex.quote(node_id)}\n".encode()
+            archive = io.BytesIO()
+            with tarfile.open(fileobj=archive, mode='w') as tar:
+                info = tarfile.TarInfo('node.env')
+                info.size, info.mode, info.mtime = len(node_env), 0o644, int(time.time())
+                tar.addfile(info, io.BytesIO(node_env))
+            container.put_archive('/app', archive.getvalue())
+            
+            container.rename(spec['name'])
+            container.start()
+            return container
+        except Exception as e:
+            app.logger.warning(f"Warm start of node {node_id} on {host} failed, falling back to cold: {str(e)}")
+            for name in created:
+                try:
+                    client.volumes.get(name).remove()
+                except Exception:
+                    pass
+            if container is not None:
+                try:
+                    self._remove(client, container)
+                except Exception:
+                    pass
+            return None
+        finally:
+            with self.lock:
+                self.claimed.discard(container_id)
+    
+    def record(self, path: str, seconds: float):
+        with self.lock:
+            samples = self.latency[path]
+            samples.append(seconds)
+            del samples[:-self.LATENCY_SAMPLES]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Spares per host and start latency for warm and cold starts"""
+        with self.lock:
+            latency = {}
+            for path, samples in self.latency.items():
+                ordered = sorted(samples)
+                latency[path] = {
+                    'count': len(ordered),
+                    'avg': round(sum(ordered) / len(ordered), 3) if ordered else None,
+                    'p50': round(ordered[len(ordered) // 2], 3) if ordered else None,
+                    'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3) if ordered else None
+                }
+            return {
+                'size': self.size,
+                'spares': {host: len(spares) for host, spares in self.spares.items()},
+                'latency': latency,
+                'last_refill': self.last_refill
+            }
+    
+    def start_loop(self, interval: int):
+        """Refill every interval seconds, or right after a spare is claimed"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            while True:
+                try:
+                    self.refill()
+                except Exception as e:
+                    app.logger.error(f"Warm pool refill failed: {str(e)}")
+                self.wake.wait(interval)
+                self.wake.clear()
+        
+        self.loop_thread = threading.Thread(target=loop, name='warm-pool', daemon=True)
+        self.loop_thread.start()
 
-# Docker client (if available)
-docker_client = None
-if DOCKER_AVAILABLE:
-    try:
-        docker_client = docker.from_env()
-    except Exception:
-        DOCKER_AVAILABLE = False
+class Autoscaler:
+    """Adds and removes single-instance nodes so a host runs as many provers as it can sustain.
+
+    Scaling up needs headroom on every signal (CPU, memory, swap-out rate, temperature) for
+    `sustain` passes in a row, and any pressure signal held as long scales down. The low and
+    high thresholds leave a dead band between them, and each action starts a cooldown. A
+    scale-up that doesn't raise fleet throughput is undone, and further scale-ups wait out
+    saturation_hold. Every decision goes to a JSON-lines audit trail.
+    """
+    
+    LABEL = 'nexus.autoscaled'
+    DEFAULTS = {
+        'enabled': True,
+        'min_nodes': 0,
+        'max_nodes': 4,
+        'spare_node_ids': [],
+        'threads': 4,
+        'memory_limit': '2g',
+        'cpu_limit': 2.0,
+        'host': None,
+        'cpu_high': 85.0,
+        'cpu_low': 60.0,
+        'memory_high': 85.0,
+        'memory_low': 70.0,
+        'swap_out_max': '1m',
+        'temperature_max': 85.0,
+        'sustain': 3,
+        'scale_up_cooldown': 300,
+        'scale_down_cooldown': 120,
+        'min_throughput_gain': 0.5,
+        'saturation_hold': 1800
+    }
+    
+    def __init__(self, manager, policy_path: str, audit_path: str):
+        self.manager = manager
+        self.policy_path = policy_path
+        self.audit_path = audit_path
+        self.policy_cache = None
+        self.lock = threading.Lock()
+        self.streaks = {'up': 0, 'down': 0}
+        self.last_action = None
+        self.pending_gain = None
+        self.saturated_until = 0
+        self.last_swap = None
+        self.last_decision = None
+        self.loop_thread = None
+    
+    # Policy
+    def load_policy(self) -> Dict[str, Any]:
+        """Policy from the policy file, re-parsed only when it changes"""
+        mtime = os.path.getmtime(self.policy_path)
+        if self.policy_cache and self.policy_cache[0] == mtime:
+            return self.policy_cache[1]
+        with open(self.policy_path) as f:
+            policy = self.parse_policy(yaml.safe_load(f) or {})
+        self.policy_cache = (mtime, policy)
+        return policy
+    
+    def save_policy(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and write a new policy"""
+        policy = self.parse_policy(data)
+        with open(self.policy_path, 'w') as f:
+            yaml.safe_dump(data, f, sort_keys=False)
+        self.policy_cache = None
+        return policy
+    
+    def parse_policy(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        unknown = set(data) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown policy keys: {', '.join(sorted(unknown))}")
+        policy = {**self.DEFAULTS, **data}
+        policy['spare_node_ids'] = [str(n) for n in policy['spare_node_ids'] or []]
+        policy['swap_out_max'] = parse_memory_size(policy['swap_out_max'])
+        parse_memory_size(policy['memory_limit'])
+        if not 0 <= policy['min_nodes'] <= policy['max_nodes']:
+            raise ValueError('Need 0 <= min_nodes <= max_nodes')
+        if policy['cpu_low'] >= policy['cpu_high'] or policy['memory_low'] >= policy['memory_high']:
+            raise ValueError('Low thresholds must be below high thresholds')
+        if policy['sustain'] < 1:
+            raise ValueError('sustain must be at least 1')
+        return policy
+    
+    # Inputs
+    def signals(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Host utilization from the cached metrics; swap-out is a rate over the last pass"""
+        now = time.time()
+        swap_out = (metrics.get('swap') or {}).get('sout', 0)
+        rate = 0.0
+        if self.last_swap and now > self.last_swap[0]:
+            rate = max(0.0, (swap_out - self.last_swap[1]) / (now - self.last_swap[0]))
+        self.last_swap = (now, swap_out)
+        return {
+            'cpu_percent': metrics.get('cpu_percent', 0),
+            'memory_percent': (metrics.get('memory') or {}).get('percent', 0),
+            'swap_out_rate': round(rate),
+            'temperature': metrics.get('temperature')
+        }
+    
+    def nodes(self) -> List[Dict[str, Any]]:
+        """Autoscaled node instances, oldest first"""
+        instances = self.manager.get_cached_instances(max_age=AUTOSCALE_INTERVAL or RESPONSE_CACHE_TTL)
+        nodes = [i for i in instances if i['mode'] == 'docker' and (i.get('labels') or {}).get(self.LABEL)]
+        return sorted(nodes, key=lambda n: instance_started_at(n) or 0)
+    
+    # Decision
+    def _decide(self, policy: Dict[str, Any], signals: Dict[str, Any], nodes: List[Dict[str, Any]],
+                available: List[str], throughput: float, now: float) -> tuple:
+        count = len(nodes)
+        since_action = now - self.last_action[0] if self.last_action else float('inf')
+        
+        pressure = []
+        if signals['cpu_percent'] > policy['cpu_high']:
+            pressure.append(f"cpu {signals['cpu_percent']}% > {policy['cpu_high']}%")
+        if signals['memory_percent'] > policy['memory_high']:
+            pressure.append(f"memory {signals['memory_percent']}% > {policy['memory_high']}%")
+        if signals['swap_out_rate'] > policy['swap_out_max']:
+            pressure.append(f"swapping out {format_memory_size(signals['swap_out_rate'])}/s")
+        if signals['temperature'] is not None and signals['temperature'] > policy['temperature_max']:
+            pressure.append(f"temperature {signals['temperature']}C > {policy['temperature_max']}C")
+        headroom = (not pressure and signals['cpu_percent'] < policy['cpu_low']
+                    and signals['memory_percent'] < policy['memory_low'])
+        
+        self.streaks['down'] = self.streaks['down'] + 1 if pressure else 0
+        self.streaks['up'] = self.streaks['up'] + 1 if headroom else 0
+        
+        if count < policy['min_nodes'] and available:
+            return 'scale_up', f"{count} nodes is below min_nodes {policy['min_nodes']}", available[0]
+        if count > policy['max_nodes']:
+            return 'scale_down', f"{count} nodes is above max_nodes {policy['max_nodes']}", nodes[-1]['node_id']
+        
+        # Judge the last scale-up once its cooldown has let throughput settle
+        pending = self.pending_gain
+        if pending and since_action >= policy['scale_up_cooldown']:
+            self.pending_gain = None
+            expected = policy['min_throughput_gain'] * pending['baseline'] / max(1, pending['nodes'])
+            if pending['baseline'] > 0 and throughput - pending['baseline'] < expected and \
+                    any(n['node_id'] == pending['node_id'] for n in nodes):
+                self.saturated_until = now + policy['saturation_hold']
+                return 'scale_down', (f"throughput rose {throughput - pending['baseline']:.2f}/min after adding "
+                                      f"{pending['node_id']}, expected {expected:.2f}; host is saturated"), pending['node_id']
+        
+        if pressure:
+            if self.streaks['down'] < policy['sustain']:
+                return 'hold', f"pressure ({', '.join(pressure)}) for {self.streaks['down']}/{policy['sustain']} passes", None
+            if count <= policy['min_nodes']:
+                return 'hold', f"pressure ({', '.join(pressure)}) but at min_nodes", None
+            if since_action < policy['scale_down_cooldown']:
+                return 'hold', f"pressure ({', '.join(pressure)}) but in cooldown", None
+            return 'scale_down', f"pressure: {', '.join(pressure)}", nodes[-1]['node_id']
+        
+        if headroom:
+            if self.streaks['up'] < policy['sustain']:
+                return 'hold', f"headroom for {self.streaks['up']}/{policy['sustain']} passes", None
+            if count >= policy['max_nodes']:
+                return 'hold', 'headroom but at max_nodes', None
+            if not available:
+                return 'hold', 'headroom but no spare node IDs left', None
+            if now < self.saturated_until:
+                return 'hold', 'headroom but host was saturated; holding', None
+            if since_action < policy['scale_up_cooldown']:
+                return 'hold', 'headroom but in cooldown', None
+            return 'scale_up', (f"headroom: cpu {signals['cpu_percent']}%, memory {signals['memory_percent']}% "
+                                f"for {self.streaks['up']} passes"), available[0]
+        
+        return 'hold', 'within target band', None
+    
+    def evaluate(self, dry_run: bool = False) -> Dict[str, Any]:
+        """One control pass: read inputs, decide, act and audit"""
+        with self.lock:
+            policy = self.load_policy()
+            now = time.time()
+            signals = self.signals(self.manager.get_cached_system_metrics(max_age=AUTOSCALE_INTERVAL or RESPONSE_CACHE_TTL))
+            nodes = self.nodes()
+            in_use = {n['node_id'] for n in nodes}
+            available = [n for n in policy['spare_node_ids'] if n not in in_use]
+            throughput = sum(record_throughput(i) for i in self.manager.instances_snapshot[1]) \
+                if self.manager.instances_snapshot else 0.0
+            
+            action, reason, node_id = self._decide(policy, signals, nodes, available, throughput, now)
+            decision = {
+                'time': datetime.now().isoformat(),
+                'action': action,
+                'node_id': node_id,
+                'reason': reason,
+                'nodes': len(nodes),
+                'signals': signals,
+                'throughput': round(throughput, 3),
+                'dry_run': dry_run
+            }
+            
+            if action != 'hold' and not dry_run:
+                if action == 'scale_up':
+                    result = self.manager.create_single_node_container(
+                        node_id, policy['threads'], policy['memory_limit'], policy['cpu_limit'],
+                        host=policy['host'], labels={self.LABEL: 'true'})
+                    if result.get('success'):
+                        self.pending_gain = {'node_id': node_id, 'baseline': throughput, 'nodes': len(nodes)}
+                else:
+                    node = next(n for n in nodes if n['node_id'] == node_id)
+                    result = self.manager.remove_node(node['container_name'], host=node.get('host'))
+                decision['result'] = result
+                self.last_action = (now, action)
+                self.streaks = {'up': 0, 'down': 0}
+                self.manager.instances_snapshot = None
+            
+            # Holds are audited when their reason changes, so a steady state doesn't flood the trail
+            if action != 'hold' or dry_run or not self.last_decision or self.last_decision['reason'] != reason:
+                self._audit(decision)
+            self.last_decision = decision
+            return decision
+    
+    # Audit trail
+    def _audit(self, decision: Dict[str, Any]):
+        log = app.logger.info if decision['action'] == 'hold' else app.logger.warning
+        log(f"Autoscaler {decision['action']} {decision['node_id'] or ''}: {decision['reason']}")
+        try:
+            os.makedirs(os.path.dirname(self.audit_path), exist_ok=True)
+            with open(self.audit_path, 'a') as f:
+                f.write(json.dumps(decision, default=str) + '\n')
+        except OSError as e:
+            app.logger.error(f"Failed to write autoscale audit: {str(e)}")
+    
+    def audit(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent decisions, newest last"""
+        if not os.path.exists(self.audit_path):
+            return []
+        lines, _ = LogTail(self.audit_path).tail(limit)
+        return [json.loads(line) for line in lines if line.strip()]
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            'policy_exists': os.path.exists(self.policy_path),
+            'streaks': dict(self.streaks),
+            'last_action': {'time': datetime.fromtimestamp(self.last_action[0]).isoformat(),
+                            'action': self.last_action[1]} if self.last_action else None,
+            'saturated_until': datetime.fromtimestamp(self.saturated_until).isoformat() if self.saturated_until else None,
+            'pending_gain': self.pending_gain,
+            'last_decision': self.last_decision
+        }
+    
+    def start_loop(self, interval: int):
+        """Evaluate every interval seconds while an enabled policy exists"""
+        if self.loop_thread and self.loop_thread.is_alive():
+            return
+        
+        def loop():
+            while True:
+                time.sleep(interval)
+                if not os.path.exists(self.policy_path):
+                    continue
+                try:
+                    if self.load_policy()['enabled']:
+                        self.evaluate()
+                except Exception as e:
+                    app.logger.error(f"Autoscaler pass failed: {str(e)}")
+        
+        self.loop_thread = threading.Thread(target=loop, name='autoscaler', daemon=True)
+        self.loop_thread.start()
 
 class NexusManager:
     """Enhanced Nexus CLI Manager supporting multiple deployment modes"""
@@ -50,19 +3258,56 @@ class NexusManager:
         self.nexus_image = 'nexus-cli:latest'
         self.network_name = 'nexus-network'
         
-        # Native process tracking
+        # Native process tracking: native_process_lock guards only the map, each node's
+        # start/stop is serialized by its own lock, and shutdowns finish in reaper threads
         self.native_processes = {}
         self.native_process_lock = threading.Lock()
+        self.native_node_locks = {}
+        self.native_registry_lock = threading.Lock()
+        self.adopt_native_processes()
+        
+        # Docker hosts (one client per endpoint) and last known container placement
+        self.docker_clients = self._connect_docker_hosts()
+        self.container_hosts = {}
+        self.host_executor = ThreadPoolExecutor(max_workers=max(4, len(self.docker_clients) * 2),
+                                                thread_name_prefix='docker-host')
+        
+        # Kubernetes backend (only used when an API server is configured)
+        self.k8s = KubernetesBackend()
+        
+        # Compose stacks are applied in-process on the default Docker host
+        self.compose = ComposeExecutor(self.compose_dir, self.compose_project, self.get_docker_client)
+        
+        # Desired-state fleet manifest
+        self.fleet = FleetReconciler(self, FLEET_MANIFEST)
+        self.rolling = RollingRestart(self)
+        self.warm_pool = WarmPool(self, WARM_POOL_SIZE)
+        self.autoscaler = Autoscaler(self, AUTOSCALE_POLICY, AUTOSCALE_AUDIT_PATH)
+        
+        # Fleet health, assessed from the cached instance snapshot
+        self.instances_snapshot = None
+        self.metrics_snapshot = None
+        self.health = HealthChecker(self, os.path.join(self.docker_dir, 'config', 'nexus-template.json'))
+        
+        # Full-text search over every instance's logs, with throughput parsed from the same stream
+        self.log_index = LogIndex(self, LOG_INDEX_PATH)
+        self.throughput = ThroughputTracker(THROUGHPUT_RULES)
+        self.log_index.stages.append(self.throughput.observe)
+        self.log_archive = LogArchive(LOG_ARCHIVE_DIR, parse_memory_size(LOG_ARCHIVE_MAX_SIZE),
+                                      LOG_ARCHIVE_MAX_AGE_DAYS * 86400)
+        self.log_index.stages.append(self.log_archive.observe)
         
         # Determine deployment capabilities
         self.capabilities = self._detect_capabilities()
         
     def _detect_capabilities(self) -> Dict[str, bool]:
         """Detect what deployment modes are available"""
+        docker_access = DOCKER_AVAILABLE and self._check_docker_access()
         capabilities = {
             'native': self._check_native_nexus(),
-            'docker': DOCKER_AVAILABLE and self._check_docker_access(),
-            'compose': self._check_compose_available()
+            'docker': docker_access,
+            'compose': docker_access and self._check_compose_available(),
+            'k8s': self.k8s.configured and self.k8s.ping()
         }
         return capabilities
     
@@ -76,28 +3321,115 @@ class NexusManager:
             return False
     
     def _check_docker_access(self) -> bool:
-        """Check if Docker is accessible"""
-        if not docker_client:
-            return False
-        try:
-            docker_client.ping()
-            return True
-        except Exception:
-            return False
+        """Check if at least one Docker host is accessible"""
+        return any(self.map_docker_hosts(lambda host, client: client.ping()).values())
+    
+    def _connect_docker_hosts(self) -> Dict[str, Any]:
+        """Create one Docker client per configured endpoint, keyed by host name"""
+        if not DOCKER_HOSTS:
+            return {'local': docker_client} if docker_client else {}
+        
+        clients = {}
+        for entry in DOCKER_HOSTS:
+            name, _, base_url = entry.rpartition('=')
+            name = name or base_url
+            try:
+                clients[name] = docker.DockerClient(base_url=base_url, timeout=DOCKER_HOST_TIMEOUT)
+            except Exception as e:
+                app.logger.warning(f"Docker host {name} unavailable: {str(e)}")
+        return clients
+    
+    # Docker Host Methods
+    def submit_docker_hosts(self, func, hosts: List[str] = None) -> Dict[Any, str]:
+        """Schedule func(host, client) on every Docker host, returning future -> host"""
+        hosts = hosts or list(self.docker_clients)
+        return {self.host_executor.submit(func, host, self.docker_clients[host]): host
+                for host in hosts if host in self.docker_clients}
+    
+    def collect_docker_hosts(self, futures: Dict[Any, str], timeout: float = None) -> Dict[str, Any]:
+        """Gather per-host results; hosts that fail or miss the deadline are left out"""
+        results = {}
+        if not futures:
+            return results
+        done, pending = wait(futures, timeout=timeout or DOCKER_HOST_TIMEOUT)
+        for future in done:
+            host = futures[future]
+            try:
+                results[host] = future.result()
+            except Exception as e:
+                app.logger.error(f"Docker host {host} failed: {str(e)}")
+        for future in pending:
+            future.cancel()
+            app.logger.warning(f"Docker host {futures[future]} timed out")
+        return results
+    
+    def map_docker_hosts(self, func, hosts: List[str] = None, timeout: float = None) -> Dict[str, Any]:
+        """Run func(host, client) on all Docker hosts in parallel"""
+        return self.collect_docker_hosts(self.submit_docker_hosts(func, hosts), timeout)
+    
+    def get_docker_client(self, host: str = None):
+        """Get the client for a host, defaulting to the first configured one"""
+        if host:
+            if host not in self.docker_clients:
+                raise ValueError(f"Unknown Docker host: {host}")
+            return self.docker_clients[host]
+        if not self.docker_clients:
+            raise RuntimeError("Docker not available")
+        return next(iter(self.docker_clients.values()))
+    
+    def find_container(self, container_name: str, host: str = None):
+        """Locate a container across hosts, returning (host, container)"""
+        if host:
+            return host, self.get_docker_client(host).containers.get(container_name)
+        
+        cached_host = self.container_hosts.get(container_name)
+        if cached_host in self.docker_clients:
+            try:
+                return cached_host, self.docker_clients[cached_host].containers.get(container_name)
+            except NotFound:
+                pass
+        
+        def lookup(host, client):
+            try:
+                return client.containers.get(container_name)
+            except NotFound:
+                return None
+        
+        for found_host, container in self.map_docker_hosts(lookup).items():
+            if container is not None:
+                self.container_hosts[container_name] = found_host
+                return found_host, container
+        raise NotFound(f"Container {container_name} not found")
+    
+    def get_host_loads(self) -> Dict[str, Dict[str, Any]]:
+        """Running containers per CPU and memory for every reachable host"""
+        def host_load(host, client):
+            info = client.info()
+            cpus = max(1, info.get('NCPU') or 1)
+            return {
+                'containers_running': info.get('ContainersRunning', 0),
+                'cpus': cpus,
+                'memory_total': info.get('MemTotal', 0),
+                'load': info.get('ContainersRunning', 0) / cpus
+            }
+        return self.map_docker_hosts(host_load)
+    
+    def select_docker_host(self) -> str:
+        """Pick the least-loaded reachable Docker host for new containers"""
+        if len(self.docker_clients) <= 1:
+            return next(iter(self.docker_clients), None)
+        loads = self.get_host_loads()
+        if not loads:
+            raise RuntimeError("No Docker host reachable")
+        return min(loads, key=lambda host: (loads[host]['load'], -loads[host]['memory_total']))
     
     def _check_compose_available(self) -> bool:
-        """Check if Docker Compose is available"""
+        """Check if the compose stack can be parsed (services are applied through the Docker SDK)"""
         try:
-            result = subprocess.run(['docker-compose', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            try:
-                result = subprocess.run(['docker', 'compose', 'version'], 
-                                      capture_output=True, text=True, timeout=5)
-                return result.returncode == 0
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                return False
+            return bool(self.compose.load()['services'])
+        except Exception as e:
+            app.logger.warning(f"Compose file unavailable: {str(e)}")
+            return False
     
     def get_deployment_modes(self) -> List[Dict[str, Any]]:
         """Get available deployment modes with descriptions"""
@@ -142,18 +3474,115 @@ class NexusManager:
                 'features': ['Service orchestration', 'Network isolation', 'Volume management']
             })
         
+        if self.capabilities['k8s']:
+            modes.append({
+                'id': 'k8s',
+                'name': 'Kubernetes',
+                'description': f'One Deployment per node in the {self.k8s.namespace} namespace',
+                'icon': 'fas fa-dharmachakra',
+                'color': 'indigo',
+                'features': ['Cluster-wide scheduling', 'Self-healing pods', 'Scales past one host']
+            })
+        
         return modes
         
     # Native Process Management Methods
+    def save_native_registry(self):
+        """Persist the native registry so a restarted manager can re-adopt running processes"""
+        with self.native_registry_lock:
+            with self.native_process_lock:
+                records = {node_id: {
+                    'pid': info['pid'],
+                    'create_time': info['create_time'],
+                    'start_time': info['start_time'].isoformat(),
+                    'cmdline': info['cmdline'],
+                    'threads': info['threads'],
+                    'log_path': info.get('log_path'),
+                    'managed': info.get('managed', False)
+                } for node_id, info in self.native_processes.items() if info['status'] == 'running'}
+            try:
+                os.makedirs(os.path.dirname(NATIVE_REGISTRY_PATH), exist_ok=True)
+                tmp_path = f'{NATIVE_REGISTRY_PATH}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(records, f, indent=2)
+                os.replace(tmp_path, NATIVE_REGISTRY_PATH)
+            except OSError as e:
+                app.logger.error(f"Failed to save native registry: {str(e)}")
+    
+    def adopt_native_processes(self) -> List[str]:
+        """Re-register native processes a previous manager run left running.
+
+        A record is adopted only if its pid is alive with the same create time and command
+        line, so a pid reused by an unrelated process is never touched.
+        """
+        try:
+            with open(NATIVE_REGISTRY_PATH) as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            app.logger.error(f"Failed to load native registry: {str(e)}")
+            return []
+        
+        adopted = []
+        for node_id, record in records.items():
+            try:
+                ps_process = psutil.Process(record['pid'])
+                if abs(ps_process.create_time() - record['create_time']) > 1:
+                    continue
+                # Script launchers show up with their interpreter in front of the recorded command
+                actual, expected = ps_process.cmdline(), record['cmdline']
+                if actual[len(actual) - len(expected) + 1:] != expected[1:] or \
+                        os.path.basename(expected[0]) not in map(os.path.basename, actual):
+                    continue
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            with self.native_process_lock:
+                self.native_processes[node_id] = {
+                    'process': AdoptedProcess(ps_process, record['cmdline']),
+                    'ps_process': ps_process,
+                    'pid': record['pid'],
+                    'create_time': record['create_time'],
+                    'start_time': datetime.fromisoformat(record['start_time']),
+                    'cmdline': record['cmdline'],
+                    'threads': record['threads'],
+                    'status': 'running',
+                    'log_path': record.get('log_path'),
+                    'managed': record.get('managed', False),
+                    'adopted': True
+                }
+            adopted.append(node_id)
+        
+        if adopted:
+            app.logger.info(f"Re-adopted native instances: {', '.join(adopted)}")
+        self.save_native_registry()
+        return adopted
+    
+    def _native_node_lock(self, node_id: str) -> threading.Lock:
+        with self.native_process_lock:
+            return self.native_node_locks.setdefault(node_id, threading.Lock())
+    
+    def _drop_native_node_lock(self, node_id: str):
+        # Forget the lock of a node that is gone, unless a start or stop is holding it right now
+        with self.native_process_lock:
+            node_lock = self.native_node_locks.get(node_id)
+            if node_id not in self.native_processes and node_lock is not None and not node_lock.locked():
+                del self.native_node_locks[node_id]
+    
     def start_native_instance(self, node_id: str, threads: int = 4, 
                             additional_args: List[str] = None) -> Dict[str, Any]:
         """Start a native Nexus CLI instance on the host"""
         if not self.capabilities['native']:
             return {"success": False, "error": "Native Nexus CLI not available"}
         
-        with self.native_process_lock:
-            if node_id in self.native_processes:
-                return {"success": False, "error": f"Instance {node_id} already running"}
+        with self._native_node_lock(node_id):
+            with self.native_process_lock:
+                current = self.native_processes.get(node_id)
+            if current:
+                if current['status'] == 'stopping':
+                    return {"success": False, "error": f"Instance {node_id} is still stopping"}
+                if current['process'].poll() is None:
+                    return {"success": False, "error": f"Instance {node_id} already running"}
             
             try:
                 # Prepare command
@@ -163,24 +3592,37 @@ class NexusManager:
                 if additional_args:
                     cmd.extend(additional_args)
                 
-                # Start process
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
+                # Start process, sending its output to a per-node log file
+                os.makedirs(NATIVE_LOG_DIR, exist_ok=True)
+                log_path = os.path.join(NATIVE_LOG_DIR, f'{node_id}.log')
+                # Own session, so signals to the manager's process group don't reach the prover
+                with open(log_path, 'ab') as log_file:
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=log_file,
+                        stderr=subprocess.STDOUT,
+                        start_new_session=True
+                    )
                 
-                # Store process info
-                self.native_processes[node_id] = {
+                # Register before anything else can fail, so a running prover is never orphaned
+                process_info = {
                     'process': process,
                     'pid': process.pid,
+                    'create_time': time.time(),
                     'start_time': datetime.now(),
+                    'cmdline': cmd,
                     'threads': threads,
-                    'status': 'running'
+                    'status': 'running',
+                    'log_path': log_path
                 }
+                with self.native_process_lock:
+                    self.native_processes[node_id] = process_info
+                try:
+                    # Adoption matches on the kernel's create time; keep the fallback if it can't be read
+                    process_info['create_time'] = psutil.Process(process.pid).create_time()
+                except psutil.Error as e:
+                    app.logger.warning(f"Could not read create time of native instance {node_id}: {str(e)}")
+                self.save_native_registry()
                 
                 return {
                     "success": True,
@@ -192,160 +3634,308 @@ class NexusManager:
             except Exception as e:
                 return {"success": False, "error": str(e)}
     
-    def stop_native_instance(self, node_id: str) -> Dict[str, Any]:
-        """Stop a native Nexus CLI instance"""
-        with self.native_process_lock:
-            if node_id not in self.native_processes:
+    def stop_native_instance(self, node_id: str, timeout: float = NATIVE_STOP_TIMEOUT,
+                             wait: bool = True) -> Dict[str, Any]:
+        """Stop a native Nexus CLI instance.
+
+        Sends SIGTERM and hands the process to a reaper thread that sends SIGKILL once
+        `timeout` passes. With wait=False this returns as soon as the signal is sent.
+        """
+        with self._native_node_lock(node_id):
+            with self.native_process_lock:
+                process_info = self.native_processes.get(node_id)
+            exit_code = process_info['process'].poll() if process_info and process_info['status'] != 'stopping' else None
+            if not process_info or exit_code is not None:
+                # Unknown, or already exited on its own: nothing left to signal
+                reaper = None
+                if process_info:
+                    with self.native_process_lock:
+                        if self.native_processes.get(node_id) is process_info:
+                            del self.native_processes[node_id]
+                    self.save_native_registry()
+            else:
+                if process_info['status'] != 'stopping':
+                    try:
+                        # Graceful shutdown
+                        process = process_info['process']
+                        if platform.system() == "Windows":
+                            process.terminate()
+                        else:
+                            process.send_signal(signal.SIGTERM)
+                    except Exception as e:
+                        return {"success": False, "error": str(e)}
+                    
+                    process_info.update(status='stopping', stop_requested=time.time(), stop_deadline=time.time() + timeout)
+                    self.save_native_registry()
+                    process_info['reaper'] = threading.Thread(target=self._reap_native_instance,
+                                                              args=(node_id, process_info, timeout),
+                                                              name=f'native-reaper-{node_id}', daemon=True)
+                    process_info['reaper'].start()
+                reaper = process_info['reaper']
+        
+        if reaper is None:
+            self._drop_native_node_lock(node_id)
+            if not process_info:
                 return {"success": False, "error": f"Instance {node_id} not found"}
-            
+            return {"success": True, "node_id": node_id, "exit_code": exit_code, "killed": False, "duration": 0}
+        if not wait:
+            return {"success": True, "node_id": node_id, "status": "stopping",
+                    "deadline": datetime.fromtimestamp(process_info['stop_deadline']).isoformat()}
+        reaper.join()
+        self._drop_native_node_lock(node_id)
+        return process_info['stop_result']
+    
+    def _reap_native_instance(self, node_id: str, process_info: Dict[str, Any], timeout: float):
+        # Wait out the grace period without holding any lock, then escalate to SIGKILL
+        process = process_info['process']
+        killed = False
+        try:
             try:
-                process_info = self.native_processes[node_id]
-                process = process_info['process']
-                
-                # Graceful shutdown
-                if platform.system() == "Windows":
-                    process.terminate()
-                else:
-                    process.send_signal(signal.SIGTERM)
-                
-                # Wait for graceful shutdown
-                try:
-                    process.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-                
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                killed = True
+                process.wait()
+            result = {"success": True, "node_id": node_id, "exit_code": process.returncode, "killed": killed}
+        except Exception as e:
+            app.logger.error(f"Failed to stop native instance {node_id}: {str(e)}")
+            result = {"success": False, "node_id": node_id, "error": str(e)}
+        
+        result['duration'] = round(time.time() - process_info['stop_requested'], 3)
+        process_info['stop_result'] = result
+        with self.native_process_lock:
+            if self.native_processes.get(node_id) is process_info:
                 del self.native_processes[node_id]
-                
-                return {"success": True, "node_id": node_id}
-                
-            except Exception as e:
-                return {"success": False, "error": str(e)}
+        self._drop_native_node_lock(node_id)
+    
+    def bulk_native_action(self, action: str, node_ids: List[str], threads: int = 4,
+                           parallelism: int = BULK_ACTION_PARALLELISM, timeout: float = NATIVE_STOP_TIMEOUT):
+        """Start, stop or restart many native instances concurrently, yielding each result as it finishes"""
+        executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='native-bulk')
+        
+        def run(node_id):
+            started_at = time.time()
+            result = {"success": True}
+            if action in ('stop', 'restart'):
+                result = self.stop_native_instance(node_id, timeout=timeout)
+                if action == 'restart' and not result.get('success'):
+                    result = {"success": True}
+            if action in ('start', 'restart') and result.get('success'):
+                result = self.start_native_instance(node_id, threads=threads)
+            return dict(result, node_id=node_id, duration=round(time.time() - started_at, 3))
+        
+        started = time.time()
+        succeeded = failed = 0
+        try:
+            futures = [executor.submit(run, node_id) for node_id in node_ids]
+            for future in as_completed(futures):
+                result = future.result()
+                if result.get('success'):
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield {'summary': {'action': action, 'total': len(node_ids), 'succeeded': succeeded, 'failed': failed,
+                           'duration': round(time.time() - started, 3)}}
+    
+    @staticmethod
+    def _sample_natives(infos: List[Dict[str, Any]]) -> Dict[int, Optional[tuple]]:
+        # (cpu percent, rss bytes) per pid, None once the process is gone. cpu_percent measures
+        # since the previous call on the same handle, so each registry entry keeps its own.
+        samples = {}
+        for info in infos:
+            try:
+                if 'ps_process' not in info:
+                    info['ps_process'] = psutil.Process(info['pid'])
+                ps_process = info['ps_process']
+                samples[info['pid']] = (ps_process.cpu_percent(), ps_process.memory_info().rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                samples[info['pid']] = None
+        return samples
     
     def get_native_instances(self) -> List[Dict[str, Any]]:
         """Get status of all native instances"""
         instances = []
         
+        # Snapshot the registry so stats collection never holds the lock
         with self.native_process_lock:
-            for node_id, info in list(self.native_processes.items()):
-                process = info['process']
-                
-                # Check if process is still running
-                if process.poll() is not None:
-                    # Process has terminated
-                    info['status'] = 'stopped'
-                    del self.native_processes[node_id]
-                    continue
-                
-                try:
-                    # Get process stats using psutil
-                    ps_process = psutil.Process(info['pid'])
-                    cpu_percent = ps_process.cpu_percent()
-                    memory_info = ps_process.memory_info()
-                    
-                    instances.append({
-                        'node_id': node_id,
-                        'mode': 'native',
-                        'pid': info['pid'],
-                        'status': info['status'],
-                        'start_time': info['start_time'].isoformat(),
-                        'threads': info['threads'],
-                        'cpu_percent': cpu_percent,
-                        'memory_mb': memory_info.rss / 1024 / 1024,
-                        'uptime': str(datetime.now() - info['start_time'])
-                    })
-                    
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    # Process no longer exists
-                    del self.native_processes[node_id]
+            registered = list(self.native_processes.items())
+        
+        exited, live = [], []
+        for node_id, info in registered:
+            # Check if process is still running; a stopping process is left to its reaper
+            if info['process'].poll() is not None:
+                if info['status'] != 'stopping':
+                    exited.append((node_id, info))
+                continue
+            live.append((node_id, info))
+        
+        # Get process stats using psutil, off the hub in one batch
+        samples = offload.run(self._sample_natives, [info for _, info in live])
+        for node_id, info in live:
+            sample = samples.get(info['pid'])
+            if sample is None:
+                # Process no longer exists
+                exited.append((node_id, info))
+                continue
+            cpu_percent, rss = sample
+            instances.append({
+                'node_id': node_id,
+                'mode': 'native',
+                'pid': info['pid'],
+                'status': info['status'],
+                'start_time': info['start_time'].isoformat(),
+                'threads': info['threads'],
+                'cpu_percent': cpu_percent,
+                'memory_mb': rss / 1024 / 1024,
+                'uptime': str(datetime.now() - info['start_time']),
+                'adopted': info.get('adopted', False)
+            })
+        
+        # Exited instances stay registered until the health checker reports and restarts them
+        for node_id, info in exited:
+            info['status'] = 'exited'
+            instances.append({
+                'node_id': node_id,
+                'mode': 'native',
+                'pid': info['pid'],
+                'status': 'exited',
+                'exit_code': info['process'].poll(),
+                'start_time': info['start_time'].isoformat(),
+                'threads': info['threads'],
+                'adopted': info.get('adopted', False)
+            })
         
         return instances
 
     # Docker Management Methods (Enhanced)
-    def ensure_network(self):
+    def ensure_network(self, client=None):
         """Ensure the Nexus network exists"""
-        if not docker_client:
+        client = client or (self.get_docker_client() if self.docker_clients else None)
+        if not client:
             return
         try:
-            docker_client.networks.get(self.network_name)
+            client.networks.get(self.network_name)
         except NotFound:
-            docker_client.networks.create(
+            client.networks.create(
                 self.network_name,
                 driver="bridge",
                 options={"com.docker.network.bridge.enable_icc": "true"}
             )
     
-    def create_single_node_container(self, node_id: str, threads: int = 4, memory_limit: str = "2g", cpu_limit: float = 2.0) -> Dict[str, Any]:
-        """Create a single node container"""
+    def _reuse_stopped_container(self, client, spec: Dict[str, Any]):
+        """Stamp spec with its config fingerprint and start a stopped container that matches it.
+
+        Returns the started container, None when a new one must be created (a stale one is
+        removed first), or an error result when the container is already running.
+        """
+        try:
+            image_id = client.images.get(spec['image']).id
+        except NotFound:
+            image_id = spec['image']
+        fingerprint = config_fingerprint(spec, image_id)
+        spec['labels'][CONFIG_FINGERPRINT_LABEL] = fingerprint
+        
+        # Check if container already exists
+        try:
+            existing = client.containers.get(spec['name'])
+        except NotFound:
+            return None
+        if existing.status == 'running':
+            return {"success": False, "error": f"Container {spec['name']} already running"}
+        if existing.labels.get(CONFIG_FINGERPRINT_LABEL) == fingerprint:
+            existing.start()
+            return existing
+        existing.remove(force=True)
+        return None
+    
+    def single_node_spec(self, node_id: str, threads: int, memory_limit: str, cpu_limit: float,
+                         labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """containers.run arguments for a single node container"""
+        data_volume = f"nexus_node_{node_id}_data"
+        logs_volume = f"nexus_node_{node_id}_logs"
+        return {
+            'image': self.nexus_image,
+            'name': f"nexus-node-{node_id}",
+            'environment': {
+                'NODE_ID': node_id,
+                'MAX_THREADS': str(threads),
+                'NEXUS_ENVIRONMENT': 'production',
+                'CONTAINER_TYPE': 'single'
+            },
+            'volumes': {
+                data_volume: {'bind': '/app/data', 'mode': 'rw'},
+                logs_volume: {'bind': '/app/logs', 'mode': 'rw'}
+            },
+            'network': self.network_name,
+            'mem_limit': memory_limit,
+            'cpu_period': 100000,
+            'cpu_quota': int(cpu_limit * 100000),
+            'restart_policy': {"Name": "unless-stopped"},
+            'log_config': CONTAINER_LOG_CONFIG,
+            'command': "./scripts/start-single.sh",
+            'labels': {**(labels or {}), 'nexus.type': 'single-instance', 'nexus.node-id': node_id}
+        }
+    
+    def create_single_node_container(self, node_id: str, threads: int = 4, memory_limit: str = "2g", cpu_limit: float = 2.0,
+                                     host: str = None, labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """Create a single node container on the given (or least-loaded) Docker host.
+
+        A stopped container with the same config fingerprint is started as is. Otherwise a
+        warm-pool spare created with the same config is bound and started when one is available.
+        """
+        started = time.time()
         try:
-            self.ensure_network()
+            host = host or self.select_docker_host()
+            client = self.get_docker_client(host)
+            self.ensure_network(client)
             
-            container_name = f"nexus-node-{node_id}"
+            spec = self.single_node_spec(node_id, threads, memory_limit, cpu_limit, labels)
+            container_name = spec['name']
             
-            # Check if container already exists
-            try:
-                existing = docker_client.containers.get(container_name)
-                if existing.status == 'running':
-                    return {"success": False, "error": f"Container {container_name} already running"}
-                else:
-                    existing.remove(force=True)
-            except NotFound:
-                pass
+            container = self._reuse_stopped_container(client, spec)
+            if isinstance(container, dict):
+                return container
+            start_path = 'reused' if container else 'cold'
             
-            # Create volumes
-            data_volume = f"nexus_node_{node_id}_data"
-            logs_volume = f"nexus_node_{node_id}_logs"
+            if not container and self.warm_pool.size:
+                container = self.warm_pool.claim(host, node_id, spec)
+                start_path = 'warm' if container else 'cold'
             
             # Create container
-            container = docker_client.containers.run(
-                image=self.nexus_image,
-                name=container_name,
-                environment={
-                    'NODE_ID': node_id,
-                    'MAX_THREADS': str(threads),
-                    'NEXUS_ENVIRONMENT': 'production',
-                    'CONTAINER_TYPE': 'single'
-                },
-                volumes={
-                    data_volume: {'bind': '/app/data', 'mode': 'rw'},
-                    logs_volume: {'bind': '/app/logs', 'mode': 'rw'}
-                },
-                networks=[self.network_name],
-                mem_limit=memory_limit,
-                cpu_count=cpu_limit,
-                restart_policy={"Name": "unless-stopped"},
-                detach=True,
-                command="./scripts/start-single.sh"
-            )
+            container = container or client.containers.run(detach=True, **spec)
+            
+            self.container_hosts[container_name] = host
+            start_seconds = time.time() - started
+            self.warm_pool.record(start_path, start_seconds)
             
             return {
                 "success": True,
                 "container_id": container.short_id,
                 "container_name": container_name,
-                "node_id": node_id
+                "node_id": node_id,
+                "host": host,
+                "start_path": start_path,
+                "start_seconds": round(start_seconds, 3)
             }
             
         except Exception as e:
             app.logger.error(f"Failed to create single node container: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def create_multi_node_container(self, node_ids: List[str], total_threads: int = 16, memory_limit: str = "4g", cpu_limit: float = 4.0) -> Dict[str, Any]:
-        """Create a multi-node container"""
+    def create_multi_node_container(self, node_ids: List[str], total_threads: int = 16, memory_limit: str = "4g", cpu_limit: float = 4.0,
+                                    host: str = None, labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """Create a multi-node container on the given (or least-loaded) Docker host"""
         try:
-            self.ensure_network()
+            host = host or self.select_docker_host()
+            client = self.get_docker_client(host)
+            self.ensure_network(client)
             
             container_name = f"nexus-multi-{'-'.join(node_ids[:2])}"  # Use first 2 node IDs for naming
             
-            # Check if container already exists
-            try:
-                existing = docker_client.containers.get(container_name)
-                if existing.status == 'running':
-                    return {"success": False, "error": f"Container {container_name} already running"}
-                else:
-                    existing.remove(force=True)
-            except NotFound:
-                pass
-            
             # Create shared volumes
             data_volume = f"nexus_multi_{container_name}_data"
             logs_volume = f"nexus_multi_{container_name}_logs"
@@ -353,35 +3943,48 @@ class NexusManager:
             # Calculate threads per node
             threads_per_node = max(1, total_threads // len(node_ids))
             
-            # Create container
-            container = docker_client.containers.run(
-                image=self.nexus_image,
-                name=container_name,
-                environment={
+            spec = {
+                'image': self.nexus_image,
+                'name': container_name,
+                'environment': {
                     'NODE_IDS': ','.join(node_ids),
                     'MAX_THREADS': str(total_threads),
                     'THREADS_PER_NODE': str(threads_per_node),
                     'NEXUS_ENVIRONMENT': 'production',
                     'CONTAINER_TYPE': 'multi'
                 },
-                volumes={
+                'volumes': {
                     data_volume: {'bind': '/app/data', 'mode': 'rw'},
                     logs_volume: {'bind': '/app/logs', 'mode': 'rw'}
                 },
-                networks=[self.network_name],
-                mem_limit=memory_limit,
-                cpu_count=cpu_limit,
-                restart_policy={"Name": "unless-stopped"},
-                detach=True,
-                command="./scripts/start-multi.sh"
-            )
+                'network': self.network_name,
+                'mem_limit': memory_limit,
+                'cpu_period': 100000,
+                'cpu_quota': int(cpu_limit * 100000),
+                'restart_policy': {"Name": "unless-stopped"},
+                'log_config': CONTAINER_LOG_CONFIG,
+                'command': "./scripts/start-multi.sh",
+                'labels': {**(labels or {}), 'nexus.type': 'multi-instance', 'nexus.node-ids': ','.join(node_ids)}
+            }
+            
+            container = self._reuse_stopped_container(client, spec)
+            if isinstance(container, dict):
+                return container
+            reused = container is not None
+            
+            # Create container
+            container = container or client.containers.run(detach=True, **spec)
+            
+            self.container_hosts[container_name] = host
             
             return {
                 "success": True,
                 "container_id": container.short_id,
                 "container_name": container_name,
                 "node_ids": node_ids,
-                "total_threads": total_threads
+                "total_threads": total_threads,
+                "host": host,
+                "reused": reused
             }
             
         except Exception as e:
@@ -389,31 +3992,42 @@ class NexusManager:
             return {"success": False, "error": str(e)}
         
     def get_containers(self) -> List[Dict[str, Any]]:
-        """Get all Nexus-related containers"""
-        try:
+        """Get all Nexus-related containers across every Docker host"""
+        def list_host(host, client):
             containers = []
-            for container in docker_client.containers.list(all=True):
-                if 'nexus' in container.name.lower():
+            for container in client.containers.list(all=True):
+                if 'nexus' in container.name.lower() and not is_warm_spare(container.labels, container.name):
                     containers.append({
                         'id': container.short_id,
                         'name': container.name,
+                        'host': host,
                         'status': container.status,
                         'image': container.image.tags[0] if container.image.tags else 'unknown',
                         'created': container.attrs['Created'],
                         'state': container.attrs['State'],
                         'ports': container.ports,
                         'labels': container.labels,
-                        'stats': self.get_container_stats(container.id) if container.status == 'running' else None
+                        'cpu_limit': container_cpu_limit(container.attrs.get('HostConfig') or {}),
+                        'memory_limit': (container.attrs.get('HostConfig') or {}).get('Memory') or None,
+                        'stats': self.get_container_stats(container.id, host) if container.status == 'running' else None
                     })
             return containers
+        
+        try:
+            containers = []
+            for host, host_containers in self.map_docker_hosts(list_host).items():
+                for container in host_containers:
+                    self.container_hosts[container['name']] = host
+                containers.extend(host_containers)
+            return containers
         except Exception as e:
             app.logger.error(f"Failed to get containers: {str(e)}")
             return []
     
-    def get_container_stats(self, container_id: str) -> Dict[str, Any]:
+    def get_container_stats(self, container_id: str, host: str = None) -> Dict[str, Any]:
         """Get real-time stats for a container"""
         try:
-            container = docker_client.containers.get(container_id)
+            _, container = self.find_container(container_id, host)
             stats = container.stats(stream=False)
             
             # Calculate CPU percentage
@@ -438,24 +4052,206 @@ class NexusManager:
             app.logger.error(f"Failed to get container stats: {str(e)}")
             return None
     
+    def _max_temperature(self) -> Optional[float]:
+        # Hottest sensor in Celsius, where the platform exposes sensors at all
+        if not hasattr(psutil, 'sensors_temperatures'):
+            return None
+        try:
+            readings = [t.current for sensors in psutil.sensors_temperatures().values() for t in sensors if t.current]
+        except Exception:
+            return None
+        return max(readings) if readings else None
+    
+    def _sample_host(self) -> Dict[str, Any]:
+        return {
+            'memory': psutil.virtual_memory()._asdict(),
+            'swap': psutil.swap_memory()._asdict(),
+            'temperature': self._max_temperature(),
+            'disk': psutil.disk_usage('/')._asdict(),
+            'load_avg': os.getloadavg() if hasattr(os, 'getloadavg') else [0, 0, 0]
+        }
+    
+    def get_cached_system_metrics(self, max_age: float) -> Dict[str, Any]:
+        """System metrics from the last sample if recent enough, otherwise sample now"""
+        snapshot = self.metrics_snapshot
+        if snapshot and time.time() - snapshot[0] <= max_age:
+            return snapshot[1]
+        return self.get_system_metrics()
+    
     def get_system_metrics(self) -> Dict[str, Any]:
-        """Get system-wide metrics"""
+        """Get system-wide metrics, with Docker info gathered from all hosts in parallel"""
         try:
-            return {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory': psutil.virtual_memory()._asdict(),
-                'disk': psutil.disk_usage('/')._asdict(),
-                'load_avg': os.getloadavg() if hasattr(os, 'getloadavg') else [0, 0, 0],
-                'docker_info': docker_client.info()
+            # Query the Docker hosts while the local CPU sample is being taken
+            info_futures = self.submit_docker_hosts(lambda host, client: client.info())
+            # The CPU sample sleeps cooperatively; the /proc and sysfs reads run off the hub
+            metrics = {'cpu_percent': psutil.cpu_percent(interval=1), **offload.run(self._sample_host)}
+            docker_hosts = self.collect_docker_hosts(info_futures)
+            metrics['docker_info'] = next(iter(docker_hosts.values()), {})
+            metrics['docker_hosts'] = {
+                host: {
+                    'containers': info.get('Containers', 0),
+                    'containers_running': info.get('ContainersRunning', 0),
+                    'cpus': info.get('NCPU', 0),
+                    'memory_total': info.get('MemTotal', 0),
+                    'server_version': info.get('ServerVersion')
+                }
+                for host, info in docker_hosts.items()
             }
+            metrics['docker_hosts_unreachable'] = [h for h in self.docker_clients if h not in docker_hosts]
+            self.metrics_snapshot = (time.time(), metrics)
+            return metrics
+        except Exception as e:
+            app.logger.error(f"Failed to get system metrics: {str(e)}")
+            return {}
+    
+    def _container_resource_update(self, container, cpus: float = None, cpu_quota: int = None,
+                                   cpu_period: int = None, cpuset_cpus: str = None, mem_limit=None,
+                                   memswap_limit=None) -> Dict[str, Any]:
+        """Container.update() arguments for new limits, checked against what the container was created with"""
+        host_config = container.attrs.get('HostConfig', {})
+        update = {}
+        
+        if cpus is not None or cpu_quota is not None or cpu_period is not None:
+            # Docker refuses quota/period on a container created with NanoCpus, and docker-py's
+            # update() has no nano_cpus argument, so such a container has to be recreated
+            if host_config.get('NanoCpus'):
+                raise ValueError(f'{container.name} was created with NanoCpus, which cannot be updated in place; '
+                                 'recreate it to change its CPU limit')
+            period = int(cpu_period or host_config.get('CpuPeriod') or 100000)
+            quota = int(cpus * period) if cpus is not None else int(cpu_quota if cpu_quota is not None
+                                                                    else host_config.get('CpuQuota') or 0)
+            if quota and not 1000 <= period <= 1000000:
+                raise ValueError('cpu_period must be between 1000 and 1000000')
+            if quota and quota < 1000:
+                raise ValueError('cpu_quota must be at least 1000')
+            update.update(cpu_quota=quota or -1, cpu_period=period)
+        
+        if cpuset_cpus is not None:
+            if cpuset_cpus:
+                parse_cpuset(cpuset_cpus)
+            update['cpuset_cpus'] = cpuset_cpus
+        
+        if mem_limit is not None:
+            memory = parse_memory_size(mem_limit)
+            update['mem_limit'] = memory
+            current_memory, current_swap = host_config.get('Memory') or 0, host_config.get('MemorySwap') or 0
+            if memswap_limit is None and current_swap > 0:
+                # Keep the same swap allowance on top of the new limit
+                update['memswap_limit'] = memory + max(0, current_swap - current_memory)
+        if memswap_limit is not None:
+            update['memswap_limit'] = -1 if str(memswap_limit) == '-1' else parse_memory_size(memswap_limit)
+        if update.get('memswap_limit', -1) != -1 and \
+                update['memswap_limit'] < update.get('mem_limit', host_config.get('Memory') or 0):
+            raise ValueError('memswap_limit must be at least mem_limit')
+        return update
+    
+    def update_container_resources(self, container_name: str, host: str = None, dry_run: bool = False,
+                                   **limits) -> Dict[str, Any]:
+        """Apply new CPU and memory limits to a live container through the Docker update API"""
+        try:
+            host, container = self.find_container(container_name, host)
+            update = self._container_resource_update(container, **limits)
+            if not update:
+                return {'success': False, 'error': 'No resource limits given'}
+            if not dry_run:
+                result = container.update(**update)
+                warnings = (result or {}).get('Warnings') or []
+            else:
+                warnings = []
+            return {'success': True, 'container_name': container.name, 'host': host, 'applied': update,
+                    'warnings': warnings, 'dry_run': dry_run}
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
         except Exception as e:
-            app.logger.error(f"Failed to get system metrics: {str(e)}")
-            return {}
+            app.logger.error(f"Resource update failed: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    def set_native_affinity(self, node_id: str, cpuset_cpus: str) -> Dict[str, Any]:
+        """Pin a native instance to a cpuset; CPU and memory limits need a container"""
+        with self.native_process_lock:
+            info = self.native_processes.get(node_id)
+        if not info:
+            return {'success': False, 'error': f'Instance {node_id} not found'}
+        try:
+            cpus = parse_cpuset(cpuset_cpus) if cpuset_cpus else list(range(psutil.cpu_count() or 1))
+            psutil.Process(info['pid']).cpu_affinity(cpus)
+            return {'success': True, 'node_id': node_id, 'cpus': cpus}
+        except (ValueError, AttributeError, psutil.Error) as e:
+            return {'success': False, 'error': str(e) or 'CPU affinity not supported on this platform'}
+    
+    def rebalance_cpu(self, hosts: List[str] = None, reserve_cpus: float = 0.5, weight: str = 'threads',
+                      pin: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+        """Split each host's CPU budget across its running node containers and apply it in one pass.
+
+        Shares follow weight: 'threads' (MAX_THREADS), 'throughput' (proofs per minute over 5m,
+        idle nodes count as the average) or 'equal'. With pin, nodes also get contiguous,
+        non-overlapping cpusets sized to their share when the host has enough cores.
+        """
+        if weight not in ('threads', 'throughput', 'equal'):
+            return {'success': False, 'error': 'weight must be threads, throughput or equal'}
+        
+        def plan_host(host, client):
+            ncpu = client.info().get('NCPU') or 1
+            containers = [c for c in client.containers.list(filters={'label': 'nexus.type', 'status': 'running'})
+                          if not is_warm_spare(c.labels, c.name)]
+            if not containers:
+                return []
+            
+            weights = []
+            for container in containers:
+                env = dict(e.split('=', 1) for e in container.attrs['Config'].get('Env') or [] if '=' in e)
+                if weight == 'threads':
+                    weights.append(max(1, int(env.get('MAX_THREADS') or 1)))
+                elif weight == 'throughput':
+                    node = container_node_id(container.labels, container.name) or container.labels.get('nexus.node-ids') or container.name
+                    weights.append(record_throughput({'throughput': self.throughput.snapshot(node)}))
+                else:
+                    weights.append(1)
+            if weight == 'throughput':
+                active = [w for w in weights if w > 0]
+                fallback = sum(active) / len(active) if active else 1
+                weights = [w or fallback for w in weights]
+            
+            budget = max(0.1 * len(containers), ncpu - reserve_cpus)
+            total = sum(weights)
+            plan, next_cpu = [], 0
+            for container, w in zip(containers, weights):
+                cpus = round(max(0.1, budget * w / total), 2)
+                entry = {'container': container, 'name': container.name, 'host': host, 'cpus': cpus, 'weight': w}
+                if pin:
+                    cores = max(1, math.ceil(cpus))
+                    if next_cpu + cores <= ncpu:
+                        entry['cpuset_cpus'] = f'{next_cpu}-{next_cpu + cores - 1}' if cores > 1 else str(next_cpu)
+                        next_cpu += cores
+                plan.append(entry)
+            return plan
+        
+        plans = self.map_docker_hosts(plan_host, hosts)
+        entries = [entry for plan in plans.values() for entry in plan]
+        
+        def apply(entry):
+            return self.update_container_resources(entry['name'], entry['host'], dry_run=dry_run, cpus=entry['cpus'],
+                                                   cpuset_cpus=entry.get('cpuset_cpus'))
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(BULK_ACTION_PARALLELISM, len(entries) or 1)),
+                                thread_name_prefix='rebalance') as executor:
+            results = list(executor.map(apply, entries))
+        
+        nodes = [{'name': e['name'], 'host': e['host'], 'cpus': e['cpus'], 'weight': e['weight'],
+                  'cpuset_cpus': e.get('cpuset_cpus'), 'success': r['success'],
+                  **({'error': r['error']} if not r['success'] else {})} for e, r in zip(entries, results)]
+        return {
+            'success': all(r['success'] for r in results),
+            'dry_run': dry_run,
+            'weight': weight,
+            'hosts': {host: len(plan) for host, plan in plans.items()},
+            'nodes': nodes
+        }
     
-    def container_action(self, container_name: str, action: str) -> Dict[str, Any]:
+    def container_action(self, container_name: str, action: str, host: str = None) -> Dict[str, Any]:
         """Perform action on container"""
         try:
-            container = docker_client.containers.get(container_name)
+            _, container = self.find_container(container_name, host)
             
             if action == 'start':
                 container.start()
@@ -473,10 +4269,105 @@ class NexusManager:
             app.logger.error(f"Container action failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def get_logs(self, container_name: str, tail: int = 100) -> str:
+    def select_containers(self, names: List[str] = None, node_ids: List[str] = None, types: List[str] = None,
+                          statuses: List[str] = None, hosts: List[str] = None) -> List[tuple]:
+        """(host, container) pairs matching every given selector; type and status filter on the daemon"""
+        filters = {}
+        if statuses:
+            filters['status'] = list(statuses)
+        if types:
+            filters['label'] = [f'nexus.type={t}' for t in types]
+        names = set(names or [])
+        node_ids = {str(n) for n in node_ids or []}
+        
+        def list_host(host, client):
+            # Several label filters are ANDed by Docker, so query once per type
+            label_filters = filters.get('label')
+            queries = [{**filters, 'label': label} for label in label_filters] if label_filters else [filters]
+            found = {}
+            for query in queries:
+                for container in client.containers.list(all=True, filters=query):
+                    found[container.id] = container
+            return list(found.values())
+        
+        selected = []
+        for host, containers in self.map_docker_hosts(list_host, hosts).items():
+            for container in containers:
+                if 'nexus' not in container.name.lower() or is_warm_spare(container.labels, container.name):
+                    continue
+                if names and container.name not in names:
+                    continue
+                if node_ids:
+                    labels = container.labels
+                    container_nodes = {container_node_id(labels, container.name)} | set(labels.get('nexus.node-ids', '').split(','))
+                    if not node_ids & container_nodes:
+                        continue
+                selected.append((host, container))
+        return selected
+    
+    def _apply_container_action(self, container, action: str, grace: int):
+        if action == 'stop':
+            container.stop(timeout=grace)
+        elif action == 'restart':
+            container.restart(timeout=grace)
+        elif action == 'remove':
+            container.remove(force=True)
+        else:
+            getattr(container, action)()
+    
+    def bulk_container_action(self, action: str, targets: List[tuple], parallelism: int = BULK_ACTION_PARALLELISM,
+                              deadline: float = BULK_ACTION_DEADLINE):
+        """Run an action on many containers concurrently, yielding each result as it finishes.
+
+        An item still running past its deadline is reported as timed out. Its worker is left
+        to finish on its own, and stop/restart get a grace period that fits inside the deadline.
+        """
+        grace = max(1, min(10, int(deadline / 2)))
+        executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='bulk-action')
+        started_at = {}
+        
+        def run(host, container):
+            key = (host, container.id)
+            started_at[key] = time.time()
+            self._apply_container_action(container, action, grace)
+            return time.time() - started_at[key]
+        
+        started = time.time()
+        pending = {executor.submit(run, host, container): (host, container.id, container.name)
+                   for host, container in targets}
+        succeeded = failed = timed_out = 0
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, container_id, name = pending.pop(future)
+                    try:
+                        result = {'name': name, 'host': host, 'success': True, 'duration': round(future.result(), 3)}
+                        succeeded += 1
+                    except Exception as e:
+                        result = {'name': name, 'host': host, 'success': False, 'error': str(e),
+                                  'duration': round(time.time() - started_at.get((host, container_id), started), 3)}
+                        failed += 1
+                    yield result
+                
+                now = time.time()
+                for future, (host, container_id, name) in list(pending.items()):
+                    begun = started_at.get((host, container_id))
+                    if begun is not None and now - begun > deadline:
+                        del pending[future]
+                        timed_out += 1
+                        yield {'name': name, 'host': host, 'success': False,
+                               'error': f'Deadline of {deadline}s exceeded', 'duration': round(now - begun, 3)}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield {'summary': {'action': action, 'total': len(targets), 'succeeded': succeeded, 'failed': failed,
+                           'timed_out': timed_out, 'duration': round(time.time() - started, 3)}}
+    
+    def get_logs(self, container_name: str, tail: int = 100, host: str = None) -> str:
         """Get container logs"""
         try:
-            container = docker_client.containers.get(container_name)
+            _, container = self.find_container(container_name, host)
             logs = container.logs(tail=tail, timestamps=True).decode('utf-8')
             return logs
         except Exception as e:
@@ -484,56 +4375,187 @@ class NexusManager:
             return f"Error getting logs: {str(e)}"
     
     def deploy_service(self, service_type: str, node_ids: str = None) -> Dict[str, Any]:
-        """Deploy Nexus services using docker-compose"""
+        """Deploy Nexus services from compose/docker-compose.yml"""
         try:
             if service_type == 'single':
-                cmd = ['docker-compose', '-f', f'{self.compose_dir}/docker-compose.yml', 'up', '-d', 'node-1']
+                result = self.compose.up(services=['node-1'])
             elif service_type == 'multi':
-                cmd = ['docker-compose', '-f', f'{self.compose_dir}/docker-compose.yml', '--profile', 'multi', 'up', '-d']
+                result = self.compose.up(profiles=['multi'])
             elif service_type == 'all-single':
-                cmd = ['docker-compose', '-f', f'{self.compose_dir}/docker-compose.yml', '--profile', 'multi-single', 'up', '-d']
+                result = self.compose.up(profiles=['multi-single'])
             else:
                 return {'success': False, 'error': 'Invalid service type'}
             
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.compose_dir)
-            
-            if result.returncode == 0:
-                return {'success': True, 'message': f'Successfully deployed {service_type} service', 'output': result.stdout}
+            output = '\n'.join(f"Container {r['container']}  {r['action'].capitalize()}"
+                               for r in result['services'].values())
+            if not result['errors']:
+                return {'success': True, 'message': f'Successfully deployed {service_type} service',
+                        'output': output, 'services': result['services']}
             else:
-                return {'success': False, 'error': result.stderr}
+                errors = '; '.join(f"{name}: {error}" for name, error in result['errors'].items())
+                return {'success': False, 'error': errors, 'output': output, 'services': result['services']}
         except Exception as e:
             app.logger.error(f"Deploy failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def stop_all_services(self) -> Dict[str, Any]:
-        """Stop all services"""
+    def drain_targets(self) -> List[Dict[str, Any]]:
+        """Every running instance in every mode, keyed like the health and log sources"""
+        targets = []
+        with self.native_process_lock:
+            for node_id, info in self.native_processes.items():
+                if info['status'] == 'running':
+                    targets.append({'key': f'native:{node_id}', 'mode': 'native', 'node_id': node_id})
+        
+        if self.docker_clients:
+            for host, container in self.select_containers(statuses=['running', 'restarting', 'paused']):
+                targets.append({'key': f'docker:{host}:{container.name}', 'mode': 'docker', 'host': host,
+                                'container': container})
+        
+        if self.capabilities['k8s']:
+            for workload in self.k8s.list_workloads():
+                if workload['replicas']:
+                    targets.append({'key': f"k8s:{workload['name']}", 'mode': 'k8s', 'workload': workload['name']})
+        return targets
+    
+    def _drain_one(self, target: Dict[str, Any], grace: float) -> Dict[str, Any]:
+        # Each stop escalates to a kill once its grace runs out; grace is 0 past the deadline
+        killed = False
+        if target['mode'] == 'native':
+            result = self.stop_native_instance(target['node_id'], timeout=grace)
+            if not result.get('success'):
+                raise RuntimeError(result.get('error'))
+            killed = result['killed']
+        elif target['mode'] == 'docker':
+            container = target['container']
+            if grace > 0:
+                container.stop(timeout=max(1, int(grace)))
+                container.reload()
+                killed = container.attrs['State'].get('ExitCode') == 137
+            else:
+                container.kill()
+                killed = True
+        else:
+            name = target['workload']
+            self.k8s.scale_workload(name, 0)
+            give_up = time.time() + grace
+            while True:
+                pods = [p['metadata']['name'] for p in self.k8s.get_pods()
+                        if p['metadata'].get('labels', {}).get('nexus.workload') == name]
+                if not pods:
+                    break
+                if time.time() >= give_up:
+                    for pod in pods:
+                        self.k8s.delete_pod(pod, grace_period=0)
+                    killed = True
+                    break
+                time.sleep(1)
+        return {'killed': killed}
+    
+    def drain_fleet(self, deadline: float = DRAIN_DEADLINE, grace: float = DRAIN_GRACE) -> Dict[str, Any]:
+        """Stop every native process, container and Kubernetes workload concurrently.
+
+        Each instance gets `grace` seconds after its stop signal, capped by the time left before
+        the global deadline. Instances reached after the deadline are killed outright, and any
+        stop still in flight a grace period past the deadline is reported as timed out.
+        """
+        started = time.time()
+        end = started + deadline
+        targets = self.drain_targets()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(DRAIN_PARALLELISM, len(targets) or 1)),
+                                      thread_name_prefix='drain')
+        
+        def run(target):
+            signalled = time.time()
+            outcome = self._drain_one(target, max(0.0, min(grace, end - signalled)))
+            return dict(outcome, signalled_after=round(signalled - started, 3), duration=round(time.time() - signalled, 3))
+        
+        def kill(container):
+            try:
+                container.kill()
+            except Exception:
+                # Exited on its own meanwhile
+                pass
+        
+        pending = {executor.submit(run, target): target for target in targets}
+        results = []
+        escalated = False
+        try:
+            while pending:
+                if not escalated and time.time() >= end:
+                    # Containers whose stop is still in flight at the deadline are killed directly
+                    escalated = True
+                    for target in pending.values():
+                        if target['mode'] == 'docker':
+                            target['killed'] = True
+                            threading.Thread(target=kill, args=(target['container'],), daemon=True).start()
+                limit = end if not escalated else end + grace
+                done, _ = wait(pending, timeout=max(0.0, limit - time.time()), return_when=FIRST_COMPLETED)
+                if not done:
+                    if escalated:
+                        break
+                    continue
+                for future in done:
+                    target = pending.pop(future)
+                    result = {'key': target['key'], 'mode': target['mode']}
+                    try:
+                        result.update(future.result(), success=True)
+                        result['killed'] = result['killed'] or target.get('killed', False)
+                    except Exception as e:
+                        result.update(success=False, error=str(e), duration=round(time.time() - started, 3))
+                    results.append(result)
+            for target in pending.values():
+                results.append({'key': target['key'], 'mode': target['mode'], 'success': False,
+                                'killed': target.get('killed', False),
+                                'error': f'Still stopping {grace}s after the {deadline}s deadline',
+                                'duration': round(time.time() - started, 3)})
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return {
+            'instances': sorted(results, key=lambda r: r['key']),
+            'total': len(targets),
+            'stopped': sum(1 for r in results if r['success']),
+            'killed': sum(1 for r in results if r.get('killed')),
+            'failed': sum(1 for r in results if not r['success']),
+            'duration': round(time.time() - started, 3)
+        }
+    
+    def stop_all_services(self, deadline: float = DRAIN_DEADLINE, grace: float = DRAIN_GRACE) -> Dict[str, Any]:
+        """Drain every instance in every mode, then remove the compose project"""
         try:
-            cmd = ['docker-compose', '-f', f'{self.compose_dir}/docker-compose.yml', 'down']
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.compose_dir)
+            drain = self.drain_fleet(deadline, grace)
+            errors = [f"{r['key']}: {r['error']}" for r in drain['instances'] if not r['success']]
+            output = ''
+            if self.docker_clients:
+                result = self.compose.down()
+                output = '\n'.join(f"Container {name}  Removed" for name in result['removed'])
+                errors.extend(f"{name}: {error}" for name, error in result['errors'].items())
             
-            if result.returncode == 0:
-                return {'success': True, 'message': 'All services stopped', 'output': result.stdout}
+            if not errors:
+                return {'success': True, 'message': 'All services stopped', 'output': output, 'drain': drain}
             else:
-                return {'success': False, 'error': result.stderr}
+                return {'success': False, 'error': '; '.join(errors), 'output': output, 'drain': drain}
         except Exception as e:
             app.logger.error(f"Stop all failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def add_new_node(self, node_id: str, node_name: str = None) -> Dict[str, Any]:
-        """Add a new single-instance node dynamically"""
+    def add_new_node(self, node_id: str, node_name: str = None, host: str = None) -> Dict[str, Any]:
+        """Add a new single-instance node dynamically on the given (or least-loaded) host"""
         try:
             if not node_name:
                 node_name = f"nexus-node-{node_id}"
             
-            # Check if container already exists
+            # Check if container already exists on any host
             try:
-                existing = self.docker_client.containers.get(node_name)
+                self.find_container(node_name)
                 return {'success': False, 'error': f'Container {node_name} already exists'}
             except NotFound:
                 pass
             
+            host = host or self.select_docker_host()
+            
             # Create container with nexus image
-            container = self.docker_client.containers.run(
+            container = self.get_docker_client(host).containers.run(
                 image='nexus-cli:latest',
                 name=node_name,
                 environment={
@@ -548,21 +4570,25 @@ class NexusManager:
                 },
                 command=["./scripts/start-single.sh"],
                 restart_policy={"Name": "unless-stopped"},
+                log_config=CONTAINER_LOG_CONFIG,
                 detach=True,
                 labels={'nexus.type': 'single-instance', 'nexus.node-id': node_id}
             )
             
-            app.logger.info(f"Created new node container: {node_name} with ID: {node_id}")
-            return {'success': True, 'message': f'Node {node_name} created successfully', 'container_id': container.id}
+            self.container_hosts[node_name] = host
+            app.logger.info(f"Created new node container: {node_name} with ID: {node_id} on {host}")
+            return {'success': True, 'message': f'Node {node_name} created successfully', 'container_id': container.id, 'host': host}
             
         except Exception as e:
             app.logger.error(f"Failed to add new node: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def remove_node(self, container_name: str, remove_volumes: bool = False) -> Dict[str, Any]:
+    def remove_node(self, container_name: str, remove_volumes: bool = False, host: str = None) -> Dict[str, Any]:
         """Remove a node and optionally its volumes"""
         try:
-            container = self.docker_client.containers.get(container_name)
+            host, container = self.find_container(container_name, host)
+            client = self.get_docker_client(host)
+            volumes = [mount['Name'] for mount in container.attrs.get('Mounts', []) if mount.get('Type') == 'volume']
             
             # Stop container if running
             if container.status == 'running':
@@ -573,14 +4599,19 @@ class NexusManager:
             
             # Remove volumes if requested
             if remove_volumes:
-                try:
-                    data_volume = self.docker_client.volumes.get(f'nexus_{container_name}_data')
-                    data_volume.remove()
-                    logs_volume = self.docker_client.volumes.get(f'nexus_{container_name}_logs')
-                    logs_volume.remove()
-                except Exception as e:
-                    app.logger.warning(f"Failed to remove volumes for {container_name}: {str(e)}")
+                # A node bound from a warm spare mounts the spare's volumes, and its nexus_node_*
+                # volumes are binds to them labelled with the spare volume's name
+                aliases = {volume.name: volume.attrs['Labels'][WARM_POOL_LABEL]
+                           for volume in client.volumes.list(filters={'label': WARM_POOL_LABEL})}
+                linked = {alias for alias, backing in aliases.items() if alias in volumes or backing in volumes}
+                names = linked | set(volumes) | {aliases[alias] for alias in linked}
+                for name in sorted(names, key=lambda name: name not in aliases):
+                    try:
+                        client.volumes.get(name).remove()
+                    except Exception as e:
+                        app.logger.warning(f"Failed to remove volume {name} of {container_name}: {str(e)}")
             
+            self.container_hosts.pop(container_name, None)
             app.logger.info(f"Removed node container: {container_name}")
             return {'success': True, 'message': f'Node {container_name} removed successfully'}
             
@@ -604,12 +4635,22 @@ class NexusManager:
         
         return available_slots[:5]  # Return first 5 available slots
     
-    def scale_nodes(self, target_count: int, node_ids: List[str]) -> Dict[str, Any]:
-        """Scale the number of single-instance nodes"""
+    def scale_nodes(self, target_count: int, node_ids: List[str], strategy: str = 'single',
+                    **requirements) -> Dict[str, Any]:
+        """Scale the number of single-instance nodes.
+
+        With strategy='packed' new nodes are placed by the bin-packing scheduler
+        instead of one container each.
+        """
         try:
-            current_containers = [c for c in self.get_containers() 
-                                if c['labels'].get('nexus.type') == 'single-instance']
-            current_count = len(current_containers)
+            # Packed multi-instance containers count once per node they run
+            current_containers = []
+            for c in self.get_containers():
+                if c['labels'].get('nexus.type') == 'single-instance':
+                    current_containers.append((c, 1))
+                elif c['labels'].get('nexus.type') == 'multi-instance':
+                    current_containers.append((c, len([n for n in c['labels'].get('nexus.node-ids', '').split(',') if n])))
+            current_count = sum(count for _, count in current_containers)
             
             if target_count == current_count:
                 return {'success': True, 'message': f'Already at target count of {target_count} nodes'}
@@ -622,6 +4663,9 @@ class NexusManager:
                 if len(node_ids) < nodes_to_add:
                     return {'success': False, 'error': f'Need {nodes_to_add} node IDs but only {len(node_ids)} provided'}
                 
+                if strategy == 'packed':
+                    return self.schedule_nodes(node_ids[:nodes_to_add], **requirements)
+                
                 available_slots = self.get_available_node_slots()
                 for i in range(nodes_to_add):
                     if i < len(available_slots) and i < len(node_ids):
@@ -629,13 +4673,16 @@ class NexusManager:
                         results.append(result)
             
             elif target_count < current_count:
-                # Scale down - remove nodes
+                # Scale down - remove single nodes first, then whole multi containers that don't overshoot
                 nodes_to_remove = current_count - target_count
-                containers_to_remove = current_containers[:nodes_to_remove]
-                
-                for container in containers_to_remove:
-                    result = self.remove_node(container['name'])
+                for container, count in sorted(current_containers, key=lambda item: item[1]):
+                    if count > nodes_to_remove:
+                        continue
+                    result = self.remove_node(container['name'], host=container.get('host'))
                     results.append(result)
+                    nodes_to_remove -= count
+                    if not nodes_to_remove:
+                        break
             
             success_count = sum(1 for r in results if r['success'])
             return {
@@ -648,6 +4695,191 @@ class NexusManager:
             app.logger.error(f"Scaling failed: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    # Container Scheduling
+    def host_capacity(self, hosts: List[str] = None, host_cpu: float = None, host_memory=None) -> Dict[str, Dict[str, Any]]:
+        """CPU and memory per Docker host, with what its running containers already take.
+
+        Containers count their CPU and memory limits, or their measured usage when unlimited.
+        host_cpu and host_memory override each host's size. Without Docker hosts the local
+        machine is the only (unnamed) host.
+        """
+        if not self.docker_clients:
+            return {None: {
+                'cpu': float(host_cpu) if host_cpu else float(psutil.cpu_count() or 1),
+                'memory': parse_memory_size(host_memory) if host_memory else psutil.virtual_memory().total,
+                'cpu_in_use': 0.0, 'memory_in_use': 0
+            }}
+        loads = self.get_host_loads()
+        capacity = {
+            host: {
+                'cpu': float(host_cpu) if host_cpu else float(load['cpus']),
+                'memory': parse_memory_size(host_memory) if host_memory else load['memory_total'],
+                'cpu_in_use': 0.0, 'memory_in_use': 0
+            }
+            for host, load in loads.items() if not hosts or host in hosts
+        }
+        for instance in self.get_cached_instances(max_age=RESPONSE_CACHE_TTL):
+            entry = capacity.get(instance.get('host'))
+            if instance.get('mode') != 'docker' or instance.get('status') != 'running' or entry is None:
+                continue
+            stats = instance.get('stats') or {}
+            entry['cpu_in_use'] += instance.get('cpu_limit') or (stats.get('cpu_percent') or 0) / 100
+            entry['memory_in_use'] += instance.get('memory_limit') or stats.get('memory_usage') or 0
+        return capacity
+
+    def plan_node_packing(self, node_ids: List[str], host_cpu: float = None, host_memory=None,
+                          node_cpu: float = 1.0, node_memory="1g", node_threads: int = 4,
+                          node_requirements: Dict[str, Dict[str, Any]] = None,
+                          max_nodes_per_container: int = 8,
+                          max_container_cpu: float = None, max_container_memory=None,
+                          container_cpu_overhead: float = 0.25,
+                          container_memory_overhead="256m", hosts: List[str] = None) -> Dict[str, Any]:
+        """Pack nodes into as few containers as the hosts' free capacity and container limits allow.
+
+        Nodes are placed first-fit decreasing, so every extra container (and its
+        overhead) is only opened when no existing one has room. A new container goes
+        to the host with the most free capacity that fits it. Containers that end up
+        with a single node are deployed as docker-single, the rest as docker-multi.
+        """
+        try:
+            capacity = self.host_capacity(hosts, host_cpu, host_memory)
+            if not capacity:
+                return {'success': False, 'error': 'No Docker host reachable'}
+            free = {host: {'cpu': c['cpu'] - c['cpu_in_use'], 'memory': c['memory'] - c['memory_in_use']}
+                    for host, c in capacity.items()}
+            total_cpu = sum(c['cpu'] for c in capacity.values())
+            total_memory = sum(c['memory'] for c in capacity.values())
+            overhead_cpu = float(container_cpu_overhead)
+            overhead_memory = parse_memory_size(container_memory_overhead)
+            cap_cpu = float(max_container_cpu) if max_container_cpu else max(c['cpu'] for c in capacity.values())
+            cap_memory = (parse_memory_size(max_container_memory) if max_container_memory
+                          else max(c['memory'] for c in capacity.values()))
+            node_requirements = node_requirements or {}
+
+            nodes = []
+            for node_id in dict.fromkeys(str(n) for n in node_ids):
+                req = node_requirements.get(node_id, {})
+                nodes.append({
+                    'node_id': node_id,
+                    'cpu': float(req.get('cpu', node_cpu)),
+                    'memory': parse_memory_size(req.get('memory', node_memory)),
+                    'threads': int(req.get('threads', node_threads))
+                })
+
+            # Largest nodes first, sized relative to the fleet
+            nodes.sort(key=lambda n: n['cpu'] / total_cpu + n['memory'] / max(1, total_memory), reverse=True)
+
+            bins = []
+            unscheduled = []
+
+            for node in nodes:
+                placed = False
+                for group in bins:
+                    room = free[group['host']]
+                    if (len(group['nodes']) < max_nodes_per_container
+                            and node['cpu'] <= room['cpu'] and node['memory'] <= room['memory']
+                            and group['cpu'] + node['cpu'] + overhead_cpu <= cap_cpu
+                            and group['memory'] + node['memory'] + overhead_memory <= cap_memory):
+                        group['nodes'].append(node)
+                        group['cpu'] += node['cpu']
+                        group['memory'] += node['memory']
+                        room['cpu'] -= node['cpu']
+                        room['memory'] -= node['memory']
+                        placed = True
+                        break
+
+                if not placed:
+                    need_cpu, need_memory = node['cpu'] + overhead_cpu, node['memory'] + overhead_memory
+                    fitting = [host for host, room in free.items()
+                               if need_cpu <= room['cpu'] and need_memory <= room['memory']]
+                    if not fitting or need_cpu > cap_cpu or need_memory > cap_memory:
+                        unscheduled.append(node['node_id'])
+                        continue
+                    host = max(fitting, key=lambda h: (free[h]['cpu'] / capacity[h]['cpu']
+                                                       + free[h]['memory'] / max(1, capacity[h]['memory'])))
+                    bins.append({'host': host, 'nodes': [node], 'cpu': node['cpu'], 'memory': node['memory']})
+                    free[host]['cpu'] -= need_cpu
+                    free[host]['memory'] -= need_memory
+
+            containers = []
+            for group in bins:
+                ids = [n['node_id'] for n in group['nodes']]
+                threads = sum(n['threads'] for n in group['nodes'])
+                containers.append({
+                    'mode': 'docker-single' if len(ids) == 1 else 'docker-multi',
+                    'host': group['host'],
+                    'node_ids': ids,
+                    'threads': threads,
+                    'cpu_limit': round(group['cpu'] + overhead_cpu, 2),
+                    'memory_limit': format_memory_size(group['memory'] + overhead_memory)
+                })
+
+            used_cpu = sum(c['cpu'] - free[h]['cpu'] for h, c in capacity.items())
+            used_memory = sum(c['memory'] - free[h]['memory'] for h, c in capacity.items())
+            return {
+                'success': not unscheduled,
+                'containers': containers,
+                'unscheduled': unscheduled,
+                'summary': {
+                    'nodes': len(nodes),
+                    'containers': len(containers),
+                    'multi_containers': len([c for c in containers if c['mode'] == 'docker-multi']),
+                    'single_containers': len([c for c in containers if c['mode'] == 'docker-single']),
+                    'cpu_allocated': round(used_cpu, 2),
+                    'cpu_capacity': total_cpu,
+                    'memory_allocated': format_memory_size(max(0, used_memory)),
+                    'memory_capacity': format_memory_size(total_memory),
+                    'hosts': {
+                        host: {
+                            'cpu_capacity': c['cpu'],
+                            'cpu_in_use': round(c['cpu_in_use'], 2),
+                            'cpu_free': round(free[host]['cpu'], 2),
+                            'memory_capacity': format_memory_size(c['memory']),
+                            'memory_in_use': format_memory_size(c['memory_in_use']) if c['memory_in_use'] else '0m',
+                            'memory_free': format_memory_size(max(0, free[host]['memory']))
+                        }
+                        for host, c in capacity.items()
+                    }
+                }
+            }
+
+        except (TypeError, ValueError) as e:
+            return {'success': False, 'error': f'Invalid scheduling parameter: {str(e)}'}
+
+    def schedule_nodes(self, node_ids: List[str], dry_run: bool = False, **requirements) -> Dict[str, Any]:
+        """Compute a packing plan for the nodes and create its containers"""
+        plan = self.plan_node_packing(node_ids, **requirements)
+        if dry_run or 'containers' not in plan:
+            return plan
+
+        results = []
+        for container in plan['containers']:
+            if container['mode'] == 'docker-single':
+                result = self.create_single_node_container(
+                    container['node_ids'][0],
+                    threads=container['threads'],
+                    memory_limit=container['memory_limit'],
+                    cpu_limit=container['cpu_limit'],
+                    host=container['host']
+                )
+            else:
+                result = self.create_multi_node_container(
+                    container['node_ids'],
+                    total_threads=container['threads'],
+                    memory_limit=container['memory_limit'],
+                    cpu_limit=container['cpu_limit'],
+                    host=container['host']
+                )
+            results.append(result)
+
+        success_count = sum(1 for r in results if r['success'])
+        plan['results'] = results
+        plan['success'] = plan['success'] and success_count == len(results)
+        plan['message'] = f'Scheduling completed: {success_count}/{len(results)} containers created'
+        if plan['unscheduled']:
+            plan['message'] += f", {len(plan['unscheduled'])} nodes did not fit on any host"
+        return plan
+
     # Unified Instance Management
     def get_all_instances(self) -> List[Dict[str, Any]]:
         """Get all instances across all deployment modes"""
@@ -657,26 +4889,55 @@ class NexusManager:
         instances.extend(self.get_native_instances())
         
         # Add Docker container instances
-        if DOCKER_AVAILABLE and docker_client:
+        if DOCKER_AVAILABLE and self.docker_clients:
             try:
                 containers = self.get_containers()
                 for container in containers:
+                    labels = container.get('labels', {})
+                    node_id = container_node_id(labels, container['name'])
                     instances.append({
-                        'node_id': container.get('labels', {}).get('nexus.node-id', container['name']),
+                        'node_id': node_id or container['name'],
                         'mode': 'docker',
                         'container_id': container['id'],
                         'container_name': container['name'],
+                        'host': container.get('host'),
                         'status': container['status'],
                         'created': container['created'],
+                        'started_at': container['state'].get('StartedAt'),
                         'image': container['image'],
+                        'labels': labels,
+                        'cpu_limit': container.get('cpu_limit'),
+                        'memory_limit': container.get('memory_limit'),
                         'stats': container.get('stats'),
-                        'ports': container['ports']
+                        'ports': container['ports'],
+                        'throughput': self.throughput.snapshot(
+                            node_id or labels.get('nexus.node-ids') or container['name'])
                     })
             except Exception as e:
                 app.logger.error(f"Failed to get Docker instances: {str(e)}")
         
+        # Add Kubernetes pods (served from the watch cache)
+        if self.capabilities['k8s']:
+            try:
+                instances.extend(self.k8s.get_instances())
+            except Exception as e:
+                app.logger.error(f"Failed to get Kubernetes instances: {str(e)}")
+        
+        for instance in instances:
+            if 'throughput' not in instance:
+                instance['throughput'] = self.throughput.snapshot(instance['node_id'])
+            instance['health'] = self.health.state_of(instance)
+        
+        self.instances_snapshot = (time.time(), instances)
         return instances
     
+    def get_cached_instances(self, max_age: float) -> List[Dict[str, Any]]:
+        """Instances from the last fleet-wide refresh if recent enough, otherwise refresh now"""
+        snapshot = self.instances_snapshot
+        if snapshot and time.time() - snapshot[0] <= max_age:
+            return snapshot[1]
+        return self.get_all_instances()
+    
     def start_instance(self, mode: str, node_id: str, **kwargs) -> Dict[str, Any]:
         """Start an instance using the specified mode"""
         if mode == 'native':
@@ -693,7 +4954,12 @@ class NexusManager:
                 multi_kwargs['memory_limit'] = kwargs['memory_limit']
             if 'cpu_limit' in kwargs:
                 multi_kwargs['cpu_limit'] = kwargs['cpu_limit']
+            if 'host' in kwargs:
+                multi_kwargs['host'] = kwargs['host']
             return self.create_multi_node_container(node_ids, **multi_kwargs)
+        elif mode == 'k8s':
+            node_ids = kwargs.pop('node_ids', [node_id])
+            return self.create_k8s_workload(node_ids, **kwargs)
         else:
             return {"success": False, "error": f"Unsupported mode: {mode}"}
     
@@ -703,31 +4969,142 @@ class NexusManager:
             return self.stop_native_instance(instance_id)
         elif mode.startswith('docker'):
             return self.container_action(instance_id, 'stop')
+        elif mode == 'k8s':
+            return self.scale_k8s_workload(instance_id, 0)
         else:
             return {"success": False, "error": f"Unsupported mode: {mode}"}
     
     def get_instance_logs(self, mode: str, instance_id: str, tail: int = 100) -> str:
         """Get logs for an instance"""
         if mode == 'native':
-            # For native instances, try to read from log files
-            return f"Native instance {instance_id} logs (file-based logging not implemented yet)"
+            log_path = os.path.join(NATIVE_LOG_DIR, f'{instance_id}.log')
+            if not os.path.exists(log_path):
+                return f"No logs for native instance {instance_id}"
+            lines, _ = offload.run(LogTail(log_path).tail, tail)
+            return '\n'.join(lines)
         elif mode.startswith('docker'):
             return self.get_logs(instance_id, tail)
+        elif mode == 'k8s':
+            try:
+                return '\n'.join(self.k8s.stream_logs(instance_id, tail))
+            except Exception as e:
+                app.logger.error(f"Failed to get pod logs: {str(e)}")
+                return f"Error getting logs: {str(e)}"
         else:
             return f"Unsupported mode: {mode}"
     
+    def get_log_file(self, mode: str, instance_id: str, host: str = None, node_id: str = None) -> str:
+        """Path of an instance's log file: native output, or the /app/logs volume of a container"""
+        if mode == 'native':
+            path = os.path.join(NATIVE_LOG_DIR, f'{instance_id}.log')
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No log file for native instance {instance_id}")
+            return path
+        if not mode.startswith('docker'):
+            raise ValueError(f"File logs not supported for mode: {mode}")
+        
+        _, container = self.find_container(instance_id, host)
+        mount = next((m for m in container.attrs.get('Mounts', []) if m.get('Destination') == '/app/logs'), None)
+        if not mount:
+            raise FileNotFoundError(f"Container {instance_id} has no /app/logs volume")
+        directory = mount['Source']
+        if DOCKER_VOLUME_ROOT and directory.startswith('/var/lib/docker/volumes/'):
+            directory = os.path.join(DOCKER_VOLUME_ROOT, directory[len('/var/lib/docker/volumes/'):])
+        if not os.access(directory, os.R_OK):
+            raise FileNotFoundError(f"Log volume {directory} is not readable from the manager")
+        
+        # Multi-instance containers write one nexus-instance-<n>-<node>.log per node
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.log')]
+        if node_id:
+            files = [path for path in files if os.path.basename(path).endswith(f'-{node_id}.log')]
+        if not files:
+            raise FileNotFoundError(f"No log files in {directory}")
+        return max(files, key=os.path.getmtime)
+    
+    def tail_instance_log(self, mode: str, instance_id: str, lines: int = 100, cursor: str = None,
+                          since: float = None, host: str = None, node_id: str = None) -> Dict[str, Any]:
+        """Last lines of an instance's log file, or the lines after a byte or time cursor"""
+        def read(path, cursor):
+            tail = LogTail(path)
+            if since is not None:
+                cursor = tail.seek_time(since)
+            if cursor:
+                return tail.read_after(cursor, lines)
+            return tail.tail(lines)
+        
+        try:
+            path = self.get_log_file(mode, instance_id, host, node_id)
+            result, cursor = offload.run(read, path, cursor)
+            return {'success': True, 'path': path, 'lines': result, 'cursor': cursor}
+        except (FileNotFoundError, ValueError) as e:
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            app.logger.error(f"Failed to tail log file: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    def stream_instance_logs(self, mode: str, instance_id: str, tail: int = 100):
+        """Open a follow-mode log stream for an instance, returning an iterator of lines"""
+        if mode == 'k8s':
+            return self.k8s.stream_logs(instance_id, tail, follow=True)
+        elif mode.startswith('docker'):
+            _, container = self.find_container(instance_id)
+            chunks = container.logs(stream=True, follow=True, tail=tail, timestamps=True)
+            return (chunk.decode('utf-8', errors='replace').rstrip('\n') for chunk in chunks)
+        else:
+            raise ValueError(f"Log streaming not supported for mode: {mode}")
+    
+    # Kubernetes Methods
+    def create_k8s_workload(self, node_ids: List[str], threads: int = 4, memory_limit: str = "2g",
+                            cpu_limit: float = 2.0, replicas: int = 1, labels: Dict[str, str] = None,
+                            **kwargs) -> Dict[str, Any]:
+        """Create (or update) the Deployment for one node, or several sharing a pod"""
+        if not self.capabilities['k8s']:
+            return {"success": False, "error": "Kubernetes not available"}
+        try:
+            result = self.k8s.apply_workload([str(n) for n in node_ids], int(threads), memory_limit,
+                                             float(cpu_limit), int(replicas), labels)
+            return {"success": True, "mode": "k8s", "node_ids": node_ids, "workload": result['name'],
+                    "created": result['created'], "replicas": result['replicas']}
+        except Exception as e:
+            app.logger.error(f"Failed to create Kubernetes workload: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def scale_k8s_workload(self, instance_id: str, replicas: int) -> Dict[str, Any]:
+        """Scale a node's Deployment; zero replicas stops it without deleting it"""
+        if not self.capabilities['k8s']:
+            return {"success": False, "error": "Kubernetes not available"}
+        try:
+            name = self.k8s.workload_name(instance_id)
+            self.k8s.scale_workload(name, int(replicas))
+            return {"success": True, "workload": name, "replicas": int(replicas)}
+        except Exception as e:
+            app.logger.error(f"Failed to scale Kubernetes workload: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def delete_k8s_workload(self, instance_id: str) -> Dict[str, Any]:
+        """Delete a node's Deployment and its pods"""
+        if not self.capabilities['k8s']:
+            return {"success": False, "error": "Kubernetes not available"}
+        try:
+            name = self.k8s.workload_name(instance_id)
+            self.k8s.delete_workload(name)
+            return {"success": True, "workload": name}
+        except Exception as e:
+            app.logger.error(f"Failed to delete Kubernetes workload: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
     def build_nexus_image(self) -> Dict[str, Any]:
-        """Build the Nexus CLI Docker image"""
-        if not DOCKER_AVAILABLE:
+        """Build the Nexus CLI Docker image on every Docker host"""
+        if not DOCKER_AVAILABLE or not self.docker_clients:
             return {"success": False, "error": "Docker not available"}
         
-        try:
-            # Build the image
-            image, logs = docker_client.images.build(
+        def build(host, client):
+            image, logs = client.images.build(
                 path=self.docker_dir,
                 tag=self.nexus_image,
                 rm=True,
-                pull=True
+                pull=True,
+                timeout=IMAGE_BUILD_TIMEOUT
             )
             
             # Collect build logs
@@ -735,20 +5112,58 @@ class NexusManager:
             for log in logs:
                 if 'stream' in log:
                     build_log += log['stream']
+            return image, build_log
+        
+        try:
+            builds = self.map_docker_hosts(build, timeout=IMAGE_BUILD_TIMEOUT)
+            if not builds:
+                return {"success": False, "error": "Image build failed on all Docker hosts"}
             
+            image, build_log = next(iter(builds.values()))
             return {
-                "success": True,
+                "success": len(builds) == len(self.docker_clients),
                 "image_id": image.short_id,
                 "image_tags": image.tags,
-                "build_log": build_log
+                "build_log": build_log,
+                "hosts": {host: built[0].short_id for host, built in builds.items()},
+                "failed_hosts": [h for h in self.docker_clients if h not in builds]
             }
             
         except Exception as e:
             app.logger.error(f"Failed to build image: {str(e)}")
             return {"success": False, "error": str(e)}
 
+def acquire_manager_lock(path: str):
+    """Open lock file held for the life of the process; exits when another manager holds it"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle = open(path, 'a+')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.seek(0)
+        owner = handle.read().strip() or 'unknown'
+        handle.close()
+        raise SystemExit(f"Another Nexus manager (pid {owner}) owns {os.path.abspath(DATA_DIR)}; "
+                         "stop it, or drive it with nexusctl.py if it is nexusd")
+    handle.seek(0)
+    handle.truncate()
+    handle.write(f'{os.getpid()}\n')
+    handle.flush()
+    return handle
+
+# The web UI and nexusd each host a full manager (native registry, health states, throughput,
+# log cursors), so exactly one of them may run against a data directory
+manager_lock = acquire_manager_lock(MANAGER_LOCK_PATH) if FCNTL_AVAILABLE else None
+
 # Initialize manager
 nexus_manager = NexusManager()
+response_cache = ResponseCache(RESPONSE_CACHE_TTL)
+
+@app.before_request
+def invalidate_response_cache():
+    """Any API write may change what the polling endpoints return"""
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and request.path.startswith('/api/'):
+        response_cache.invalidate()
 
 @app.route('/')
 def index():
@@ -758,8 +5173,8 @@ def index():
 @app.route('/api/containers')
 def api_containers():
     """API endpoint for containers"""
-    containers = nexus_manager.get_containers()
-    return jsonify(containers)
+    fields = parse_fields(request.args.get('fields'), SLIM_CONTAINER_FIELDS)
+    return response_cache.respond(lambda: [project_fields(c, fields) for c in nexus_manager.get_containers()])
 
 @app.route('/api/metrics')
 def api_metrics():
@@ -770,14 +5185,159 @@ def api_metrics():
 @app.route('/api/container/<container_name>/<action>', methods=['POST'])
 def api_container_action(container_name, action):
     """API endpoint for container actions"""
-    result = nexus_manager.container_action(container_name, action)
+    host = request.args.get('host')
+    result = nexus_manager.container_action(container_name, action, host)
     return jsonify(result)
 
+@app.route('/api/containers/bulk', methods=['POST'])
+def api_containers_bulk():
+    """Run one action on every container matching a selector, streaming results as NDJSON"""
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action not in BULK_ACTIONS:
+        return jsonify({'success': False, 'error': f"action must be one of {', '.join(BULK_ACTIONS)}"}), 400
+    
+    selector = data.get('selector') or {}
+    if not any(selector.get(key) for key in ('names', 'node_ids', 'types', 'statuses')) and not data.get('all'):
+        return jsonify({'success': False, 'error': 'Empty selector; pass "all": true to target every container'}), 400
+    
+    try:
+        targets = nexus_manager.select_containers(selector.get('names'), selector.get('node_ids'),
+                                                  selector.get('types'), selector.get('statuses'),
+                                                  selector.get('hosts'))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        parallelism = min(parse_number(data, 'parallelism', BULK_ACTION_PARALLELISM, int, 1), 64)
+        deadline = parse_number(data, 'deadline', BULK_ACTION_DEADLINE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if data.get('dry_run'):
+        return jsonify({'success': True, 'action': action,
+                        'targets': [{'name': c.name, 'host': host, 'status': c.status} for host, c in targets]})
+    
+    results = nexus_manager.bulk_container_action(action, targets, parallelism=parallelism, deadline=deadline)
+    
+    def generate():
+        for result in results:
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/native/bulk', methods=['POST'])
+def api_native_bulk():
+    """Start, stop or restart many native instances in parallel, streaming results as NDJSON"""
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action not in NATIVE_BULK_ACTIONS:
+        return jsonify({'success': False, 'error': f"action must be one of {', '.join(NATIVE_BULK_ACTIONS)}"}), 400
+    
+    node_ids = data.get('node_ids') or []
+    if data.get('all') and action == 'stop':
+        with nexus_manager.native_process_lock:
+            node_ids = list(nexus_manager.native_processes)
+    if not node_ids:
+        return jsonify({'success': False, 'error': 'node_ids is required; pass "all": true to stop every native instance'}), 400
+    
+    try:
+        threads = parse_number(data, 'threads', 4, int, 1)
+        parallelism = min(parse_number(data, 'parallelism', BULK_ACTION_PARALLELISM, int, 1), 64)
+        timeout = parse_number(data, 'timeout', NATIVE_STOP_TIMEOUT)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if not data.get('wait', True) and action == 'stop':
+        return jsonify({'success': True, 'results': [
+            dict(nexus_manager.stop_native_instance(node_id, timeout=timeout, wait=False), node_id=node_id)
+            for node_id in node_ids]})
+    
+    results = nexus_manager.bulk_native_action(action, node_ids, threads=threads, parallelism=parallelism,
+                                               timeout=timeout)
+    
+    def generate():
+        for result in results:
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/warm-pool')
+def api_warm_pool():
+    """Warm spares per host and warm vs cold start latency"""
+    return jsonify(nexus_manager.warm_pool.stats())
+
+@app.route('/api/warm-pool/refill', methods=['POST'])
+def api_warm_pool_refill():
+    """Refill the warm pool now, replacing spares from an outdated image"""
+    if not nexus_manager.warm_pool.size:
+        return jsonify({'success': False, 'error': 'Warm pool disabled; set WARM_POOL_SIZE'}), 400
+    return jsonify(dict(nexus_manager.warm_pool.refill(), success=True))
+
+@app.route('/api/logs/search')
+def api_logs_search():
+    """Full-text search across every instance's indexed logs"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'q is required'}), 400
+    try:
+        since = parse_time_bound(request.args.get('since'))
+        until = parse_time_bound(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid time bound: {str(e)}'}), 400
+    
+    started = time.time()
+    matches = nexus_manager.log_index.search(query, request.args.get('node'), since, until,
+                                             min(request.args.get('limit', 100, type=int), 1000))
+    return jsonify({'success': True, 'matches': matches, 'count': len(matches),
+                    'took_ms': round((time.time() - started) * 1000, 2)})
+
+@app.route('/api/logs/index')
+def api_logs_index():
+    """Log index size and last ingest"""
+    return jsonify(nexus_manager.log_index.stats())
+
+@app.route('/api/logs/index', methods=['POST'])
+def api_logs_index_ingest():
+    """Ingest new log lines now instead of waiting for the next pass"""
+    return jsonify(nexus_manager.log_index.ingest())
+
+@app.route('/api/throughput')
+def api_throughput():
+    """Per-node proofs, failures and latency with fleet totals"""
+    return jsonify({'success': True, **nexus_manager.throughput.get_all()})
+
+@app.route('/api/throughput/<node_id>')
+def api_node_throughput(node_id):
+    """Throughput for one node"""
+    snapshot = nexus_manager.throughput.snapshot(node_id)
+    if snapshot is None:
+        return jsonify({'success': False, 'error': f'No throughput recorded for {node_id}'}), 404
+    return jsonify({'success': True, 'node_id': node_id, **snapshot})
+
+@app.route('/api/logs/archive')
+def api_logs_archive():
+    """Archive size and time span per node"""
+    return jsonify(nexus_manager.log_archive.stats())
+
+@app.route('/api/logs/archive/<node_id>')
+def api_logs_archive_read(node_id):
+    """Archived log lines for a node between since and until"""
+    try:
+        since = parse_time_bound(request.args.get('since'))
+        until = parse_time_bound(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid time bound: {str(e)}'}), 400
+    lines = nexus_manager.log_archive.read(node_id, since, until,
+                                           min(request.args.get('limit', 1000, type=int), 10000))
+    return jsonify({'success': True, 'node_id': node_id, 'lines': lines, 'count': len(lines)})
+
 @app.route('/api/logs/<container_name>')
 def api_logs(container_name):
     """API endpoint for container logs"""
     tail = request.args.get('tail', 100, type=int)
-    logs = nexus_manager.get_logs(container_name, tail)
+    host = request.args.get('host')
+    logs = nexus_manager.get_logs(container_name, tail, host)
     return jsonify({'logs': logs})
 
 @app.route('/api/deploy', methods=['POST'])
@@ -793,27 +5353,47 @@ def api_deploy():
 @app.route('/api/stop-all', methods=['POST'])
 def api_stop_all():
     """API endpoint for stopping all services"""
-    result = nexus_manager.stop_all_services()
+    data = request.get_json(silent=True) or {}
+    try:
+        deadline, grace = parse_number(data, 'deadline', DRAIN_DEADLINE), parse_number(data, 'grace', DRAIN_GRACE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    result = nexus_manager.stop_all_services(deadline, grace)
     return jsonify(result)
 
+@app.route('/api/fleet/drain', methods=['POST'])
+def api_fleet_drain():
+    """Stop every instance in every mode at once without removing anything"""
+    data = request.get_json(silent=True) or {}
+    try:
+        deadline, grace = parse_number(data, 'deadline', DRAIN_DEADLINE), parse_number(data, 'grace', DRAIN_GRACE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if data.get('dry_run'):
+        return jsonify({'success': True, 'targets': [t['key'] for t in nexus_manager.drain_targets()]})
+    result = nexus_manager.drain_fleet(deadline, grace)
+    return jsonify(dict(result, success=not result['failed']))
+
 @app.route('/api/nodes/add', methods=['POST'])
 def api_add_node():
     """Add a new node"""
     data = request.get_json()
     node_id = data.get('node_id')
     node_name = data.get('node_name')
+    host = data.get('host')
     
     if not node_id:
         return jsonify({'success': False, 'error': 'Node ID is required'}), 400
     
-    result = nexus_manager.add_new_node(node_id, node_name)
+    result = nexus_manager.add_new_node(node_id, node_name, host)
     return jsonify(result)
 
 @app.route('/api/nodes/<container_name>/remove', methods=['DELETE'])
 def api_remove_node(container_name):
     """Remove a node"""
     remove_volumes = request.args.get('remove_volumes', 'false').lower() == 'true'
-    result = nexus_manager.remove_node(container_name, remove_volumes)
+    host = request.args.get('host')
+    result = nexus_manager.remove_node(container_name, remove_volumes, host)
     return jsonify(result)
 
 @app.route('/api/nodes/scale', methods=['POST'])
@@ -822,13 +5402,32 @@ def api_scale_nodes():
     data = request.get_json()
     target_count = data.get('target_count')
     node_ids = data.get('node_ids', [])
+    strategy = data.get('strategy', 'single')
     
     if target_count is None:
         return jsonify({'success': False, 'error': 'Target count is required'}), 400
     
-    result = nexus_manager.scale_nodes(target_count, node_ids)
+    result = nexus_manager.scale_nodes(target_count, node_ids, strategy=strategy)
     return jsonify(result)
 
+@app.route('/api/nodes/schedule', methods=['POST'])
+def api_schedule_nodes():
+    """Pack nodes into single and multi-instance containers"""
+    data = request.get_json() or {}
+    node_ids = data.pop('node_ids', None)
+    
+    if not node_ids or not isinstance(node_ids, list):
+        return jsonify({'success': False, 'error': 'node_ids list is required'}), 400
+    
+    dry_run = bool(data.pop('dry_run', False))
+    allowed = ('host_cpu', 'host_memory', 'node_cpu', 'node_memory', 'node_threads',
+               'node_requirements', 'max_nodes_per_container', 'max_container_cpu',
+               'max_container_memory', 'container_cpu_overhead', 'container_memory_overhead', 'hosts')
+    requirements = {k: v for k, v in data.items() if k in allowed}
+    
+    result = nexus_manager.schedule_nodes([str(n) for n in node_ids], dry_run=dry_run, **requirements)
+    return jsonify(result), 200 if 'containers' in result else 400
+
 @app.route('/api/nodes/available-slots')
 def api_available_slots():
     """Get available node slots"""
@@ -921,7 +5520,8 @@ def api_create_single_container():
             node_id=str(node_id),
             threads=int(threads),
             memory_limit=memory_limit,
-            cpu_limit=float(cpu_limit)
+            cpu_limit=float(cpu_limit),
+            host=data.get('host')
         )
         return jsonify(result)
     except ValueError as e:
@@ -949,7 +5549,8 @@ def api_create_multi_container():
             node_ids=[str(nid) for nid in node_ids],
             total_threads=int(total_threads),
             memory_limit=memory_limit,
-            cpu_limit=float(cpu_limit)
+            cpu_limit=float(cpu_limit),
+            host=data.get('host')
         )
         return jsonify(result)
     except ValueError as e:
@@ -960,22 +5561,37 @@ def api_create_multi_container():
 @app.route('/api/containers/list')
 def api_list_containers():
     """Get detailed container information"""
-    containers = nexus_manager.get_containers()
-    return jsonify({
-        'success': True,
-        'containers': containers,
-        'total': len(containers),
-        'running': len([c for c in containers if c['status'] == 'running'])
-    })
+    fields = parse_fields(request.args.get('fields'), SLIM_CONTAINER_FIELDS)
+    args = request.args
+    
+    def build():
+        containers = nexus_manager.get_containers()
+        page = query_inventory(containers, args, lambda c: f"{c.get('host')}:{c['name']}")
+        return {
+            'success': True,
+            'containers': [project_fields(c, fields) for c in page['items']],
+            'total': len(containers),
+            'running': len([c for c in containers if c['status'] == 'running']),
+            'matched': page['matched'],
+            'next_cursor': page['next_cursor'],
+            'summary': inventory_summary(containers)
+        }
+    
+    try:
+        return response_cache.respond(build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @app.route('/api/containers/<container_name>/info')
 def api_container_info(container_name):
     """Get detailed information about a specific container"""
+    host = request.args.get('host')
     try:
-        container = docker_client.containers.get(container_name)
+        host, container = nexus_manager.find_container(container_name, host)
         info = {
             'id': container.short_id,
             'name': container.name,
+            'host': host,
             'status': container.status,
             'image': container.image.tags[0] if container.image.tags else 'unknown',
             'created': container.attrs['Created'],
@@ -983,12 +5599,12 @@ def api_container_info(container_name):
             'config': container.attrs['Config'],
             'network_settings': container.attrs['NetworkSettings'],
             'mounts': container.attrs['Mounts'],
-            'logs': nexus_manager.get_logs(container_name, tail=50)
+            'logs': nexus_manager.get_logs(container_name, tail=50, host=host)
         }
         
         # Add stats if container is running
         if container.status == 'running':
-            info['stats'] = nexus_manager.get_container_stats(container.id)
+            info['stats'] = nexus_manager.get_container_stats(container.id, host)
             
         return jsonify({'success': True, 'container': info})
     except NotFound:
@@ -1015,17 +5631,92 @@ def api_deployment_modes():
 
 @app.route('/api/instances')
 def api_instances():
-    """Get all instances"""
-    return jsonify(nexus_manager.get_all_instances())
+    """Get all instances; with limit or cursor, a page plus fleet totals"""
+    fields = parse_fields(request.args.get('fields'), SLIM_INSTANCE_FIELDS)
+    args = request.args
+    
+    def build():
+        instances = nexus_manager.get_cached_instances(max_age=RESPONSE_CACHE_TTL)
+        if not any(key in args for key in INVENTORY_QUERY_PARAMS):
+            return [project_fields(i, fields) for i in instances]
+        page = query_inventory(instances, args, HealthChecker.instance_key)
+        items = [project_fields(i, fields) for i in page['items']]
+        if 'limit' not in args and 'cursor' not in args:
+            return items
+        return {'instances': items, 'matched': page['matched'], 'next_cursor': page['next_cursor'],
+                'summary': inventory_summary(instances)}
+    
+    try:
+        return response_cache.respond(build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @app.route('/api/instances/<instance_id>/logs')
 def api_instance_logs(instance_id):
     """Get logs for a specific instance"""
     mode = request.args.get('mode', 'docker')
-    tail = int(request.args.get('tail', 100))
+    tail = request.args.get('tail', 100, type=int)
     logs = nexus_manager.get_instance_logs(mode, instance_id, tail)
     return logs, 200, {'Content-Type': 'text/plain'}
 
+@app.route('/api/instances/<instance_id>/logs/tail')
+def api_tail_instance_logs(instance_id):
+    """Tail a native or container log file, or read on from a cursor"""
+    mode = request.args.get('mode', 'docker')
+    try:
+        since = parse_time_bound(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid time bound: {str(e)}'}), 400
+    result = nexus_manager.tail_instance_log(mode, instance_id, request.args.get('lines', 100, type=int),
+                                             request.args.get('cursor'), since, request.args.get('host'),
+                                             request.args.get('node'))
+    return jsonify(result), (200 if result['success'] else 404)
+
+@app.route('/api/instances/<instance_id>/logs/stream')
+def api_instance_logs_stream(instance_id):
+    """Stream logs for a Docker or Kubernetes instance as they are written"""
+    mode = request.args.get('mode', 'docker')
+    tail = request.args.get('tail', 100, type=int)
+    
+    try:
+        lines = nexus_manager.stream_instance_logs(mode, instance_id, tail)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    
+    def generate():
+        for line in lines:
+            yield line + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='text/plain')
+
+@app.route('/api/k8s/workloads')
+def api_k8s_workloads():
+    """List nexus Deployments in the Kubernetes namespace"""
+    if not nexus_manager.capabilities['k8s']:
+        return jsonify({'success': False, 'error': 'Kubernetes not available'}), 400
+    try:
+        return jsonify({'success': True, 'workloads': nexus_manager.k8s.list_workloads()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/k8s/workloads/<name>/scale', methods=['POST'])
+def api_k8s_scale_workload(name):
+    """Scale a nexus Deployment"""
+    data = request.get_json() or {}
+    replicas = data.get('replicas')
+    
+    if replicas is None:
+        return jsonify({'success': False, 'error': 'Replicas is required'}), 400
+    
+    return jsonify(nexus_manager.scale_k8s_workload(name, replicas))
+
+@app.route('/api/k8s/workloads/<name>', methods=['DELETE'])
+def api_k8s_delete_workload(name):
+    """Delete a nexus Deployment"""
+    return jsonify(nexus_manager.delete_k8s_workload(name))
+
 @app.route('/api/instances/<instance_id>/start', methods=['POST'])
 def api_start_instance(instance_id):
     """Start an instance"""
@@ -1036,6 +5727,8 @@ def api_start_instance(instance_id):
         result = nexus_manager.start_native_instance(instance_id)
     elif mode.startswith('docker'):
         result = nexus_manager.container_action(instance_id, 'start')
+    elif mode == 'k8s':
+        result = nexus_manager.scale_k8s_workload(instance_id, data.get('replicas', 1))
     else:
         result = {"success": False, "error": f"Unsupported mode: {mode}"}
     
@@ -1066,6 +5759,44 @@ def api_restart_instance(instance_id):
     else:
         return jsonify(stop_result)
 
+@app.route('/api/instances/<instance_id>/resources', methods=['POST', 'PUT'])
+def api_instance_resources(instance_id):
+    """Change a running instance's CPU and memory limits in place"""
+    data = request.get_json() or {}
+    mode = data.get('mode', 'docker')
+    
+    if mode == 'native':
+        if 'cpuset_cpus' not in data:
+            return jsonify({'success': False, 'error': 'Native instances only support cpuset_cpus'}), 400
+        return jsonify(nexus_manager.set_native_affinity(instance_id, data['cpuset_cpus']))
+    if not mode.startswith('docker'):
+        return jsonify({'success': False, 'error': f'Unsupported mode: {mode}'}), 400
+    
+    try:
+        limits = {key: data[key] for key in ('cpus', 'cpu_quota', 'cpu_period', 'cpuset_cpus', 'mem_limit', 'memswap_limit')
+                  if data.get(key) is not None}
+        if 'cpus' in limits:
+            limits['cpus'] = float(limits['cpus'])
+        for key in ('cpu_quota', 'cpu_period'):
+            if key in limits:
+                limits[key] = int(limits[key])
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(nexus_manager.update_container_resources(instance_id, data.get('host'),
+                                                            dry_run=bool(data.get('dry_run')), **limits))
+
+@app.route('/api/fleet/rebalance', methods=['POST'])
+def api_fleet_rebalance():
+    """Redistribute each host's CPU budget across its running nodes"""
+    data = request.get_json(silent=True) or {}
+    try:
+        reserve_cpus = parse_number(data, 'reserve_cpus', 0.5)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(nexus_manager.rebalance_cpu(data.get('hosts'), reserve_cpus,
+                                               data.get('weight', 'threads'), bool(data.get('pin')),
+                                               bool(data.get('dry_run'))))
+
 @app.route('/api/instances', methods=['POST'])
 def api_create_instance():
     """Create a new instance"""
@@ -1100,15 +5831,127 @@ def api_create_instance():
 @app.route('/api/system-metrics')
 def api_system_metrics():
     """Get current system metrics"""
-    metrics = nexus_manager.get_system_metrics()
-    
-    # Add calculated fields for frontend
-    if 'memory' in metrics:
-        metrics['memory_percent'] = round((metrics['memory']['used'] / metrics['memory']['total']) * 100, 1)
-        metrics['memory_used'] = metrics['memory']['used']
-        metrics['memory_total'] = metrics['memory']['total']
+    def build():
+        metrics = nexus_manager.get_system_metrics()
+        
+        # Add calculated fields for frontend
+        if 'memory' in metrics:
+            metrics['memory_percent'] = round((metrics['memory']['used'] / metrics['memory']['total']) * 100, 1)
+            metrics['memory_used'] = metrics['memory']['used']
+            metrics['memory_total'] = metrics['memory']['total']
+        return project_fields(metrics, fields)
     
-    return jsonify(metrics)
+    fields = parse_fields(request.args.get('fields'), SLIM_METRICS_FIELDS)
+    return response_cache.respond(build)
+
+@app.route('/api/fleet/manifest')
+def api_fleet_manifest():
+    """Get the desired-state fleet manifest"""
+    if not os.path.exists(nexus_manager.fleet.manifest_path):
+        return jsonify({'success': False, 'error': 'No fleet manifest'}), 404
+    with open(nexus_manager.fleet.manifest_path) as f:
+        return jsonify({'success': True, 'manifest': yaml.safe_load(f) or {}})
+
+@app.route('/api/fleet/manifest', methods=['PUT'])
+def api_update_fleet_manifest():
+    """Replace the fleet manifest (JSON or YAML body)"""
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = yaml.safe_load(request.get_data(as_text=True)) or {}
+        units = nexus_manager.fleet.save_manifest(data)
+        return jsonify({'success': True, 'units': len(units)})
+    except (ValueError, yaml.YAMLError) as e:
+        return jsonify({'success': False, 'error': f'Invalid manifest: {str(e)}'}), 400
+
+@app.route('/api/autoscale')
+def api_autoscale():
+    """Autoscaler policy and control state"""
+    autoscaler = nexus_manager.autoscaler
+    policy = None
+    if os.path.exists(autoscaler.policy_path):
+        with open(autoscaler.policy_path) as f:
+            policy = yaml.safe_load(f) or {}
+    return jsonify({'success': True, 'policy': policy, **autoscaler.status()})
+
+@app.route('/api/autoscale/policy', methods=['PUT'])
+def api_update_autoscale_policy():
+    """Replace the autoscaler policy (JSON or YAML body)"""
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = yaml.safe_load(request.get_data(as_text=True)) or {}
+        policy = nexus_manager.autoscaler.save_policy(data)
+        return jsonify({'success': True, 'policy': policy})
+    except (ValueError, TypeError, yaml.YAMLError) as e:
+        return jsonify({'success': False, 'error': f'Invalid policy: {str(e)}'}), 400
+
+@app.route('/api/autoscale/evaluate', methods=['POST'])
+def api_autoscale_evaluate():
+    """Run one autoscaler pass now (dry_run decides without acting)"""
+    if not os.path.exists(nexus_manager.autoscaler.policy_path):
+        return jsonify({'success': False, 'error': 'No autoscale policy'}), 404
+    data = request.get_json(silent=True) or {}
+    return jsonify({'success': True, 'decision': nexus_manager.autoscaler.evaluate(dry_run=bool(data.get('dry_run')))})
+
+@app.route('/api/autoscale/audit')
+def api_autoscale_audit():
+    """Recent autoscaler decisions"""
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    return jsonify({'success': True, 'decisions': nexus_manager.autoscaler.audit(limit)})
+
+@app.route('/api/fleet/plan')
+def api_fleet_plan():
+    """Show what a reconcile would change"""
+    return jsonify(nexus_manager.fleet.reconcile(dry_run=True))
+
+@app.route('/api/fleet/reconcile', methods=['POST'])
+def api_fleet_reconcile():
+    """Converge the fleet on its manifest"""
+    result = nexus_manager.fleet.reconcile()
+    if result.get('success'):
+        socketio.emit('fleet_reconciled', result)
+    return jsonify(result)
+
+@app.route('/api/fleet/rolling-restart', methods=['POST'])
+def api_rolling_restart():
+    """Restart (or recreate on the current image) matching containers a batch at a time"""
+    data = request.get_json() or {}
+    selector = data.get('selector') or {}
+    if not any(selector.get(key) for key in ('names', 'node_ids', 'types', 'statuses')) and not data.get('all'):
+        return jsonify({'success': False, 'error': 'Empty selector; pass "all": true to roll every container'}), 400
+    try:
+        targets = nexus_manager.select_containers(selector.get('names'), selector.get('node_ids'),
+                                                  selector.get('types'), selector.get('statuses'),
+                                                  selector.get('hosts'))
+        targets.sort(key=lambda target: target[1].name)
+        result = nexus_manager.rolling.start(
+            targets,
+            recreate=bool(data.get('recreate')),
+            max_unavailable=data.get('max_unavailable', 1),
+            readiness_timeout=parse_number(data, 'readiness_timeout', ROLLING_READINESS_TIMEOUT),
+            max_failures=parse_number(data, 'max_failures', ROLLING_MAX_FAILURES, int, 1)
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(result), (202 if result['success'] else 409)
+
+@app.route('/api/fleet/rolling-restart')
+def api_rolling_restart_status():
+    """Progress of the current or last rolling restart"""
+    return jsonify(nexus_manager.rolling.status())
+
+@app.route('/api/fleet/rolling-restart/<action>', methods=['POST'])
+def api_rolling_restart_control(action):
+    """Pause, resume or cancel the rolling restart"""
+    if action not in ('pause', 'resume', 'cancel'):
+        return jsonify({'success': False, 'error': 'Invalid action'}), 400
+    return jsonify(getattr(nexus_manager.rolling, action)())
+
+@app.route('/api/fleet/status')
+def api_fleet_status():
+    """Result of the last reconcile"""
+    return jsonify(nexus_manager.fleet.last_result or {'success': True, 'message': 'No reconcile has run yet'})
 
 @app.route('/api/build-image', methods=['POST'])
 def api_build_image():
@@ -1116,6 +5959,23 @@ def api_build_image():
     result = nexus_manager.build_nexus_image()
     return jsonify(result)
 
+@app.route('/api/health/instances')
+def api_health_instances():
+    """Health state of every instance from the last check"""
+    return jsonify({'success': True, 'instances': nexus_manager.health.get_states(),
+                    **nexus_manager.health.summary()})
+
+@app.route('/api/health/check', methods=['POST'])
+def api_health_check():
+    """Run a health check pass now"""
+    return jsonify(nexus_manager.health.check())
+
+@app.route('/api/health/instances/<node_id>/clear', methods=['POST'])
+def api_health_clear(node_id):
+    """Stop reporting a crashed native instance"""
+    result = nexus_manager.health.clear(node_id)
+    return jsonify(result), (200 if result['success'] else 404)
+
 @app.route('/api/health')
 def api_health():
     """Health check endpoint"""
@@ -1125,29 +5985,63 @@ def api_health():
         "capabilities": nexus_manager.capabilities
     })
 
+@app.route('/api/runtime')
+def api_runtime():
+    """Blocking-call pool queue depth and wait times, and event loop lag"""
+    return jsonify({'success': True, 'offload': offload.stats(), 'loop_lag': loop_lag.stats()})
+
 # WebSocket events for real-time updates
+# Push encoding negotiated by each connected client (sid -> encoding)
+socket_encodings = {}
+
+def build_update_payload() -> Dict[str, Any]:
+    """Slim fleet snapshot pushed to dashboards"""
+    return {
+        'instances': [project_fields(i, SLIM_INSTANCE_FIELDS) for i in nexus_manager.get_all_instances()],
+        'metrics': project_fields(nexus_manager.get_system_metrics(), SLIM_METRICS_FIELDS),
+        'throughput': nexus_manager.throughput.get_all()['fleet'],
+        'timestamp': datetime.now().isoformat()
+    }
+
+def emit_update(payload: Dict[str, Any], encoding: str, to: str):
+    """data_update for JSON clients, data_update_packed with a binary body for the others"""
+    if encoding == 'json':
+        socketio.emit('data_update', payload, to=to)
+    else:
+        socketio.emit('data_update_packed', {'encoding': encoding, 'data': offload.run(encode_payload, payload, encoding)},
+                      to=to)
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    emit('connected', {'message': 'Connected to Nexus Manager'})
+    socket_encodings[request.sid] = 'json'
+    join_room('encoding:json')
+    emit('connected', {'message': 'Connected to Nexus Manager', 'encodings': [
+        e for e in PAYLOAD_ENCODINGS if e != 'msgpack' or MSGPACK_AVAILABLE
+    ]})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    socket_encodings.pop(request.sid, None)
     print('Client disconnected')
 
+@socketio.on('negotiate_encoding')
+def handle_negotiate_encoding(data):
+    """Switch this client's pushes to the first encoding it offers that the server supports"""
+    offered = (data or {}).get('encodings') or []
+    supported = [e for e in PAYLOAD_ENCODINGS if e != 'msgpack' or MSGPACK_AVAILABLE]
+    chosen = next((e for e in offered if e in supported), 'json')
+    leave_room(f"encoding:{socket_encodings.get(request.sid, 'json')}")
+    join_room(f'encoding:{chosen}')
+    socket_encodings[request.sid] = chosen
+    emit('encoding', {'encoding': chosen})
+
 @socketio.on('request_update')
 def handle_request_update():
     """Handle request for data update"""
     try:
-        instances = nexus_manager.get_all_instances()
-        metrics = nexus_manager.get_system_metrics()
-        
-        emit('data_update', {
-            'instances': instances,
-            'metrics': metrics,
-            'timestamp': datetime.now().isoformat()
-        })
+        emit_update(build_update_payload(), socket_encodings.get(request.sid, 'json'), request.sid)
     except Exception as e:
         emit('error', {'message': str(e)})
 
@@ -1155,23 +6049,46 @@ def handle_request_update():
 def background_thread():
     """Send periodic updates to connected clients"""
     while True:
-        socketio.sleep(30)  # Update every 30 seconds
+        socketio.sleep(PUSH_INTERVAL)
         try:
-            instances = nexus_manager.get_all_instances()
-            metrics = nexus_manager.get_system_metrics()
-            
-            socketio.emit('data_update', {
-                'instances': instances,
-                'metrics': metrics,
-                'timestamp': datetime.now().isoformat()
-            })
+            payload = build_update_payload()
+            # Encode once per encoding in use, not once per client
+            for encoding in set(socket_encodings.values()) or {'json'}:
+                emit_update(payload, encoding, f'encoding:{encoding}')
         except Exception as e:
             app.logger.error(f"Background update failed: {str(e)}")
 
 # Start background thread
-background_update_thread = threading.Thread(target=background_thread)
-background_update_thread.daemon = True
-background_update_thread.start()
+if not NEXUS_HEADLESS:
+    background_update_thread = threading.Thread(target=background_thread)
+    background_update_thread.daemon = True
+    background_update_thread.start()
+
+# Warn when something blocks the eventlet hub
+if LOOP_LAG_THRESHOLD > 0 and offload.hub_active():
+    loop_lag.start_loop()
+
+# Index fleet logs for search
+if LOG_INDEX_INTERVAL > 0:
+    nexus_manager.log_index.start_loop(LOG_INDEX_INTERVAL, LOG_INDEX_RETENTION_DAYS * 86400)
+    nexus_manager.log_archive.start_loop(LOG_ARCHIVE_FLUSH_SECONDS)
+
+# Assess instance health every health_check_interval
+if nexus_manager.health.interval > 0:
+    nexus_manager.health.start_loop()
+
+# Keep warm spares ready for fast node starts
+if WARM_POOL_SIZE > 0 and nexus_manager.docker_clients:
+    nexus_manager.warm_pool.start_loop(WARM_POOL_INTERVAL)
+
+# Scale autoscaled nodes to host utilization
+if AUTOSCALE_INTERVAL > 0:
+    nexus_manager.autoscaler.start_loop(AUTOSCALE_INTERVAL)
+
+# Keep the fleet converged on its manifest
+if FLEET_RECONCILE_INTERVAL > 0:
+    nexus_manager.fleet.start_loop(FLEET_RECONCILE_INTERVAL)
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # No reloader: its parent process would import this module and take the manager lock
+    app.run(debug=True, use_reloader=False, host='0.0.0.0', port=5000)
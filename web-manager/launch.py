@@ -84,7 +84,8 @@ def run_server(debug=False, port=5000, host="127.0.0.1"):
     if debug:
         # Use Flask's built-in development server
         from app.main import app, socketio
-        socketio.run(app, debug=True, host=host, port=port, allow_unsafe_werkzeug=True)
+        # No reloader: its parent process would import the app and take the manager lock
+        socketio.run(app, debug=True, use_reloader=False, host=host, port=port, allow_unsafe_werkzeug=True)
     else:
         # Check if we're on Windows or if Gunicorn is not available/compatible
         is_windows = platform.system().lower() == 'windows'
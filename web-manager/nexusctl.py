@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Nexus CLI Manager - Command-line client for the nexusd daemon
+Calls NexusManager methods over the daemon's Unix socket
+
+Wire format: every frame is a 5-byte header (4-byte big-endian body length, 1-byte codec)
+followed by the body. Codec 0 is UTF-8 JSON, 1 is msgpack. Requests are
+{"id", "method", "params"} and replies {"id", "result"} or {"id", "error": {"type", "message"}},
+encoded with the request's codec.
+"""
+
+import os
+import sys
+import json
+import socket
+import struct
+import argparse
+import itertools
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+HEADER = struct.Struct('>IB')
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+DEFAULT_SOCKET = os.environ.get('NEXUS_RPC_SOCKET', os.path.join(
+    os.environ.get('NEXUS_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')), 'nexusd.sock'))
+
+
+class RpcError(Exception):
+    """Error raised by the daemon while running a call"""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+def encode(message, codec):
+    if codec == CODEC_MSGPACK:
+        body = msgpack.packb(message, default=str, use_bin_type=True)
+    else:
+        body = json.dumps(message, default=str, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(len(body), codec) + body
+
+
+def decode(body, codec):
+    if codec == CODEC_MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body.decode('utf-8'))
+
+
+def read_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(sock):
+    """(message, codec) for the next frame, or (None, None) when the peer closed the socket"""
+    header = read_exact(sock, HEADER.size)
+    if header is None:
+        return None, None
+    length, codec = HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    if codec not in (CODEC_JSON, CODEC_MSGPACK) or (codec == CODEC_MSGPACK and not MSGPACK_AVAILABLE):
+        raise ValueError(f"Unsupported codec {codec}")
+    body = read_exact(sock, length)
+    if body is None:
+        return None, None
+    return decode(body, codec), codec
+
+
+class RpcClient:
+    """One persistent connection to nexusd; calls are sequential"""
+
+    def __init__(self, path=DEFAULT_SOCKET, codec=None, timeout=300):
+        self.path = path
+        self.codec = codec if codec is not None else (CODEC_MSGPACK if MSGPACK_AVAILABLE else CODEC_JSON)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.ids = itertools.count(1)
+
+    def call(self, method, **params):
+        request_id = next(self.ids)
+        self.sock.sendall(encode({'id': request_id, 'method': method, 'params': params}, self.codec))
+        reply, _ = read_frame(self.sock)
+        if reply is None:
+            raise ConnectionError('nexusd closed the connection')
+        if reply.get('error'):
+            raise RpcError(reply['error'].get('type'), reply['error'].get('message'))
+        return reply.get('result')
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_param(text):
+    """key=value, where value is parsed as JSON when it can be (numbers, lists, true/false)"""
+    key, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got {text}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Nexus CLI Manager - daemon client",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python nexusctl.py methods
+  python nexusctl.py call get_all_instances
+  python nexusctl.py call create_single_node_container node_id=12345 threads=8
+  python nexusctl.py call fleet.reconcile dry_run=true
+  python nexusctl.py call bulk_native_action action=stop 'node_ids=["1","2"]'
+        """
+    )
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f"Daemon socket (default: {DEFAULT_SOCKET})")
+    parser.add_argument('--json', action='store_true', help='Use JSON on the wire even if msgpack is installed')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('ping', help='Check the daemon is up')
+    commands.add_parser('methods', help='List callable methods')
+    call = commands.add_parser('call', help='Call a method')
+    call.add_argument('method')
+    call.add_argument('params', nargs='*', type=parse_param, help='key=value arguments')
+
+    args = parser.parse_args()
+    try:
+        with RpcClient(args.socket, CODEC_JSON if args.json else None) as client:
+            if args.command == 'ping':
+                result = client.call('rpc.ping')
+            elif args.command == 'methods':
+                result = client.call('rpc.methods')
+            else:
+                result = client.call(args.method, **dict(args.params))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"nexusd is not running on {args.socket}", file=sys.stderr)
+        return 2
+    except RpcError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2, default=str))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Nexus CLI Manager - Headless Daemon
+Hosts NexusManager and its background collectors without the web UI and serves
+its methods over a Unix socket. See nexusctl.py for the wire format and a CLI client.
+"""
+
+import os
+import sys
+import time
+import types
+import signal
+import argparse
+import functools
+import socketserver
+
+# Load the manager without the Socket.IO push thread
+os.environ['NEXUS_HEADLESS'] = 'true'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from nexusctl import DEFAULT_SOCKET, encode, read_frame  # noqa: E402
+import main  # noqa: E402
+
+# Manager methods callable over the socket; everything else (Docker clients and containers,
+# registry internals, endless streams) stays in-process
+MANAGER_METHODS = [
+    'get_host_loads', 'select_docker_host', 'get_deployment_modes', 'host_capacity',
+    'get_all_instances', 'get_cached_instances', 'get_native_instances', 'get_containers', 'get_container_stats',
+    'get_system_metrics', 'get_cached_system_metrics', 'get_available_node_slots',
+    'start_native_instance', 'stop_native_instance', 'bulk_native_action', 'set_native_affinity',
+    'create_single_node_container', 'create_multi_node_container', 'container_action', 'update_container_resources',
+    'rebalance_cpu', 'add_new_node', 'remove_node', 'scale_nodes', 'plan_node_packing', 'schedule_nodes',
+    'start_instance', 'stop_instance', 'get_logs', 'get_instance_logs', 'get_log_file', 'tail_instance_log',
+    'create_k8s_workload', 'scale_k8s_workload', 'delete_k8s_workload',
+    'deploy_service', 'drain_fleet', 'stop_all_services', 'build_nexus_image'
+]
+
+# Subsystem methods exposed as <attribute>.<method>
+SUBSYSTEM_METHODS = {
+    'fleet': ['load_manifest', 'save_manifest', 'plan', 'reconcile'],
+    'rolling': ['status', 'pause', 'resume', 'cancel'],
+    'warm_pool': ['refill', 'stats'],
+    'autoscaler': ['load_policy', 'save_policy', 'evaluate', 'audit', 'status'],
+    'health': ['check', 'clear', 'get_states', 'summary'],
+    'log_index': ['ingest', 'search', 'stats'],
+    'log_archive': ['read', 'stats'],
+    'throughput': ['get_all', 'snapshot']
+}
+
+
+def select_targets(manager, selector: dict = None, all: bool = False) -> list:
+    """(host, container) pairs for a selector, as the HTTP API takes it"""
+    selector = selector or {}
+    if not any(selector.get(key) for key in ('names', 'node_ids', 'types', 'statuses')) and not all:
+        raise ValueError('Empty selector; pass all=true to target every container')
+    return manager.select_containers(selector.get('names'), selector.get('node_ids'), selector.get('types'),
+                                     selector.get('statuses'), selector.get('hosts'))
+
+
+def bulk_container_action(manager, action: str, selector: dict = None, all: bool = False, dry_run: bool = False,
+                          parallelism: int = main.BULK_ACTION_PARALLELISM, deadline: float = main.BULK_ACTION_DEADLINE):
+    """Run an action on every container matching selector (names, node_ids, types, statuses, hosts)"""
+    if action not in main.BULK_ACTIONS:
+        raise ValueError(f"action must be one of {', '.join(main.BULK_ACTIONS)}")
+    options = {'parallelism': parallelism, 'deadline': deadline}
+    parallelism = min(main.parse_number(options, 'parallelism', None, int, 1), 64)
+    deadline = main.parse_number(options, 'deadline', None)
+    targets = select_targets(manager, selector, all)
+    if dry_run:
+        return [{'name': container.name, 'host': host, 'status': container.status} for host, container in targets]
+    return manager.bulk_container_action(action, targets, parallelism=parallelism, deadline=deadline)
+
+
+def rolling_start(manager, selector: dict = None, all: bool = False, **options):
+    """Begin a rolling restart of every container matching selector"""
+    if 'readiness_timeout' in options:
+        options['readiness_timeout'] = main.parse_number(options, 'readiness_timeout', None)
+    if 'max_failures' in options:
+        options['max_failures'] = main.parse_number(options, 'max_failures', None, int, 1)
+    targets = select_targets(manager, selector, all)
+    targets.sort(key=lambda target: target[1].name)
+    return manager.rolling.start(targets, **options)
+
+
+def build_methods(manager) -> dict:
+    """RPC method name -> bound callable"""
+    methods = {name: getattr(manager, name) for name in MANAGER_METHODS}
+    for attribute, names in SUBSYSTEM_METHODS.items():
+        for name in names:
+            methods[f'{attribute}.{name}'] = getattr(getattr(manager, attribute), name)
+    # Selector-based forms of the calls that take live containers in-process
+    methods['bulk_container_action'] = functools.partial(bulk_container_action, manager)
+    methods['rolling.start'] = functools.partial(rolling_start, manager)
+    return methods
+
+
+class RpcHandler(socketserver.BaseRequestHandler):
+    """Serve length-prefixed requests on one connection until the client hangs up"""
+
+    def handle(self):
+        while True:
+            try:
+                message, codec = read_frame(self.request)
+            except (ValueError, ConnectionError) as e:
+                main.app.logger.error(f"RPC connection dropped: {str(e)}")
+                return
+            if message is None:
+                return
+            self.request.sendall(encode(self.server.dispatch(message), codec))
+
+
+class RpcServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, manager):
+        if os.path.exists(path):
+            os.unlink(path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, RpcHandler)
+        finally:
+            os.umask(old_umask)
+        self.path = path
+        self.started = time.time()
+        self.methods = build_methods(manager)
+        self.methods['rpc.ping'] = self.ping
+        self.methods['rpc.methods'] = lambda: sorted(self.methods)
+
+    def ping(self):
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started}
+
+    def dispatch(self, message) -> dict:
+        """Run one request, returning its reply"""
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            if not isinstance(message, dict) or not isinstance(message.get('params') or {}, dict):
+                raise ValueError('Request must be an object with method and params')
+            method = self.methods.get(message.get('method'))
+            if method is None:
+                raise LookupError(f"Unknown method {message.get('method')}")
+            result = method(**(message.get('params') or {}))
+            # Streaming methods (bulk actions) return generators; send the full list
+            if isinstance(result, types.GeneratorType):
+                result = list(result)
+            return {'id': request_id, 'result': result}
+        except Exception as e:
+            main.app.logger.error(f"RPC {message.get('method') if isinstance(message, dict) else '?'} failed: {str(e)}")
+            return {'id': request_id, 'error': {'type': type(e).__name__, 'message': str(e)}}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Nexus CLI Manager - headless daemon")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f"Socket to listen on (default: {DEFAULT_SOCKET})")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.socket)), exist_ok=True)
+    server = RpcServer(args.socket, main.nexus_manager)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"nexusd listening on {args.socket} ({len(server.methods)} methods)")
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark data_update payload size and encode time for full vs slim instance
+records, in each push encoding, at 100 and 1000 instances.
+
+    python scripts/bench_payloads.py [--sizes 100 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Import the manager without Docker, background loops or a persistent data dir
+os.environ.setdefault('NEXUS_DATA_DIR', tempfile.mkdtemp(prefix='nexus-bench-'))
+for variable in ('LOG_INDEX_INTERVAL', 'FLEET_RECONCILE_INTERVAL', 'HEALTH_CHECK_INTERVAL'):
+    os.environ.setdefault(variable, '0')
+os.environ.setdefault('DOCKER_HOSTS', '')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import main  # noqa: E402
+
+
+def window(proofs):
+    return {'proofs_completed': proofs, 'task_failures': 1, 'proofs_per_minute': proofs / 5,
+            'failure_rate': 0.01, 'latency_avg': 2.5, 'latency_max': 9.1}
+
+
+def make_instance(index):
+    """A docker instance record shaped like get_all_instances output"""
+    node_id = str(100000 + index)
+    return {
+        'node_id': node_id,
+        'mode': 'docker',
+        'container_id': f'{index:012x}',
+        'container_name': f'nexus-node-{node_id}',
+        'host': f'edge-{index % 8}',
+        'status': 'running',
+        'created': '2026-10-19T10:00:00.123456789Z',
+        'started_at': '2026-10-19T10:00:01.123456789Z',
+        'image': 'nexus-cli:latest',
+        'stats': {'cpu_percent': 187.5, 'memory_usage': 1536 * 1024 * 1024, 'memory_limit': 2 << 30,
+                  'memory_percent': 75.0, 'network_rx': 123456789, 'network_tx': 98765432},
+        'ports': {'8080/tcp': [{'HostIp': '0.0.0.0', 'HostPort': str(20000 + index)}]},
+        'throughput': {'proofs_completed': 1200 + index, 'task_failures': 12, 'latency_avg': 2.4,
+                       'last_event': '2026-10-19T11:59:58+00:00',
+                       'windows': {'1m': window(4), '5m': window(20), '1h': window(240)}},
+        'health': 'healthy'
+    }
+
+
+def make_metrics(hosts=8):
+    info = {f'Key{i}': 'x' * 40 for i in range(120)}
+    return {
+        'cpu_percent': 63.2,
+        'memory': {'total': 64 << 30, 'available': 20 << 30, 'percent': 68.0, 'used': 44 << 30, 'free': 18 << 30},
+        'disk': {'total': 1 << 40, 'used': 1 << 39, 'free': 1 << 39, 'percent': 50.0},
+        'load_avg': [3.1, 2.9, 2.7],
+        'docker_info': info,
+        'docker_hosts': {f'edge-{h}': {'containers': 120, 'containers_running': 118, 'cpus': 32,
+                                       'memory_total': 128 << 30, 'server_version': '27.1'} for h in range(hosts)},
+        'docker_hosts_unreachable': []
+    }
+
+
+def payload(count, slim):
+    instances = [make_instance(i) for i in range(count)]
+    metrics = make_metrics()
+    if slim:
+        instances = [main.project_fields(i, main.SLIM_INSTANCE_FIELDS) for i in instances]
+        metrics = main.project_fields(metrics, main.SLIM_METRICS_FIELDS)
+    return {'instances': instances, 'metrics': metrics, 'throughput': {}, 'timestamp': '2026-10-19T12:00:00'}
+
+
+def measure(data, encoding, repeat):
+    """(size in bytes, median encode ms) including the JSON text Socket.IO would send"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encoded = main.encode_payload(data, encoding)
+        if encoding == 'json':
+            encoded = json.dumps(encoded, separators=(',', ':')).encode('utf-8')
+        timings.append((time.perf_counter() - started) * 1000)
+    return len(encoded), statistics.median(timings)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    encodings = [e for e in main.PAYLOAD_ENCODINGS if e != 'msgpack' or main.MSGPACK_AVAILABLE]
+    print(f"{'instances':>9}  {'shape':<5}  {'encoding':<8}  {'bytes':>10}  {'encode ms':>9}")
+    for count in args.sizes:
+        for slim in (False, True):
+            data = payload(count, slim)
+            for encoding in sorted(encodings):
+                size, encode_ms = measure(data, encoding, args.repeat)
+                print(f"{count:>9}  {'slim' if slim else 'full':<5}  {encoding:<8}  {size:>10,}  {encode_ms:>9.2f}")
+    if not main.MSGPACK_AVAILABLE:
+        print('\nmsgpack is not installed; pip install msgpack to include it')
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Load-test the manager with simulated dashboards and API pollers against a fake Docker
+backend, stepping up the load until latency, errors or throughput break down.
+
+Each stage adds Socket.IO clients that emit request_update in a loop, and HTTP pollers
+that fetch the dashboard endpoints with conditional GETs. A few idle sessions listen for
+the background pushes throughout. Per stage it reports request latency percentiles, push
+delivery lag, and the manager's CPU and memory. The first stage that misses the SLO is
+reported as the saturation point.
+
+    python scripts/loadtest.py [--clients 10 50 100 200] [--pollers 5 25 50 100]
+                               [--stage-seconds 30] [--containers 50] [--slo-ms 1000]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import signal
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from typing import Optional
+from urllib.parse import urlparse
+
+import psutil
+import requests
+
+try:
+    import socketio
+    SOCKETIO_CLIENT_AVAILABLE = True
+except ImportError:
+    SOCKETIO_CLIENT_AVAILABLE = False
+
+WEB_MANAGER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+POLLED_ENDPOINTS = ['/api/instances', '/api/system-metrics', '/api/containers']
+REQUEST_TIMEOUT = 30
+
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    """Just enough of the Engine API for inventory, stats and metrics; every container is a running node"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def container(self, key):
+        containers = self.server.containers
+        return containers.get(key) or next((c for c in containers.values() if c['Id'].startswith(key)), None)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith('/v1.'):
+            path = path[path.index('/', 1):]
+        parts = path.strip('/').split('/')
+        time.sleep(self.server.latency)
+
+        if path == '/_ping':
+            body = b'OK'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            return self.wfile.write(body)
+        if path == '/version':
+            return self.send_json({'ApiVersion': '1.43', 'Version': '24.0.0'})
+        if path == '/info':
+            count = len(self.server.containers)
+            return self.send_json({'NCPU': 16, 'MemTotal': 64 << 30, 'Containers': count,
+                                   'ContainersRunning': count, 'ServerVersion': '24.0.0'})
+        if path == '/containers/json':
+            return self.send_json([{'Id': c['Id'], 'Names': [c['Name']], 'Image': 'nexus-cli:latest',
+                                    'State': 'running', 'Labels': {}} for c in self.server.containers.values()])
+        if parts[0] == 'containers' and len(parts) == 3:
+            container = self.container(parts[1])
+            if not container:
+                return self.send_json({'message': f'No such container: {parts[1]}'}, 404)
+            if parts[2] == 'json':
+                return self.send_json(container)
+            if parts[2] == 'stats':
+                time.sleep(self.server.stats_latency)
+                return self.send_json(self.stats())
+            if parts[2] == 'logs':
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.docker.raw-stream')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        if parts[0] == 'images' and len(parts) == 3:
+            return self.send_json({'Id': self.server.image_id, 'RepoTags': ['nexus-cli:latest']})
+        if parts[0] == 'networks':
+            return self.send_json({'Id': 'nexus-network', 'Name': 'nexus-network'})
+        self.send_json({'message': f'page not found: {path}'}, 404)
+
+    def stats(self):
+        total = random.randint(10 ** 9, 2 * 10 ** 9)
+        system = random.randint(10 ** 11, 2 * 10 ** 11)
+        return {
+            'cpu_stats': {'cpu_usage': {'total_usage': total + 4 * 10 ** 8, 'percpu_usage': [1] * 4},
+                          'system_cpu_usage': system + 10 ** 10, 'online_cpus': 4},
+            'precpu_stats': {'cpu_usage': {'total_usage': total}, 'system_cpu_usage': system},
+            'memory_stats': {'usage': random.randint(1 << 30, 2 << 30), 'limit': 4 << 30},
+            'networks': {'eth0': {'rx_bytes': random.randint(0, 10 ** 9), 'tx_bytes': random.randint(0, 10 ** 9)}}
+        }
+
+
+class FakeDockerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        # http.server expects a (host, port) client address
+        connection, _ = super().get_request()
+        return connection, ('fake-docker', 0)
+
+
+def serve_fake_docker(path: str, count: int, latency: float, stats_latency: float):
+    """Run the fake Engine API on a Unix socket until killed"""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = FakeDockerServer(path, FakeDockerHandler)
+    server.latency = latency
+    server.stats_latency = stats_latency
+    server.image_id = 'sha256:' + '0' * 64
+    server.containers = {}
+    for index in range(count):
+        name = f'nexus-node-{100000 + index}'
+        server.containers[name] = {
+            'Id': f'{index + 1:064x}',
+            'Name': '/' + name,
+            'Created': '2026-10-19T10:00:00.000000000Z',
+            'Image': server.image_id,
+            'State': {'Status': 'running', 'Running': True, 'ExitCode': 0,
+                      'StartedAt': '2026-10-19T10:00:01.000000000Z'},
+            'Config': {'Image': 'nexus-cli:latest', 'Labels': {}, 'Env': [f'NODE_ID={100000 + index}']},
+            'HostConfig': {'NanoCpus': 2 * 10 ** 9, 'Memory': 4 << 30},
+            'NetworkSettings': {'Ports': {}},
+            'Mounts': []
+        }
+    server.serve_forever()
+
+
+class Recorder:
+    """Latency samples, error counts and resource samples for the current stage"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.latency = {'socketio': [], 'http': []}
+            self.errors = {'socketio': 0, 'http': 0, 'connect': 0}
+            self.push_lag = []
+            self.cpu = []
+            self.rss = []
+            self.started = time.monotonic()
+
+    def request(self, kind: str, seconds: float, ok: bool):
+        with self.lock:
+            if ok:
+                self.latency[kind].append(seconds)
+            else:
+                self.errors[kind] += 1
+
+    def error(self, kind: str):
+        with self.lock:
+            self.errors[kind] += 1
+
+    def push(self, lag: float):
+        with self.lock:
+            self.push_lag.append(lag)
+
+    def resources(self, cpu: float, rss: int):
+        with self.lock:
+            self.cpu.append(cpu)
+            self.rss.append(rss)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'seconds': time.monotonic() - self.started,
+                'latency': {kind: list(samples) for kind, samples in self.latency.items()},
+                'errors': dict(self.errors),
+                'push_lag': list(self.push_lag),
+                'cpu': list(self.cpu),
+                'rss': list(self.rss)
+            }
+
+
+def percentiles(samples):
+    """p50/p95/p99/max in milliseconds"""
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1) if ordered else None
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99),
+            'max': round(ordered[-1] * 1000, 1) if ordered else None}
+
+
+class DashboardClient(threading.Thread):
+    """One dashboard session emitting request_update every interval, or with interval None an idle
+    session that only receives background pushes and measures their delivery lag"""
+
+    def __init__(self, url: str, interval: Optional[float], recorder: Recorder, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.url = url
+        self.interval = interval
+        self.recorder = recorder
+        self.stop = stop
+        self.failed = False
+        self.sio = socketio.Client(reconnection=False, request_timeout=REQUEST_TIMEOUT)
+        self.sio.on('error', self.on_error)
+        if interval is None:
+            self.sio.on('data_update', self.on_push)
+
+    def on_push(self, data):
+        # Lag from the payload being built to it arriving here; both ends share this host's clock
+        if isinstance(data, dict) and data.get('timestamp'):
+            self.recorder.push(time.time() - datetime.fromisoformat(data['timestamp']).timestamp())
+
+    def on_error(self, data):
+        self.failed = True
+
+    def run(self):
+        # Spread connects so a stage doesn't open every session in the same instant
+        if self.stop.wait(random.uniform(0, min(self.interval or 1, 2))):
+            return
+        try:
+            self.sio.connect(self.url, wait_timeout=REQUEST_TIMEOUT)
+        except Exception:
+            self.recorder.error('connect')
+            return
+        try:
+            while not self.stop.is_set():
+                if self.interval is None:
+                    self.stop.wait(1)
+                    continue
+                # The handler's ack follows its data_update on the same connection, so it marks the reply
+                self.failed = False
+                started = time.monotonic()
+                try:
+                    self.sio.call('request_update', timeout=REQUEST_TIMEOUT)
+                    ok = not self.failed
+                except socketio.exceptions.TimeoutError:
+                    ok = False
+                elapsed = time.monotonic() - started
+                self.recorder.request('socketio', elapsed, ok)
+                self.stop.wait(max(0.0, random.uniform(0.8, 1.2) * self.interval - elapsed))
+        except Exception:
+            self.recorder.error('socketio')
+        finally:
+            self.sio.disconnect()
+
+
+class Poller(threading.Thread):
+    """An API client polling the dashboard endpoints with ETags, like the dashboard's own fetches"""
+
+    def __init__(self, url: str, interval: float, recorder: Recorder, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.url = url
+        self.interval = interval
+        self.recorder = recorder
+        self.stop = stop
+        self.session = requests.Session()
+        self.etags = {}
+
+    def run(self):
+        if self.stop.wait(random.uniform(0, min(self.interval, 2))):
+            return
+        while not self.stop.is_set():
+            cycle = time.monotonic()
+            for path in POLLED_ENDPOINTS:
+                headers = {'If-None-Match': self.etags[path]} if path in self.etags else {}
+                started = time.perf_counter()
+                try:
+                    response = self.session.get(self.url + path, headers=headers, timeout=REQUEST_TIMEOUT)
+                    ok = response.status_code in (200, 304)
+                    if response.headers.get('ETag'):
+                        self.etags[path] = response.headers['ETag']
+                except requests.RequestException:
+                    ok = False
+                self.recorder.request('http', time.perf_counter() - started, ok)
+            self.stop.wait(max(0.0, self.interval - (time.monotonic() - cycle)))
+
+
+def sample_resources(pid: int, recorder: Recorder, stop: threading.Event):
+    """Summed CPU percent and RSS of the manager process and its children (gunicorn workers)"""
+    root = psutil.Process(pid)
+    tracked = {}
+    while not stop.wait(1):
+        try:
+            processes = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        cpu, rss = 0.0, 0
+        for process in processes:
+            try:
+                # cpu_percent() measures since the previous call on the same Process object
+                process = tracked.setdefault(process.pid, process)
+                cpu += process.cpu_percent()
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                tracked.pop(process.pid, None)
+        recorder.resources(cpu, rss)
+
+
+def start_manager(args, docker_socket: str, data_dir: str):
+    """Launch the manager over the fake backend with gunicorn's eventlet worker, or the dev server"""
+    env = dict(os.environ, NEXUS_DATA_DIR=data_dir, DOCKER_HOSTS=f'fake=unix://{docker_socket}',
+               PUSH_INTERVAL=str(args.push_interval), LOG_INDEX_INTERVAL='0', FLEET_RECONCILE_INTERVAL='0',
+               HEALTH_CHECK_INTERVAL='0', AUTOSCALE_INTERVAL='0', WARM_POOL_SIZE='0',
+               FLEET_MANIFEST=os.path.join(data_dir, 'fleet.yml'),
+               AUTOSCALE_POLICY=os.path.join(data_dir, 'autoscale.yml'))
+    server = args.server
+    if server == 'auto':
+        gunicorn_eventlet = (importlib.util.find_spec('eventlet') and importlib.util.find_spec('gunicorn')
+                             and importlib.util.find_spec('gunicorn.workers.geventlet'))
+        server = 'gunicorn' if gunicorn_eventlet else 'dev'
+    if server == 'gunicorn':
+        # Mirrors launch.py's production command
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{args.port}', '--workers', '1',
+                   '--worker-class', 'eventlet', '--timeout', '120', '--worker-connections', '1000',
+                   'app.main:app']
+        cwd = WEB_MANAGER_DIR
+    else:
+        command = [sys.executable, '-c', 'from main import app, socketio; '
+                   f'socketio.run(app, host="127.0.0.1", port={args.port}, allow_unsafe_werkzeug=True)']
+        cwd = os.path.join(WEB_MANAGER_DIR, 'app')
+    log = open(os.path.join(data_dir, 'manager.log'), 'w')
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    url = f'http://127.0.0.1:{args.port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Manager exited during startup, see {log.name}")
+        try:
+            if requests.get(url + '/api/health', timeout=2).ok:
+                return process, url, server
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Manager did not come up within 60s, see {log.name}")
+
+
+def summarize(stage: int, clients: int, pollers: int, args, snapshot) -> dict:
+    seconds = max(snapshot['seconds'], 1e-9)
+    offered = clients / args.client_interval + pollers * len(POLLED_ENDPOINTS) / args.poll_interval
+    completed = sum(len(samples) for samples in snapshot['latency'].values())
+    failed = snapshot['errors']['socketio'] + snapshot['errors']['http'] + snapshot['errors']['connect']
+    result = {
+        'stage': stage,
+        'clients': clients,
+        'pollers': pollers,
+        'offered_rps': round(offered, 1),
+        'achieved_rps': round(completed / seconds, 1),
+        'error_rate': round(failed / max(1, completed + failed), 4),
+        'errors': snapshot['errors'],
+        'socketio_ms': percentiles(snapshot['latency']['socketio']),
+        'http_ms': percentiles(snapshot['latency']['http']),
+        'push_lag_ms': percentiles(snapshot['push_lag']),
+        'pushes': len(snapshot['push_lag']),
+        'pushes_expected': int(args.listeners * seconds / args.push_interval),
+        'cpu_percent': {'avg': round(sum(snapshot['cpu']) / len(snapshot['cpu']), 1) if snapshot['cpu'] else None,
+                        'max': round(max(snapshot['cpu']), 1) if snapshot['cpu'] else None},
+        'rss_mb': round(max(snapshot['rss']) / 1024 / 1024, 1) if snapshot['rss'] else None
+    }
+    reasons = []
+    worst_p95 = max((result[key]['p95'] or 0) for key in ('socketio_ms', 'http_ms'))
+    if worst_p95 > args.slo_ms:
+        reasons.append(f"p95 {worst_p95:.0f}ms > {args.slo_ms:.0f}ms")
+    if result['error_rate'] > args.max_error_rate:
+        reasons.append(f"error rate {result['error_rate']:.1%}")
+    if result['achieved_rps'] < 0.9 * offered:
+        reasons.append(f"{result['achieved_rps']} of {offered:.1f} req/s offered")
+    result['saturated'] = reasons
+    return result
+
+
+def print_stage(result: dict):
+    fmt = lambda p: f"{p['p50'] or 0:>7.1f} {p['p95'] or 0:>7.1f} {p['p99'] or 0:>7.1f}"
+    print(f"{result['stage']:>5} {result['clients']:>7} {result['pollers']:>7} "
+          f"{result['offered_rps']:>7.1f} {result['achieved_rps']:>7.1f} "
+          f"{fmt(result['socketio_ms'])}  {fmt(result['http_ms'])}  "
+          f"{result['push_lag_ms']['p50'] or 0:>7.1f} {result['push_lag_ms']['max'] or 0:>7.1f} "
+          f"{result['pushes']:>4}/{result['pushes_expected']:<4} "
+          f"{result['error_rate']:>6.1%} {result['cpu_percent']['avg'] or 0:>6.1f} {result['rss_mb'] or 0:>7.1f}"
+          + (f"  SATURATED: {'; '.join(result['saturated'])}" if result['saturated'] else ''), flush=True)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 50, 100, 200],
+                        help='Socket.IO dashboard sessions per stage')
+    parser.add_argument('--pollers', type=int, nargs='+', default=[5, 25, 50, 100],
+                        help='HTTP pollers per stage (one value applies to every stage)')
+    parser.add_argument('--stage-seconds', type=float, default=30)
+    parser.add_argument('--listeners', type=int, default=5,
+                        help='Idle dashboard sessions that only measure background push lag')
+    parser.add_argument('--client-interval', type=float, default=2, help='Seconds between request_update per client')
+    parser.add_argument('--poll-interval', type=float, default=5, help='Seconds between poll cycles per poller')
+    parser.add_argument('--push-interval', type=float, default=5, help='PUSH_INTERVAL for the spawned manager')
+    parser.add_argument('--containers', type=int, default=50, help='Running node containers on the fake Docker host')
+    parser.add_argument('--docker-latency', type=float, default=0.002, help='Fake Docker API latency per call (s)')
+    parser.add_argument('--stats-latency', type=float, default=0.02, help='Extra fake latency per stats call (s)')
+    parser.add_argument('--slo-ms', type=float, default=1000, help='p95 latency beyond which a stage is saturated')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'dev'], default='auto')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--url', help='Test an already running manager instead of spawning one')
+    parser.add_argument('--pid', type=int, help='Manager PID to sample CPU and memory with --url')
+    parser.add_argument('--json', help='Also write the stage results to this file')
+    parser.add_argument('--fake-docker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fake_docker:
+        return serve_fake_docker(args.fake_docker, args.containers, args.docker_latency, args.stats_latency)
+    if not SOCKETIO_CLIENT_AVAILABLE:
+        parser.error('python-socketio is required (pip install python-socketio)')
+    # Client libraries log each failed session; the report counts them instead
+    for name in ('socketio.client', 'engineio.client'):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+    pollers = args.pollers if len(args.pollers) > 1 else args.pollers * len(args.clients)
+    if len(pollers) != len(args.clients):
+        parser.error('--pollers needs one value or one per --clients stage')
+
+    children = []
+    data_dir = tempfile.mkdtemp(prefix='nexus-loadtest-')
+    try:
+        if args.url:
+            url, server, manager_pid = args.url.rstrip('/'), 'external', args.pid
+        else:
+            docker_socket = os.path.join(data_dir, 'docker.sock')
+            children.append(subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--fake-docker', docker_socket,
+                 '--containers', str(args.containers), '--docker-latency', str(args.docker_latency),
+                 '--stats-latency', str(args.stats_latency)]))
+            while not os.path.exists(docker_socket):
+                time.sleep(0.1)
+            manager, url, server = start_manager(args, docker_socket, data_dir)
+            children.append(manager)
+            manager_pid = manager.pid
+
+        transport = 'websocket' if importlib.util.find_spec('websocket') else 'polling (pip install websocket-client)'
+        print(f"Manager {url} ({server}), {args.containers} fake containers, {args.stage_seconds:.0f}s stages, "
+              f"p95 SLO {args.slo_ms:.0f}ms, {args.listeners} push listeners, Socket.IO over {transport}")
+        print(f"{'stage':>5} {'clients':>7} {'pollers':>7} {'offered':>7} {'rps':>7} "
+              f"{'sio p50':>7} {'p95':>7} {'p99':>7}  {'http p50':>7} {'p95':>7} {'p99':>7}  "
+              f"{'push p50':>7} {'max':>7} {'pushes':^9} {'errors':>6} {'cpu%':>6} {'rss MB':>7}")
+
+        recorder, stop = Recorder(), threading.Event()
+        if manager_pid:
+            threading.Thread(target=sample_resources, args=(manager_pid, recorder, stop), daemon=True).start()
+        workers = [DashboardClient(url, None, recorder, stop) for _ in range(args.listeners)]
+        for worker in workers:
+            worker.start()
+        results, saturation = [], None
+        running_clients = running_pollers = 0
+        for stage, (client_count, poller_count) in enumerate(zip(args.clients, pollers), 1):
+            new = [DashboardClient(url, args.client_interval, recorder, stop)
+                   for _ in range(max(0, client_count - running_clients))]
+            new += [Poller(url, args.poll_interval, recorder, stop) for _ in range(max(0, poller_count - running_pollers))]
+            for worker in new:
+                worker.start()
+            workers.extend(new)
+            running_clients, running_pollers = max(running_clients, client_count), max(running_pollers, poller_count)
+
+            recorder.reset()
+            time.sleep(args.stage_seconds)
+            result = summarize(stage, running_clients, running_pollers, args, recorder.snapshot())
+            results.append(result)
+            print_stage(result)
+            if result['saturated'] and saturation is None:
+                saturation = result
+
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+        if saturation:
+            print(f"\nSaturation point: stage {saturation['stage']} ({saturation['clients']} clients, "
+                  f"{saturation['pollers']} pollers): {'; '.join(saturation['saturated'])}")
+        else:
+            print('\nNo saturation within the tested stages')
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'server': server, 'containers': args.containers, 'stages': results,
+                           'saturation_stage': saturation['stage'] if saturation else None}, f, indent=2)
+    finally:
+        for child in reversed(children):
+            child.send_signal(signal.SIGTERM)
+            try:
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                child.kill()
+
+
+if __name__ == '__main__':
+    main_cli()